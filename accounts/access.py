@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import UserProfile
+
+ACCESS_CACHE_TIMEOUT = 300
+
+ROLE_LABELS = dict(UserProfile.ROLE_CHOICES)
+
+
+def access_cache_key(user_id):
+    return f'accounts:access:{user_id}'
+
+
+class UserAccess:
+    """
+    Authorization facts for one user: role, assigned admin and the ids of the
+    users they manage. Loaded with a single profile query and cached until
+    the relevant ``UserProfile`` or ``User`` rows change.
+    """
+    
+    def __init__(self, user_id=None, role='user', assigned_admin_id=None, managed_user_ids=(), has_profile=False,
+                 exists=True):
+        self.user_id = user_id
+        self.role = role
+        self.assigned_admin_id = assigned_admin_id
+        self.managed_user_ids = frozenset(managed_user_ids)
+        self.has_profile = has_profile
+        self.exists = exists
+    
+    def __repr__(self):
+        return f"<UserAccess user={self.user_id} role={self.role}>"
+    
+    @property
+    def is_admin(self):
+        return self.role in ['admin', 'superadmin']
+    
+    @property
+    def is_superadmin(self):
+        return self.role == 'superadmin'
+    
+    @property
+    def role_display(self):
+        return ROLE_LABELS.get(self.role, self.role)
+    
+    def manages(self, user_id):
+        """Return whether ``user_id`` is within this user's administrative scope."""
+        if self.is_superadmin:
+            return True
+        return self.role == 'admin' and user_id in self.managed_user_ids
+
+
+def fetch_access(user_id):
+    access = UserAccess(user_id)
+    managed = []
+    profiles = UserProfile.objects.filter(
+        Q(user_id=user_id) | Q(assigned_admin_id=user_id)
+    ).values_list('user_id', 'role', 'assigned_admin_id')
+    for profile_user_id, role, assigned_admin_id in profiles:
+        if profile_user_id == user_id:
+            access.role = role
+            access.assigned_admin_id = assigned_admin_id
+            access.has_profile = True
+        if assigned_admin_id == user_id:
+            managed.append(profile_user_id)
+    access.managed_user_ids = frozenset(managed)
+    if not access.has_profile:
+        # Registration creates a profile, so this only runs for users created
+        # outside the app and for deleted users, whose tokens are rejected.
+        access.exists = get_user_model().objects.filter(pk=user_id).exists()
+    return access
+
+
+def load_access(user):
+    """Return the cached :class:`UserAccess` for ``user``, loading it on a miss."""
+    if not user.is_authenticated:
+        return UserAccess()
+    # Set by the token authentication, which has already loaded it.
+    if '_access' in vars(user):
+        return user._access
+    
+    # Roles are always read here rather than from token claims, so a role or
+    # admin change applies to the next request rather than the next token.
+    key = access_cache_key(user.pk)
+    access = cache.get(key)
+    if access is None:
+        access = fetch_access(user.pk)
+        cache.set(key, access, ACCESS_CACHE_TIMEOUT)
+    return access
+
+
+def invalidate_access(*user_ids):
+    cache.delete_many([access_cache_key(user_id) for user_id in user_ids if user_id])
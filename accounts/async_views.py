@@ -0,0 +1,16 @@
+"""Native async versions of account read endpoints, routed when ``ASYNC_VIEWS`` is enabled."""
+from django.contrib.auth import get_user_model
+
+from task_manager.async_api import async_api_view, json_response
+from task_manager.replicas import read_from_replica
+from .serializers import UserSerializer
+
+User = get_user_model()
+
+
+@async_api_view(['GET'])
+@read_from_replica
+async def profile(request):
+    user = await User.objects.select_related('userprofile__assigned_admin').aget(pk=request.access.user_id)
+    serializer = UserSerializer(user)
+    return json_response(serializer.data)
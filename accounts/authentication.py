@@ -0,0 +1,45 @@
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .access import load_access
+from .revocation import revoked_tokens
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authenticate from the access token alone: the user is a ``TokenUser``
+    built from the claims, so no ``auth_user`` row is loaded, and revocation
+    is checked against the in-memory revocation list. Tokens of deleted users
+    are rejected through the cached ``UserAccess``.
+    """
+    
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revoked_tokens.is_revoked(token[api_settings.JTI_CLAIM]):
+            raise InvalidToken({
+                'detail': 'Token has been revoked',
+                'code': 'token_not_valid',
+            })
+        return token
+    
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        # Kept on the user so ``request.access`` does not look it up again.
+        user._access = load_access(user)
+        if not user._access.exists:
+            raise InvalidToken({'detail': 'User not found', 'code': 'user_not_found'})
+        return user
+
+
+def authenticate_access(request):
+    """
+    Return the ``UserAccess`` for a plain Django request, authenticated the
+    way the API views are (bearer token, then session), or ``None``. Raises
+    ``AuthenticationFailed`` for an invalid token.
+    """
+    authenticated = StatelessJWTAuthentication().authenticate(request)
+    user = authenticated[0] if authenticated else request.user
+    if not user.is_authenticated:
+        return None
+    return load_access(user)
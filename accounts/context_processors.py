@@ -0,0 +1,5 @@
+from .access import UserAccess
+
+
+def access(request):
+    return {'access': getattr(request, 'access', UserAccess())}
@@ -0,0 +1,39 @@
+"""
+Password hashers whose cost is read from settings.
+
+Each keeps the algorithm name of the Django hasher it extends, so existing
+hashes still verify; when the configured cost (or ``PASSWORD_HASHER``)
+changes, ``must_update`` makes Django rehash the password on the next
+successful login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher,
+)
+
+
+def _cost(name, default):
+    return getattr(settings, name, 0) or default
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return _cost('PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+class ConfigurableArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return _cost('ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+    
+    @property
+    def memory_cost(self):
+        return _cost('ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+
+
+class ConfigurableScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return _cost('SCRYPT_WORK_FACTOR', ScryptPasswordHasher.work_factor)
+
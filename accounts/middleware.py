@@ -0,0 +1,25 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from .access import load_access
+
+
+class UserAccessMiddleware:
+    """
+    Attach ``request.access`` (a lazily loaded ``UserAccess``) to every
+    request. Evaluation is deferred until first use so DRF views see the user
+    authenticated by their own authentication classes.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        # Nothing here touches the database, so the same code serves both
+        # modes; under ASGI get_response returns a coroutine.
+        request.access = SimpleLazyObject(lambda: load_access(request.user))
+        return self.get_response(request)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['role'], name='userprofile_role_idx'),
+        ),
+    ]
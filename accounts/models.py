@@ -20,6 +20,11 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['role'], name='userprofile_role_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.user.username} ({self.get_role_display()})"
     
@@ -30,3 +35,13 @@ class UserProfile(models.Model):
     @property
     def is_superadmin(self):
         return self.role == 'superadmin'
+
+
+class RevokedToken(models.Model):
+    """JWT ids revoked before expiry, persisted for ``accounts.revocation``."""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,77 @@
+"""
+Revocation list for JWTs (logout and refresh rotation).
+
+Revoked token ids are written through to the ``RevokedToken`` table and
+held in memory as a dict of 16-byte jti keys to expiry timestamps, so each
+check is a set lookup. Every ``JWT_REVOCATION_SYNC_SECONDS`` the list pulls
+rows added by other workers (by increasing id) and drops expired entries.
+"""
+import datetime
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import RevokedToken
+
+# Ids committed out of order (concurrent inserts) can land just below the
+# highest id already seen, so each sync re-reads this many ids back.
+SYNC_OVERLAP = 1000
+
+
+def _key(jti):
+    # simplejwt issues uuid4().hex ids; store them as 16 raw bytes.
+    try:
+        return bytes.fromhex(jti)
+    except ValueError:
+        return jti.encode()
+
+
+class RevocationList:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked = {}
+        self._last_id = 0
+        self._next_sync = 0.0
+    
+    def __len__(self):
+        return len(self._revoked)
+    
+    def is_revoked(self, jti):
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        return _key(jti) in self._revoked
+    
+    def revoke(self, jti, exp):
+        """Revoke ``jti`` until its ``exp`` (a Unix timestamp)."""
+        expires_at = datetime.datetime.fromtimestamp(exp, tz=datetime.timezone.utc)
+        RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+        with self._lock:
+            self._revoked[_key(jti)] = exp
+    
+    def sync(self):
+        with self._lock:
+            now = timezone.now()
+            rows = RevokedToken.objects.filter(
+                id__gt=self._last_id - SYNC_OVERLAP, expires_at__gt=now
+            ).order_by('id').values_list('id', 'jti', 'expires_at')
+            for row_id, jti, expires_at in rows:
+                self._revoked[_key(jti)] = expires_at.timestamp()
+                self._last_id = max(self._last_id, row_id)
+            
+            cutoff = now.timestamp()
+            for key in [key for key, exp in self._revoked.items() if exp <= cutoff]:
+                del self._revoked[key]
+            RevokedToken.objects.filter(expires_at__lte=now).delete()
+            
+            self._next_sync = time.monotonic() + getattr(settings, 'JWT_REVOCATION_SYNC_SECONDS', 30)
+    
+    def clear(self):
+        with self._lock:
+            self._revoked.clear()
+            self._last_id = 0
+            self._next_sync = 0.0
+
+
+revoked_tokens = RevocationList()
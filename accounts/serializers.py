@@ -2,7 +2,12 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.models import User
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from .models import UserProfile
+from .revocation import revoked_tokens
+from .tokens import token_response, tokens_for_user
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -55,3 +60,29 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'assigned_admin')
         read_only_fields = ('id',)
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    """
+    Exchange a refresh token for a new access token. With
+    ``ROTATE_REFRESH_TOKENS`` a new refresh token is issued with freshly
+    loaded claims and, with ``BLACKLIST_AFTER_ROTATION``, the old one is
+    revoked.
+    """
+    refresh = serializers.CharField()
+    access = serializers.CharField(read_only=True)
+
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        if revoked_tokens.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise InvalidToken({'detail': 'Token has been revoked', 'code': 'token_not_valid'})
+
+        if not api_settings.ROTATE_REFRESH_TOKENS:
+            return {'access': str(refresh.access_token)}
+
+        user = User.objects.filter(pk=refresh[api_settings.USER_ID_CLAIM], is_active=True).first()
+        if user is None:
+            raise InvalidToken({'detail': 'User not found', 'code': 'user_not_found'})
+        if api_settings.BLACKLIST_AFTER_ROTATION:
+            revoked_tokens.revoke(refresh[api_settings.JTI_CLAIM], refresh['exp'])
+        return token_response(tokens_for_user(user))
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .access import invalidate_access
+from .models import UserProfile
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=UserProfile)
+def remember_assigned_admin(sender, instance, **kwargs):
+    instance._access_admin_id = instance.__dict__.get('assigned_admin_id')
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_access(sender, instance, **kwargs):
+    # The user's own entry and the managed-user sets of both the previous
+    # and current admin depend on this profile.
+    invalidate_access(instance.user_id, instance._access_admin_id, instance.assigned_admin_id)
+    instance._access_admin_id = instance.assigned_admin_id
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_access(sender, instance, **kwargs):
+    invalidate_access(instance.pk)
@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from tasks.models import Task
+from tasks.tests import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+from .throttling import check_login_attempt
+
+
+@override_settings(CACHES=LOCMEM_CACHES, LOGIN_THROTTLE_USERNAME_RATE='3/min', LOGIN_THROTTLE_IP_RATE='100/min')
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Keep every attempt inside one window.
+        clock = mock.patch('accounts.throttling.time')
+        clock.start().time.return_value = 1_000_000.0
+        self.addCleanup(clock.stop)
+    
+    def login(self, username):
+        return self.client.post(reverse('login'), {'username': username, 'password': 'wrong'})
+    
+    def test_attempts_beyond_the_limit_are_throttled(self):
+        for _ in range(3):
+            self.assertEqual(self.login('alice').status_code, 400)
+        response = self.login('alice')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        # Usernames are counted separately.
+        self.assertEqual(self.login('bob').status_code, 400)
+    
+    def test_non_string_username(self):
+        response = self.client.post(reverse('login'), {'username': 5, 'password': 'wrong'}, 'application/json')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_concurrent_attempts_cannot_exceed_the_limit(self):
+        request = RequestFactory().post(reverse('login'))
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            waits = list(pool.map(lambda _: check_login_attempt(request, 'alice'), range(40)))
+        self.assertEqual(waits.count(None), 3)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, TASK_CACHE_TIMEOUT=0)
+class TokenAccessTests(TestCase):
+    """Access tokens are authorized with the user's current role, not the one they were issued with."""
+    
+    def setUp(self):
+        cache.clear()
+        self.superadmin = make_user('root', 'superadmin')
+        self.user = make_user('user')
+        Task.objects.create(
+            title='task', description='d', assigned_to=self.user, created_by=self.user, due_date=DUE_DATE,
+        )
+    
+    def test_role_change_applies_to_issued_tokens(self):
+        client = api_client(self.superadmin)
+        self.assertEqual(len(client.get(reverse('task_list')).json()['results']), 1)
+        profile = self.superadmin.userprofile
+        profile.role = 'user'
+        profile.save()
+        self.assertEqual(client.get(reverse('task_list')).json()['results'], [])
+    
+    def test_deleted_user_token_is_rejected(self):
+        client = api_client(self.superadmin)
+        self.superadmin.delete()
+        response = client.post(reverse('create_task'), {
+            'title': 't', 'description': 'd', 'assigned_to': self.user.pk, 'due_date': DUE_DATE,
+        }, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(client.get(reverse('task_list')).status_code, 401)
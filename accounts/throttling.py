@@ -0,0 +1,107 @@
+"""
+Fixed-window throttling of login attempts, checked before any password
+hashing. Each username and each client address has an attempt counter per
+window in the default cache; an attempt counts against both.
+
+Counters are created with ``cache.add`` and advanced with ``cache.incr``, so
+concurrent attempts cannot both read the same count and overwrite each
+other's update. Both are atomic on the redis and locmem backends; the file
+backend's ``incr`` is a read and a write, so use redis where attempts race
+across processes.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Parse a DRF-style rate such as ``'10/min'`` into ``(limit, seconds)``."""
+    if rate is None:
+        return None
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class FixedWindow:
+    def __init__(self, prefix, rate):
+        self.prefix = prefix
+        self.limit, self.period = rate
+    
+    def window(self, now):
+        return int(now // self.period)
+    
+    def key(self, ident, window):
+        return f'accounts:login-throttle:{self.prefix}:{ident}:{window}'
+    
+    def wait(self, window, now):
+        """Seconds until ``window`` ends."""
+        return max(0.0, (window + 1) * self.period - now)
+    
+    def incr(self, key):
+        """Count one attempt under ``key`` and return the new count."""
+        if cache.add(key, 1, timeout=self.period):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # The counter expired since add(); this attempt opens a new one.
+            cache.add(key, 1, timeout=self.period)
+            return 1
+    
+    def decr(self, key):
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass
+    
+    def reset(self, ident, now):
+        cache.delete(self.key(ident, self.window(now)))
+
+
+def _throttles():
+    rates = [
+        ('username', getattr(settings, 'LOGIN_THROTTLE_USERNAME_RATE', None)),
+        ('ip', getattr(settings, 'LOGIN_THROTTLE_IP_RATE', None)),
+    ]
+    return [(name, FixedWindow(name, parse_rate(rate))) for name, rate in rates if rate]
+
+
+def _idents(username, ip):
+    # JSON bodies may carry any type; the serializer rejects what is not a string.
+    username = '' if username is None else str(username)
+    return {'username': username.strip().lower(), 'ip': ip}
+
+
+def check_login_attempt(request, username):
+    """
+    Count one attempt for ``username`` and the client address. Return
+    ``None`` when allowed, otherwise the seconds to wait before retrying;
+    rejected attempts are not counted.
+    """
+    now = time.time()
+    # Honours REST_FRAMEWORK['NUM_PROXIES'] for X-Forwarded-For.
+    idents = _idents(username, BaseThrottle().get_ident(request))
+    counted, waits = [], []
+    for name, throttle in _throttles():
+        window = throttle.window(now)
+        key = throttle.key(idents[name], window)
+        counted.append((throttle, key))
+        if throttle.incr(key) > throttle.limit:
+            waits.append(throttle.wait(window, now))
+    
+    if waits:
+        for throttle, key in counted:
+            throttle.decr(key)
+        return max(waits)
+    return None
+
+
+def reset_login_attempts(username, ip):
+    idents = _idents(username, ip)
+    now = time.time()
+    for name, throttle in _throttles():
+        throttle.reset(idents[name], now)
@@ -0,0 +1,20 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def tokens_for_user(user):
+    """
+    Issue a refresh token (and, through ``access_token``, an access token)
+    carrying the ``username`` claim, so requests are authenticated without
+    loading the user. Roles are not claims: they are resolved per request
+    through the cached ``UserAccess`` so changes apply immediately.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh['username'] = user.username
+    return refresh
+
+
+def token_response(refresh):
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
@@ -1,10 +1,15 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Under ASGI the profile is served by a native async view.
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     path('register/', views.register, name='register'),
-    path('login/', views.web_login, name='login'),
+    path('login/', views.login, name='login'),
+    path('token/refresh/', views.token_refresh, name='token_refresh'),
     path('logout/', views.logout, name='logout'),
     path('web-logout/', views.web_logout, name='web_logout'),
-    path('profile/', views.profile, name='profile'),
+    path('profile/', read_views.profile, name='profile'),
 ]
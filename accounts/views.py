@@ -1,12 +1,22 @@
+import math
+
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import Throttled
 from rest_framework.response import Response
-# from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenViewBase
 from django.contrib.auth import get_user_model, authenticate, login as django_login
 from django.contrib.auth import logout as django_logout
 from django.shortcuts import redirect, render
 from django.contrib import messages
-from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer
+from task_manager.replicas import read_from_replica
+from .revocation import revoked_tokens
+from .serializers import TokenRefreshSerializer, UserRegistrationSerializer, UserLoginSerializer, UserSerializer
+from .throttling import check_login_attempt
+from .tokens import token_response, tokens_for_user
 
 User = get_user_model()
 
@@ -17,6 +27,11 @@ def web_login(request):
         username = request.POST.get('username')
         password = request.POST.get('password')
         
+        wait = check_login_attempt(request, username)
+        if wait is not None:
+            messages.error(request, f"Too many login attempts. Try again in {math.ceil(wait)} seconds.")
+            return render(request, 'login.html', status=429)
+        
         user = authenticate(request, username=username, password=password)
         
         if user is not None:
@@ -35,11 +50,9 @@ def register(request):
     serializer = UserRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
-        # refresh = RefreshToken.for_user(user)
         return Response({
             'user': UserSerializer(user).data,
-            # 'refresh': str(refresh),
-            # 'access': str(refresh.access_token),
+            **token_response(tokens_for_user(user)),
         }, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -47,14 +60,17 @@ def register(request):
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def login(request):
+    username = request.data.get('username') if hasattr(request.data, 'get') else None
+    wait = check_login_attempt(request, username)
+    if wait is not None:
+        raise Throttled(wait=wait)
+    
     serializer = UserLoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
-        # refresh = RefreshToken.for_user(user)
         return Response({
             'user': UserSerializer(user).data,
-            # 'refresh': str(refresh),
-            # 'access': str(refresh.access_token),
+            **token_response(tokens_for_user(user)),
         })
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -62,17 +78,32 @@ def login(request):
 @api_view(['POST'])
 def logout(request):
     try:
-        # refresh_token = request.data["refresh"]
-        # token = RefreshToken(refresh_token)
-        # token.blacklist()
+        refresh_token = request.data["refresh"]
+        token = RefreshToken(refresh_token)
+        if token[api_settings.USER_ID_CLAIM] != request.user.pk:
+            raise TokenError('Token belongs to another user')
+        revoked_tokens.revoke(token[api_settings.JTI_CLAIM], token['exp'])
+        # Revoke the access token used for this request as well, so it
+        # cannot be replayed until it expires.
+        if request.auth is not None and api_settings.JTI_CLAIM in request.auth:
+            revoked_tokens.revoke(request.auth[api_settings.JTI_CLAIM], request.auth['exp'])
         return Response({"message": "Successfully logged out"}, status=status.HTTP_205_RESET_CONTENT)
-    except Exception as e:
+    except (KeyError, TokenError):
         return Response({"error": "Invalid token"}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TokenRefreshView(TokenViewBase):
+    serializer_class = TokenRefreshSerializer
+
+
+token_refresh = TokenRefreshView.as_view()
+
+
 @api_view(['GET'])
+@read_from_replica
 def profile(request):
-    serializer = UserSerializer(request.user)
+    user = User.objects.select_related('userprofile__assigned_admin').get(pk=request.user.pk)
+    serializer = UserSerializer(user)
     return Response(serializer.data)
 
 
@@ -80,4 +111,4 @@ def web_logout(request):
     """Web logout view for admin panel"""
     django_logout(request)
     messages.success(request, "You have been logged out successfully.")
-    return redirect('login')
+    return redirect('web_login')
@@ -1,19 +1,13 @@
 from django.shortcuts import redirect
 from django.contrib import messages
-from accounts.models import UserProfile
 
 
 def admin_required(view_func):
     def wrapper(request, *args, **kwargs):
         if not request.user.is_authenticated:
-            return redirect('login')
+            return redirect('web_login')
         
-        try:
-            user_profile = request.user.userprofile
-            if user_profile.role not in ['admin', 'superadmin']:
-                messages.error(request, 'You do not have permission to access this page.')
-                return redirect('admin_panel:dashboard')
-        except UserProfile.DoesNotExist:
+        if not request.access.is_admin:
             messages.error(request, 'You do not have permission to access this page.')
             return redirect('admin_panel:dashboard')
         
@@ -24,14 +18,9 @@ def admin_required(view_func):
 def superadmin_required(view_func):
     def wrapper(request, *args, **kwargs):
         if not request.user.is_authenticated:
-            return redirect('login')
+            return redirect('web_login')
         
-        try:
-            user_profile = request.user.userprofile
-            if user_profile.role != 'superadmin':
-                messages.error(request, 'You do not have permission to access this page.')
-                return redirect('admin_panel:dashboard')
-        except UserProfile.DoesNotExist:
+        if not request.access.is_superadmin:
             messages.error(request, 'You do not have permission to access this page.')
             return redirect('admin_panel:dashboard')
         
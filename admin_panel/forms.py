@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.models import User
+from django.db import transaction
 from accounts.models import UserProfile
+from tasks.history import acting_user
 from tasks.models import Task
 
 
@@ -101,7 +103,8 @@ class TaskForm(forms.ModelForm):
             task.created_by = self.user
         
         if commit:
-            task.save()
+            with transaction.atomic(), acting_user(self.user.pk if self.user else None):
+                task.save()
         
         return task
     
@@ -0,0 +1,111 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from tasks.archive import archive_tasks
+from tasks.models import Task
+from tasks.tests import LOCMEM_CACHES
+
+DUE_DATE = '2030-01-01T00:00:00Z'
+
+
+def make_user(username, role='user', admin=None):
+    user = User.objects.create_user(username)
+    UserProfile.objects.create(user=user, role=role, assigned_admin=admin)
+    return user
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ListQueryCountTests(TestCase):
+    """The admin panel lists issue the same queries however many rows they show."""
+    
+    ROWS = 10
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.superadmin = make_user('root', 'superadmin')
+        # An empty page skips the row query, so every list starts with a row;
+        # the superadmin is already listed on the user and admin lists.
+        Task.objects.create(
+            title='fixture', description='d', assigned_to=cls.superadmin,
+            created_by=cls.superadmin, due_date=DUE_DATE,
+        )
+    
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.superadmin)
+        self.seeded = 0
+    
+    def seed(self, count):
+        """Add ``count`` admins, each with one user and one task."""
+        for _ in range(count):
+            self.seeded += 1
+            admin = make_user(f'admin{self.seeded}', 'admin')
+            user = make_user(f'user{self.seeded}', 'user', admin)
+            Task.objects.create(
+                title=f'task {self.seeded}', description='words ' * 50,
+                assigned_to=user, created_by=admin, due_date=DUE_DATE,
+            )
+    
+    def assert_constant_queries(self, url_name, expected):
+        url = reverse(url_name)
+        # Loads and caches the superadmin's access outside the counted requests.
+        self.client.get(url)
+        for rows in (0, self.ROWS, self.ROWS):
+            self.seed(rows)
+            with self.subTest(rows=self.seeded), self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+    
+    def test_user_list(self):
+        # Session, user, count and page.
+        self.assert_constant_queries('admin_panel:user_list', 4)
+    
+    def test_admin_list(self):
+        self.assert_constant_queries('admin_panel:admin_list', 4)
+    
+    def test_task_list(self):
+        self.assert_constant_queries('admin_panel:task_list', 4)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArchivedTaskReportTests(TestCase):
+    """Reports of archived tasks are shown to the users who may see them."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.other_admin = make_user('other', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        task = Task.objects.create(
+            title='archived', description='d', assigned_to=cls.user, created_by=cls.admin, due_date=DUE_DATE,
+            status='completed', completion_report='done', worked_hours='2.00',
+        )
+        archive_tasks(10, cutoff=timezone.now() + datetime.timedelta(days=1))
+        cls.url = reverse('admin_panel:task_report', args=[task.pk])
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_report_of_archived_task(self):
+        for viewer in (self.admin, self.user):
+            self.client.force_login(viewer)
+            response = self.client.get(self.url)
+            self.assertContains(response, 'archived')
+            # Archived tasks cannot be edited.
+            self.assertNotContains(response, 'Edit Task')
+    
+    def test_archived_task_of_another_admin(self):
+        self.client.force_login(self.other_admin)
+        self.assertRedirects(
+            self.client.get(self.url), reverse('admin_panel:task_list'), fetch_redirect_response=False
+        )
+    
+    def test_missing_task(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse('admin_panel:task_report', args=[999])).status_code, 404)
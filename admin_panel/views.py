@@ -2,73 +2,112 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
 from django.contrib import messages
-from django.db.models import Q
-from tasks.models import Task
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.http import Http404
+from django.utils.functional import SimpleLazyObject
+from task_manager.replicas import read_from_replica
+from tasks import archive, caching
+from tasks.filters import TASK_ORDERINGS, filter_tasks, task_ordering
+from tasks.models import Task, TaskArchive
+from tasks.stats import GLOBAL_SCOPE, admin_scope, get_stats, user_scope
 from accounts.models import UserProfile
 from .forms import UserForm, TaskForm, UserAssignmentForm
 from .decorators import admin_required, superadmin_required
 
 User = get_user_model()
 
+# The description is read as a preview (``with_description_preview``).
+TASK_LIST_FIELDS = [
+    'title', 'status', 'due_date', 'worked_hours', 'created_at',
+    'assigned_to__username', 'created_by__username',
+]
+
+RECENT_TASK_FIELDS = ['title', 'status', 'due_date', 'created_at', 'assigned_to__username']
+
+
+def _paginate(request, queryset):
+    """Return the requested page of ``queryset`` and the query string for page links."""
+    try:
+        page_size = int(request.GET.get('page_size', settings.ADMIN_PANEL_PAGE_SIZE))
+    except ValueError:
+        page_size = settings.ADMIN_PANEL_PAGE_SIZE
+    page_size = max(1, min(page_size, settings.ADMIN_PANEL_MAX_PAGE_SIZE))
+    
+    page = Paginator(queryset, page_size).get_page(request.GET.get('page'))
+    params = request.GET.copy()
+    params.pop('page', None)
+    return page, params.urlencode()
+
+
+def recent_tasks(access):
+    """The latest tasks shown on the dashboard of a user with ``access``."""
+    if access.role == 'superadmin':
+        tasks = Task.objects.all()
+    elif access.role == 'admin':
+        tasks = Task.objects.filter(assigned_to__userprofile__assigned_admin_id=access.user_id)
+    else:
+        tasks = Task.objects.filter(assigned_to_id=access.user_id)
+    return tasks.select_related('assigned_to').only(*RECENT_TASK_FIELDS)[:10]
+
+
+def user_rows():
+    return User.objects.select_related('userprofile__assigned_admin').order_by('id')
+
+
+def admin_rows():
+    return User.objects.filter(
+        userprofile__role__in=['admin', 'superadmin']
+    ).select_related('userprofile').order_by('id')
+
+
+def task_rows(tasks):
+    """``tasks`` with the columns the task list shows."""
+    return tasks.select_related('assigned_to', 'created_by').only(*TASK_LIST_FIELDS).with_description_preview()
+
 
 @login_required
+@read_from_replica
 def dashboard(request):
-    try:
-        user_profile = request.user.userprofile
-        user_role = user_profile.role
-    except UserProfile.DoesNotExist:
+    access = request.access
+    if not access.has_profile:
         # Create a default profile if it doesn't exist
-        user_profile = UserProfile.objects.create(user=request.user, role='user')
-        user_role = 'user'
+        UserProfile.objects.create(user=request.user, role='user')
     
-    if user_role == 'superadmin':
-        total_users = UserProfile.objects.filter(role='user').count()
-        total_admins = UserProfile.objects.filter(role='admin').count()
-        total_tasks = Task.objects.count()
-        completed_tasks = Task.objects.filter(status='completed').count()
-        
+    # Everything below is read lazily, so a cached dashboard fragment skips
+    # the queries entirely.
+    if access.role == 'superadmin':
         context = {
-            'total_users': total_users,
-            'total_admins': total_admins,
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'recent_tasks': Task.objects.all()[:10],
+            'stats': SimpleLazyObject(lambda: get_stats(GLOBAL_SCOPE)),
+            'recent_tasks': recent_tasks(access),
         }
-        
-    elif user_role == 'admin':
-        assigned_users = User.objects.filter(userprofile__assigned_admin=request.user)
-        total_users = assigned_users.count()
-        total_tasks = Task.objects.filter(assigned_to__in=assigned_users).count()
-        completed_tasks = Task.objects.filter(
-            assigned_to__in=assigned_users, 
-            status='completed'
-        ).count()
-        
+    
+    elif access.role == 'admin':
         context = {
-            'total_users': total_users,
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'recent_tasks': Task.objects.filter(assigned_to__in=assigned_users)[:10],
-            'assigned_users': assigned_users,
+            'stats': SimpleLazyObject(lambda: get_stats(admin_scope(access.user_id))),
+            'recent_tasks': recent_tasks(access),
+            'assigned_users': User.objects.filter(userprofile__assigned_admin=request.user),
         }
-        
+    
     else:
-        total_tasks = Task.objects.filter(assigned_to=request.user).count()
-        completed_tasks = Task.objects.filter(assigned_to=request.user, status='completed').count()
-        
         context = {
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'recent_tasks': Task.objects.filter(assigned_to=request.user)[:10],
+            'stats': SimpleLazyObject(lambda: get_stats(user_scope(access.user_id))),
+            'recent_tasks': recent_tasks(access),
         }
     
+    # A timeout of 0 makes the fragment cache store nothing.
+    context['cache_timeout'] = caching.cache_timeout()
+    if caching.enabled():
+        context['cache_version'] = caching.scope_signature(caching.access_scopes(access))
+    
     return render(request, 'admin_panel/dashboard.html', context)
 
 
 @superadmin_required
 def user_list(request):
-    users = User.objects.all()
-    return render(request, 'admin_panel/user_list.html', {'users': users})
+    page, querystring = _paginate(request, user_rows())
+    context = {'users': page, 'page_obj': page, 'querystring': querystring}
+    return render(request, 'admin_panel/user_list.html', context)
 
 
 @superadmin_required
@@ -116,8 +155,9 @@ def user_delete(request, pk):
 
 @superadmin_required
 def admin_list(request):
-    admins = User.objects.filter(userprofile__role__in=['admin', 'superadmin'])
-    return render(request, 'admin_panel/admin_list.html', {'admins': admins})
+    page, querystring = _paginate(request, admin_rows())
+    context = {'admins': page, 'page_obj': page, 'querystring': querystring}
+    return render(request, 'admin_panel/admin_list.html', context)
 
 
 @superadmin_required
@@ -165,34 +205,28 @@ def admin_delete(request, pk):
 
 @login_required
 def task_list(request):
-    try:
-        user_profile = request.user.userprofile
-        user_role = user_profile.role
-    except UserProfile.DoesNotExist:
-        user_role = 'user'
+    tasks = Task.objects.visible_to(request.access)
     
-    if user_role == 'superadmin':
-        tasks = Task.objects.all()
-    elif user_role == 'admin':
-        assigned_users = User.objects.filter(userprofile__assigned_admin=request.user)
-        tasks = Task.objects.filter(
-            Q(assigned_to__in=assigned_users) | Q(assigned_to=request.user)
-        )
-    else:
-        tasks = Task.objects.filter(assigned_to=request.user)
+    try:
+        tasks = filter_tasks(tasks, request.GET).order_by(*task_ordering(request.GET))
+    except ValueError as e:
+        messages.error(request, str(e))
     
-    return render(request, 'admin_panel/task_list.html', {'tasks': tasks})
+    page, querystring = _paginate(request, task_rows(tasks))
+    context = {
+        'tasks': page,
+        'page_obj': page,
+        'querystring': querystring,
+        'filters': request.GET,
+        'status_choices': Task.STATUS_CHOICES,
+        'orderings': TASK_ORDERINGS,
+    }
+    return render(request, 'admin_panel/task_list.html', context)
 
 
 @login_required
 def task_create(request):
-    try:
-        user_profile = request.user.userprofile
-        user_role = user_profile.role
-    except UserProfile.DoesNotExist:
-        user_role = 'user'
-    
-    if user_role == 'user':
+    if request.access.role == 'user':
         messages.error(request, 'You do not have permission to create tasks.')
         return redirect('admin_panel:task_list')
     
@@ -211,27 +245,15 @@ def task_create(request):
 @login_required
 def task_update(request, pk):
     task = get_object_or_404(Task, pk=pk)
+    access = request.access
     
-    try:
-        user_profile = request.user.userprofile
-        user_role = user_profile.role
-    except UserProfile.DoesNotExist:
-        user_role = 'user'
-    
-    if user_role == 'user' and task.assigned_to != request.user:
+    if access.role == 'user' and task.assigned_to_id != access.user_id:
         messages.error(request, 'You can only update your own tasks.')
         return redirect('admin_panel:task_list')
     
-    if user_role == 'admin':
-        try:
-            task_assigned_admin = task.assigned_to.userprofile.assigned_admin
-            if task_assigned_admin != request.user and task.assigned_to != request.user:
-                messages.error(request, 'You can only update tasks assigned to your users.')
-                return redirect('admin_panel:task_list')
-        except UserProfile.DoesNotExist:
-            if task.assigned_to != request.user:
-                messages.error(request, 'You can only update tasks assigned to your users.')
-                return redirect('admin_panel:task_list')
+    if access.role == 'admin' and not access.manages(task.assigned_to_id) and task.assigned_to_id != access.user_id:
+        messages.error(request, 'You can only update tasks assigned to your users.')
+        return redirect('admin_panel:task_list')
     
     if request.method == 'POST':
         form = TaskForm(request.POST, instance=task, user=request.user)
@@ -247,34 +269,28 @@ def task_update(request, pk):
 
 @login_required
 def task_report(request, pk):
-    task = get_object_or_404(Task, pk=pk)
+    # Reports of archived tasks stay available, read from the archive.
+    task = archive.get_task(pk, 'assigned_to', 'created_by')
+    if task is None:
+        raise Http404
     
     if task.status != 'completed':
         messages.error(request, 'Report is only available for completed tasks.')
         return redirect('admin_panel:task_list')
     
-    try:
-        user_profile = request.user.userprofile
-        user_role = user_profile.role
-    except UserProfile.DoesNotExist:
-        user_role = 'user'
-    
-    if user_role == 'user' and task.assigned_to != request.user:
+    access = request.access
+    if access.role == 'user' and task.assigned_to_id != access.user_id:
         messages.error(request, 'You can only view reports for your own tasks.')
         return redirect('admin_panel:task_list')
     
-    if user_role == 'admin':
-        try:
-            task_assigned_admin = task.assigned_to.userprofile.assigned_admin
-            if task_assigned_admin != request.user and task.assigned_to != request.user:
-                messages.error(request, 'You can only view reports for your users.')
-                return redirect('admin_panel:task_list')
-        except UserProfile.DoesNotExist:
-            if task.assigned_to != request.user:
-                messages.error(request, 'You can only view reports for your users.')
-                return redirect('admin_panel:task_list')
+    if access.role == 'admin' and not access.manages(task.assigned_to_id) and task.assigned_to_id != access.user_id:
+        messages.error(request, 'You can only view reports for your users.')
+        return redirect('admin_panel:task_list')
     
-    return render(request, 'admin_panel/task_report.html', {'task': task})
+    return render(request, 'admin_panel/task_report.html', {
+        'task': task,
+        'archived': isinstance(task, TaskArchive),
+    })
 
 
 @superadmin_required
@@ -284,8 +300,7 @@ def assign_user_to_admin(request):
         if form.is_valid():
             user = form.cleaned_data['user']
             admin = form.cleaned_data['admin']
-            user.assigned_admin = admin
-            user.save()
+            UserProfile.objects.update_or_create(user=user, defaults={'assigned_admin': admin})
             messages.success(request, f'User {user.username} assigned to admin {admin.username}.')
             return redirect('admin_panel:user_list')
     else:
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+# Persistent connections leak under ASGI, where requests are not tied to one
+# thread; use DB_POOL_SIZE to reuse connections instead.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,57 @@
+"""
+Plumbing for the native async API views served under ASGI.
+
+DRF views are synchronous, so the async views use ``async_api_view`` for
+what ``@api_view`` and ``IsAuthenticated`` provide: method checks, bearer
+token or session authentication (setting ``request.access``) and JSON
+error responses rendered the same way DRF renders them.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+
+from accounts.authentication import StatelessJWTAuthentication, authenticate_access
+
+_renderer = JSONRenderer()
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return HttpResponse(_renderer.render(data), status=status, content_type=_renderer.media_type)
+
+
+def _unauthorized(detail):
+    data = detail if isinstance(detail, dict) else {'detail': detail}
+    response = json_response(data, status=status.HTTP_401_UNAUTHORIZED)
+    response['WWW-Authenticate'] = StatelessJWTAuthentication().authenticate_header(None)
+    return response
+
+
+def async_api_view(methods):
+    allowed = set(methods) | ({'HEAD'} if 'GET' in methods else set())
+    
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in allowed:
+                response = json_response(
+                    {'detail': f'Method "{request.method}" not allowed.'},
+                    status=status.HTTP_405_METHOD_NOT_ALLOWED,
+                )
+                response['Allow'] = ', '.join(methods)
+                return response
+            
+            try:
+                access = await sync_to_async(authenticate_access)(request)
+            except AuthenticationFailed as e:
+                return _unauthorized(e.detail)
+            if access is None:
+                return _unauthorized('Authentication credentials were not provided.')
+            
+            request.access = access
+            return await view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,111 @@
+"""
+In-process connection pool shared by the database backends.
+
+With ``OPTIONS['pool'] = {'max_size': n, 'timeout': seconds}`` a worker
+process holds at most ``n`` connections to the database. Closing a Django
+connection hands the driver connection back to the pool instead of closing
+it, and opening one reuses an idle connection when there is one, waiting up
+to ``timeout`` seconds for a free slot otherwise.
+"""
+import functools
+import threading
+from contextlib import closing
+
+from django.db import OperationalError
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, max_size, timeout=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = []
+        self._lock = threading.Lock()
+    
+    def acquire(self, connect, check=None):
+        """
+        Return an idle connection that passes ``check``, or a new one from
+        ``connect()``.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                f'No database connection became free within {self.timeout}s '
+                f'(pool max_size is {self.max_size}).'
+            )
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    return connect()
+                if check is None or check(conn):
+                    return conn
+                _discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+    
+    def release(self, conn, reuse=True):
+        try:
+            if reuse:
+                with self._lock:
+                    self._idle.append(conn)
+            else:
+                _discard(conn)
+        finally:
+            self._slots.release()
+
+
+def _discard(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _usable(conn):
+    try:
+        with closing(conn.cursor()) as cursor:
+            cursor.execute('SELECT 1')
+    except Exception:
+        return False
+    return True
+
+
+def get_pool(alias, max_size, timeout=30):
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(max_size, timeout)
+        return _pools[alias]
+
+
+class PooledConnectionMixin:
+    """Database wrapper mixin taking connections from the alias's pool when configured."""
+    
+    def _pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        return get_pool(self.alias, **options) if options else None
+    
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+    
+    def get_new_connection(self, conn_params):
+        pool = self._pool()
+        connect = functools.partial(super().get_new_connection, conn_params)
+        if pool is None:
+            return connect()
+        return pool.acquire(connect, _usable if self.settings_dict['CONN_HEALTH_CHECKS'] else None)
+    
+    def _close(self):
+        pool = self._pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        # A connection closed inside a transaction or after an error may be
+        # left in a state the next user would inherit, so it is not reused.
+        reuse = self.autocommit and not self.in_atomic_block and not self.errors_occurred
+        pool.release(self.connection, reuse)
@@ -0,0 +1,8 @@
+"""PostgreSQL backend with the optional in-process connection pool."""
+from django.db.backends.postgresql import base
+
+from ..pool import PooledConnectionMixin
+
+
+class DatabaseWrapper(PooledConnectionMixin, base.DatabaseWrapper):
+    pass
@@ -0,0 +1,31 @@
+"""
+SQLite backend with connection pragmas and a configurable transaction mode.
+
+``OPTIONS['pragmas']`` maps pragma names to the values set on every new
+connection. ``OPTIONS['transaction_mode']`` (``DEFERRED``, ``IMMEDIATE`` or
+``EXCLUSIVE``) is used to begin atomic blocks: an ``IMMEDIATE`` transaction
+takes the write lock when it begins, so a transaction that reads before it
+writes, like a task update, waits up to ``busy_timeout`` for other writers
+instead of failing with "database is locked" when one commits first.
+"""
+from django.db.backends.sqlite3 import base
+
+from ..pool import PooledConnectionMixin
+
+
+class DatabaseWrapper(PooledConnectionMixin, base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+    
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+    
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
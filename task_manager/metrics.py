@@ -0,0 +1,284 @@
+"""
+In-process request metrics exposed in the Prometheus text format.
+
+``RequestMetricsMiddleware`` records, per resolved URL name, the wall time,
+database time, query count, duplicate-query count and DRF serializer time of
+every request into fixed-bucket histograms. ``metrics_view`` renders them at
+``/metrics``. Optionally a sample of requests is traced for N+1 query
+patterns, which are logged together with the stack that issued them.
+"""
+import bisect
+import hmac
+import logging
+import random
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Wall time of the request.', SECONDS_BUCKETS),
+    'http_request_db_duration_seconds': ('Time spent executing database queries.', SECONDS_BUCKETS),
+    'http_request_db_queries': ('Database queries issued by the request.', COUNT_BUCKETS),
+    'http_request_db_duplicate_queries': (
+        'Queries repeating an SQL statement already run by the request.', COUNT_BUCKETS,
+    ),
+    'http_request_serializer_duration_seconds': (
+        'Time spent producing serializer data (DRF and the fast task list path).', SECONDS_BUCKETS,
+    ),
+}
+
+# Frames from these paths are dropped from N+1 stack traces.
+LIBRARY_PATHS = ('site-packages', 'dist-packages', '/lib/python')
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+    
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._requests = {}
+    
+    def record(self, view, method, status, observations):
+        with self._lock:
+            key = (view, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for name, value in observations.items():
+                histogram = self._histograms.get((name, view))
+                if histogram is None:
+                    histogram = self._histograms[(name, view)] = Histogram(HISTOGRAMS[name][1])
+                histogram.observe(value)
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+    
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            requests = sorted(self._requests.items())
+            histograms = sorted(
+                (key, list(h.counts), h.total, h.count) for key, h in self._histograms.items()
+            )
+        
+        lines = [
+            '# HELP http_requests_total Requests handled, by URL name, method and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (view, method, status), count in requests:
+            lines.append(f'http_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+        
+        for name, (help_text, bounds) in HISTOGRAMS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (metric, view), counts, total, count in histograms:
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket in zip(bounds + ('+Inf',), counts):
+                    cumulative += bucket
+                    lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{view="{view}"}} {total:.6f}')
+                lines.append(f'{name}_count{{view="{view}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class RequestStats:
+    __slots__ = ('db_time', 'queries', 'statements', 'serializer_time', 'stacks')
+    
+    def __init__(self, trace):
+        self.db_time = 0.0
+        self.queries = 0
+        self.statements = {}
+        self.serializer_time = 0.0
+        self.stacks = {} if trace else None
+    
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] = self.statements.get(sql, 0) + 1
+            if self.stacks is not None and sql not in self.stacks:
+                self.stacks[sql] = [
+                    frame for frame in traceback.extract_stack()[:-1]
+                    if frame.filename != __file__
+                    and not any(path in frame.filename for path in LIBRARY_PATHS)
+                ]
+    
+    @property
+    def duplicates(self):
+        return self.queries - len(self.statements)
+
+
+@contextmanager
+def serializing():
+    """
+    Count the block as serializer time of the current request. Serializers
+    that bypass ``BaseSerializer.data``, such as ``tasks.fast_serializers``,
+    wrap their rendering in it.
+    """
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_time += time.perf_counter() - started
+
+
+def _instrument_serializers():
+    """Time ``BaseSerializer.data`` so serializer cost is attributed to the request."""
+    from rest_framework.serializers import BaseSerializer
+    
+    original = BaseSerializer.data
+    if getattr(original.fget, 'metrics_instrumented', False):
+        return
+    
+    def data(self):
+        with serializing():
+            return original.fget(self)
+    
+    data.metrics_instrumented = True
+    BaseSerializer.data = property(data)
+
+
+def _execute(execute, sql, params, many, context):
+    # Queries count towards the request in the current context, which
+    # sync_to_async carries into the thread running an async view's ORM calls.
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def _install_execute_wrapper(sender=None, connection=None, **kwargs):
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+def _instrument_connections():
+    """Wrap every connection, whichever thread opens it, with ``_execute``."""
+    connection_created.connect(_install_execute_wrapper, dispatch_uid='request_metrics')
+    for connection in connections.all(initialized_only=True):
+        _install_execute_wrapper(connection=connection)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.sample_rate = getattr(settings, 'METRICS_N_PLUS_ONE_SAMPLE_RATE', 0.0)
+        self.threshold = getattr(settings, 'METRICS_N_PLUS_ONE_THRESHOLD', 5)
+        if self.enabled:
+            _instrument_serializers()
+            _instrument_connections()
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        
+        stats, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, started)
+    
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        
+        stats, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, started)
+    
+    def start(self):
+        stats = RequestStats(trace=self.sample_rate > 0 and random.random() < self.sample_rate)
+        return stats, _current.set(stats), time.perf_counter()
+    
+    def finish(self, request, response, stats, started):
+        view = _view_name(request)
+        registry.record(view, request.method, response.status_code, {
+            'http_request_duration_seconds': time.perf_counter() - started,
+            'http_request_db_duration_seconds': stats.db_time,
+            'http_request_db_queries': stats.queries,
+            'http_request_db_duplicate_queries': stats.duplicates,
+            'http_request_serializer_duration_seconds': stats.serializer_time,
+        })
+        if stats.stacks is not None:
+            self.report_n_plus_one(view, stats)
+        return response
+    
+    def report_n_plus_one(self, view, stats):
+        for sql, count in stats.statements.items():
+            if count >= self.threshold:
+                logger.warning(
+                    'N+1 query in %s: executed %d times\n%s\nFirst issued from:\n%s',
+                    view, count, sql, ''.join(traceback.format_list(stats.stacks[sql])),
+                )
+
+
+def metrics_view(request):
+    """
+    Serve the collected metrics. Requires a superadmin session or an
+    ``Authorization: Bearer <METRICS_TOKEN>`` header.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.headers.get('Authorization', '')
+    authorized = bool(token) and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+    if not authorized and not (request.user.is_authenticated and request.access.is_superadmin):
+        return HttpResponseForbidden('Forbidden')
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
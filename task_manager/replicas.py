@@ -0,0 +1,114 @@
+"""
+Read-replica routing.
+
+Views decorated with ``read_from_replica`` send their ORM reads to one of the
+``DB_REPLICAS`` databases, picked per request; everything else, and every
+write, uses ``default``. ``ReplicaPinMiddleware`` marks a user in the cache
+after each successful unsafe request they make, and for the next
+``DB_REPLICA_PIN_SECONDS`` their reads stay on ``default``, so users see
+their own writes before the replicas have caught up.
+"""
+import functools
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica = ContextVar('read_replica', default=None)
+
+
+def _pin_key(user_id):
+    return f'replicas:pin:{user_id}'
+
+
+def current_replica():
+    """Alias of the replica serving the current view's reads, or ``None``."""
+    return _replica.get()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _replica.get()
+    
+    def db_for_write(self, model, **hints):
+        # Without an answer Django would write an instance back to the
+        # database it was read from.
+        return DEFAULT_DB_ALIAS
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        return db not in settings.DB_REPLICA_ALIASES
+
+
+def _choose(user_id, pinned):
+    if not settings.DB_REPLICA_ALIASES or not user_id or pinned:
+        return None
+    return random.choice(settings.DB_REPLICA_ALIASES)
+
+
+def read_from_replica(view):
+    """Route the reads of ``view`` to a replica unless its user is pinned to the primary."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            user_id = request.access.user_id
+            pinned = settings.DB_REPLICA_ALIASES and user_id and await cache.aget(_pin_key(user_id))
+            token = _replica.set(_choose(user_id, pinned))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica.reset(token)
+        return wrapped
+    
+    @functools.wraps(view)
+    def wrapped(request, *args, **kwargs):
+        user_id = request.access.user_id
+        pinned = settings.DB_REPLICA_ALIASES and user_id and cache.get(_pin_key(user_id))
+        token = _replica.set(_choose(user_id, pinned))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+    return wrapped
+
+
+def pin_to_primary(user):
+    if user.is_authenticated:
+        cache.set(_pin_key(user.pk), True, settings.DB_REPLICA_PIN_SECONDS)
+
+
+class ReplicaPinMiddleware:
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        if not settings.DB_REPLICA_ALIASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            # DRF views store the user they authenticated on the request.
+            pin_to_primary(request.user)
+        return response
+    
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            await sync_to_async(pin_to_primary)(request.user)
+        return response
@@ -1,5 +1,6 @@
+import tempfile
 from pathlib import Path
-from decouple import config
+from decouple import Choices, Csv, config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -33,11 +34,14 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'task_manager.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.UserAccessMiddleware',
+    'task_manager.replicas.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -55,6 +59,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.access',
             ],
         },
     },
@@ -62,13 +67,114 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'task_manager.wsgi.application'
 
+# Database: sqlite or postgresql (needs psycopg2 or psycopg). Connections are
+# kept open for DB_CONN_MAX_AGE seconds and checked before reuse. A
+# DB_POOL_SIZE above 0 caps each worker process at that many connections,
+# which are returned to the pool at the end of every request instead of
+# being held by the thread that served it.
+DATABASE_ENGINES = {
+    'sqlite': 'task_manager.db_backends.sqlite3',
+    'postgresql': 'task_manager.db_backends.postgresql',
+}
+DB_ENGINE = config('DB_ENGINE', default='sqlite', cast=Choices(list(DATABASE_ENGINES)))
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=0, cast=int)
+DB_OPTIONS = {}
+if DB_POOL_SIZE > 0:
+    DB_OPTIONS['pool'] = {'max_size': DB_POOL_SIZE, 'timeout': config('DB_POOL_TIMEOUT', default=30, cast=int)}
+if DB_ENGINE == 'sqlite':
+    # WAL lets readers run alongside the writer; writers queue for up to
+    # busy_timeout milliseconds instead of failing with "database is locked".
+    DB_OPTIONS['pragmas'] = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': config('DB_SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+    }
+    DB_OPTIONS['transaction_mode'] = 'IMMEDIATE'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DATABASE_ENGINES[DB_ENGINE],
+        'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3') if DB_ENGINE == 'sqlite' else 'task_manager'),
+        'USER': config('DB_USER', default=''),
+        'PASSWORD': config('DB_PASSWORD', default=''),
+        'HOST': config('DB_HOST', default=''),
+        'PORT': config('DB_PORT', default=''),
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE > 0 else config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': DB_OPTIONS,
     }
 }
 
+# Read replicas: comma-separated SQLite files, or PostgreSQL hosts ("host" or
+# "host:port") sharing the other connection settings. Task lists, reports,
+# profiles and the dashboard read from them, except for users who wrote in
+# the last DB_REPLICA_PIN_SECONDS.
+DB_REPLICAS = config('DB_REPLICAS', default='', cast=Csv())
+DB_REPLICA_ALIASES = []
+for number, replica in enumerate(DB_REPLICAS, 1):
+    if DB_ENGINE == 'sqlite':
+        location = {'NAME': replica}
+    else:
+        host, _, port = replica.partition(':')
+        location = {'HOST': host, 'PORT': port or DATABASES['default']['PORT']}
+    alias = f'replica_{number}'
+    DATABASES[alias] = {**DATABASES['default'], **location, 'TEST': {'MIRROR': 'default'}}
+    DB_REPLICA_ALIASES.append(alias)
+DB_REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=10, cast=int)
+DATABASE_ROUTERS = ['task_manager.replicas.ReplicaRouter']
+
+# Password hashing: pbkdf2, argon2 (needs argon2-cffi) or scrypt. The other
+# hashers stay listed so existing passwords verify; changing the hasher or
+# its cost rehashes each password on its next login. A cost of 0 keeps
+# Django's default.
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'accounts.hashers.ConfigurablePBKDF2PasswordHasher',
+    'argon2': 'accounts.hashers.ConfigurableArgon2PasswordHasher',
+    'scrypt': 'accounts.hashers.ConfigurableScryptPasswordHasher',
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2', cast=Choices(list(PASSWORD_HASHER_CLASSES)))
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+PBKDF2_ITERATIONS = config('PBKDF2_ITERATIONS', default=0, cast=int)
+ARGON2_TIME_COST = config('ARGON2_TIME_COST', default=0, cast=int)
+ARGON2_MEMORY_COST = config('ARGON2_MEMORY_COST', default=0, cast=int)
+SCRYPT_WORK_FACTOR = config('SCRYPT_WORK_FACTOR', default=0, cast=int)
+
+# Login attempts allowed per username and per client address in each fixed
+# window of the rate's period. Rejected before any password hashing.
+LOGIN_THROTTLE_USERNAME_RATE = config('LOGIN_THROTTLE_USERNAME_RATE', default='10/min')
+LOGIN_THROTTLE_IP_RATE = config('LOGIN_THROTTLE_IP_RATE', default='60/min')
+
+# Cache shared by access lookups, login throttling and cached task reads.
+# The default file cache is shared by every worker process on one host; use
+# redis (requires the `redis` package) when workers run on several hosts.
+# locmem is per process, so writes in one worker do not invalidate the task
+# reads cached by the others.
+CACHE_BACKENDS = {
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+DEFAULT_CACHE_LOCATIONS = {
+    'file': str(Path(tempfile.gettempdir()) / 'task_manager_cache'),
+    'locmem': 'task-manager',
+    'redis': 'redis://127.0.0.1:6379/0',
+}
+CACHE_BACKEND = config('CACHE_BACKEND', default='file', cast=Choices(list(CACHE_BACKENDS)))
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': config('CACHE_LOCATION', default=DEFAULT_CACHE_LOCATIONS[CACHE_BACKEND]),
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='task_manager'),
+    },
+}
+
+# Lifetime of cached task list pages and dashboard fragments; writes
+# invalidate them sooner. 0 disables both (the scope versions behind them are
+# still kept, as the task list's ETag).
+TASK_CACHE_TIMEOUT = config('TASK_CACHE_TIMEOUT', default=300, cast=int)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -101,6 +207,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'accounts.authentication.StatelessJWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
@@ -117,6 +227,9 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# How often each worker pulls revocations made by other workers.
+JWT_REVOCATION_SYNC_SECONDS = config('JWT_REVOCATION_SYNC_SECONDS', default=30, cast=int)
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -126,6 +239,49 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Deletions are kept for the changes feed this long; older sync cursors
+# must resync. Compact with `python manage.py compact_task_tombstones`.
+TASK_TOMBSTONE_RETENTION_DAYS = config('TASK_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+
+# The changes feed only returns rows written more than this many seconds
+# ago, so a transaction committing within that time of its writes is not
+# skipped by readers already past its position.
+TASK_CHANGES_SAFETY_LAG = config('TASK_CHANGES_SAFETY_LAG', default=5, cast=int)
+
+# Completed tasks not updated for TASK_ARCHIVE_AFTER_DAYS are moved to the
+# archive table by `python manage.py archive_tasks`.
+TASK_ARCHIVE_AFTER_DAYS = config('TASK_ARCHIVE_AFTER_DAYS', default=180, cast=int)
+TASK_ARCHIVE_BATCH_SIZE = config('TASK_ARCHIVE_BATCH_SIZE', default=1000, cast=int)
+
+# Serve task_list, task_report and profile with native async views. asgi.py
+# enables this by default; under WSGI the DRF views are used.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Server-sent task events (GET /api/tasks/events/, ASGI only). Connections
+# are closed after TASK_EVENTS_MAX_CONNECTION_SECONDS and clients reconnect.
+TASK_EVENTS_QUEUE_SIZE = config('TASK_EVENTS_QUEUE_SIZE', default=100, cast=int)
+TASK_EVENTS_HEARTBEAT_SECONDS = config('TASK_EVENTS_HEARTBEAT_SECONDS', default=20, cast=int)
+TASK_EVENTS_MAX_CONNECTION_SECONDS = config('TASK_EVENTS_MAX_CONNECTION_SECONDS', default=600, cast=int)
+
+# Task reminders (`python manage.py run_task_reminders`). Tasks not completed
+# are reminded once when due within TASK_REMINDER_DUE_SOON_HOURS and once when
+# overdue. Reminders are listed at GET /api/tasks/notifications/ and also
+# emailed to the assignee when TASK_REMINDER_EMAIL is set.
+TASK_REMINDER_DUE_SOON_HOURS = config('TASK_REMINDER_DUE_SOON_HOURS', default=24, cast=int)
+TASK_REMINDER_BATCH_SIZE = config('TASK_REMINDER_BATCH_SIZE', default=1000, cast=int)
+TASK_REMINDER_WORKERS = config('TASK_REMINDER_WORKERS', default=4, cast=int)
+TASK_REMINDER_EMAIL = config('TASK_REMINDER_EMAIL', default=False, cast=bool)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+
+ADMIN_PANEL_PAGE_SIZE = config('ADMIN_PANEL_PAGE_SIZE', default=25, cast=int)
+ADMIN_PANEL_MAX_PAGE_SIZE = 200
+
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# Fraction of requests traced for N+1 query patterns (0 disables tracing).
+METRICS_N_PLUS_ONE_SAMPLE_RATE = config('METRICS_N_PLUS_ONE_SAMPLE_RATE', default=0.0, cast=float)
+METRICS_N_PLUS_ONE_THRESHOLD = config('METRICS_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+
 LOGIN_URL = '/admin/login/'
 LOGIN_REDIRECT_URL = '/admin/'
 LOGOUT_REDIRECT_URL = '/admin/login/'
@@ -3,9 +3,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from accounts import views as account_views
+from task_manager.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/auth/', include('accounts.urls')),
     path('accounts/', include([
         path('login/', account_views.web_login, name='web_login'),
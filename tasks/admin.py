@@ -1,12 +1,15 @@
 from django.contrib import admin
+from django.db.models import Q
+from .history import acting_user
 from .models import Task
+from .search import search_condition
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ('title', 'assigned_to', 'created_by', 'status', 'due_date', 'worked_hours', 'created_at')
     list_filter = ('status', 'created_at', 'due_date')
-    search_fields = ('title', 'description', 'assigned_to__username', 'created_by__username')
+    search_fields = ('assigned_to__username', 'created_by__username')
     readonly_fields = ('created_at', 'updated_at')
     
     fieldsets = (
@@ -23,12 +26,28 @@ class TaskAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_search_results(self, request, queryset, search_term):
+        # Title, description and completion report go through the full-text
+        # index instead of icontains scans; usernames still match by substring.
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        condition = search_condition(search_term, queryset.db)
+        for field in self.search_fields:
+            condition |= Q(**{f'{field}__icontains': search_term})
+        return queryset.filter(condition), False
+    
+    def save_model(self, request, obj, form, change):
+        with acting_user(request.user.pk):
+            super().save_model(request, obj, form, change)
+    
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        if request.user.is_superuser:
-            return qs
-        elif request.user.role == 'superadmin':
+        access = request.access
+        if request.user.is_superuser or access.is_superadmin:
             return qs
-        elif request.user.role == 'admin':
-            return qs.filter(assigned_to__assigned_admin=request.user) | qs.filter(created_by=request.user)
-        return qs.filter(assigned_to=request.user)
+        elif access.role == 'admin':
+            return qs.filter(
+                Q(assigned_to__userprofile__assigned_admin_id=access.user_id) | Q(created_by_id=access.user_id)
+            )
+        return qs.filter(assigned_to_id=access.user_id)
@@ -0,0 +1,285 @@
+"""
+Worked-hours and completion analytics.
+
+Completed tasks are rolled up per assignee and local day of ``completed_at``
+into ``TaskCompletionRollup``. The rollup is kept current incrementally: model
+signals and the bulk write paths turn each write into a delta that is applied
+to the affected rows. Queries whose range falls on whole days are answered
+from the rollup; ranges with a time of day aggregate the tasks themselves.
+"""
+import datetime
+import itertools
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .filters import parse_bound
+from .models import TASK_MODELS, Task, TaskCompletionRollup
+
+GROUPINGS = ('user', 'admin', 'day', 'week', 'month')
+
+PERIODS = {
+    'day': lambda field: TruncDate(field) if field == 'completed_at' else F(field),
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+# Per source: the assignee field, the field periods are taken from and the
+# aggregates producing each counter.
+SOURCES = {
+    'rollup': ('user', 'day', {
+        'completed': Sum('completed'),
+        'on_time': Sum('on_time'),
+        'late': Sum('late'),
+        'worked_hours': Sum('worked_hours'),
+    }),
+    'tasks': ('assigned_to', 'completed_at', {
+        'completed': Count('id'),
+        'on_time': Count('id', filter=Q(completed_at__lte=F('due_date'))),
+        'late': Count('id', filter=Q(completed_at__gt=F('due_date'))),
+        'worked_hours': Sum('worked_hours'),
+    }),
+}
+
+ROLLUP_COUNTERS = ('completed', 'on_time', 'late', 'worked_hours')
+
+HOURS = DecimalField(max_digits=12, decimal_places=2)
+
+UNKNOWN = object()
+
+
+def completion_entry(assigned_to_id, status, completed_at, worked_hours, due_date):
+    """
+    Return the rollup key and counters a task contributes, or ``None`` when
+    it is not completed.
+    """
+    if status != 'completed' or completed_at is None:
+        return None
+    # Values assigned in code may not have been converted yet, e.g. a due
+    # date passed as a string to ``Task.objects.create``.
+    due_date = Task._meta.get_field('due_date').to_python(due_date)
+    worked_hours = Task._meta.get_field('worked_hours').to_python(worked_hours)
+    on_time = int(completed_at <= due_date)
+    return (
+        (assigned_to_id, timezone.localdate(completed_at)),
+        (1, on_time, 1 - on_time, worked_hours or Decimal(0)),
+    )
+
+
+def task_entry(task):
+    return completion_entry(task.assigned_to_id, task.status, task.completed_at, task.worked_hours, task.due_date)
+
+
+def loaded_entry(task):
+    """Like ``task_entry`` but from ``__dict__``; ``UNKNOWN`` if a field was deferred."""
+    fields = ('assigned_to_id', 'status', 'completed_at', 'worked_hours', 'due_date')
+    if any(field not in task.__dict__ for field in fields):
+        return UNKNOWN
+    return completion_entry(*(task.__dict__[field] for field in fields))
+
+
+def add_delta(deltas, entry, sign=1):
+    """Accumulate ``entry`` into ``deltas``, a ``defaultdict`` of counter lists keyed by rollup key."""
+    if entry is None:
+        return
+    key, counters = entry
+    totals = deltas[key]
+    for i, value in enumerate(counters):
+        totals[i] += sign * value
+
+
+def new_deltas():
+    return defaultdict(lambda: [0, 0, 0, Decimal(0)])
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Apply counter deltas to the rollup with one UPDATE per (user, day).
+    
+    Missing rows are created for positive deltas; negative deltas against a
+    missing row are dropped, which happens when the assignee is being deleted
+    and its rollup rows have already gone with it.
+    """
+    for (user_id, day), counters in deltas.items():
+        if not any(counters):
+            continue
+        changes = {name: F(name) + value for name, value in zip(ROLLUP_COUNTERS, counters)}
+        rows = TaskCompletionRollup.objects.filter(user_id=user_id, day=day)
+        if rows.update(**changes) or counters[0] <= 0:
+            continue
+        try:
+            with transaction.atomic():
+                TaskCompletionRollup.objects.create(
+                    user_id=user_id, day=day, **dict(zip(ROLLUP_COUNTERS, counters))
+                )
+        except IntegrityError:
+            # Created concurrently by another writer.
+            rows.update(**changes)
+
+
+def _merge_rows(row_sets, keys, counters):
+    """
+    Combine the aggregate rows of ``row_sets``, one per table in
+    ``TASK_MODELS``, that share the values of ``keys`` by summing their
+    ``counters``.
+    """
+    merged = {}
+    for row in itertools.chain.from_iterable(row_sets):
+        total = merged.setdefault(tuple(row[key] for key in keys), row)
+        if total is not row:
+            for counter in counters:
+                total[counter] = (total[counter] or 0) + (row[counter] or 0)
+    return list(merged.values())
+
+
+def _rollup_rows(**filters):
+    """Completion totals per assignee and day over the live and archived tasks matching ``filters``."""
+    row_sets = [
+        model.objects.filter(**filters, status='completed', completed_at__isnull=False).order_by()
+        .values('assigned_to_id', day=TruncDate('completed_at')).annotate(
+            completed=Count('id'),
+            on_time=Count('id', filter=Q(completed_at__lte=F('due_date'))),
+            worked_hours=Coalesce(Sum('worked_hours'), Value(0), output_field=HOURS),
+        )
+        for model in TASK_MODELS
+    ]
+    return _merge_rows(row_sets, ('assigned_to_id', 'day'), ('completed', 'on_time', 'worked_hours'))
+
+
+def _rollups(rows):
+    return [
+        TaskCompletionRollup(
+            user_id=row['assigned_to_id'],
+            day=row['day'],
+            completed=row['completed'],
+            on_time=row['on_time'],
+            late=row['completed'] - row['on_time'],
+            worked_hours=row['worked_hours'],
+        )
+        for row in rows
+    ]
+
+
+def refresh_user_rollups(user_id):
+    """Recompute the rollup rows of one assignee."""
+    with transaction.atomic():
+        TaskCompletionRollup.objects.filter(user_id=user_id).delete()
+        TaskCompletionRollup.objects.bulk_create(_rollups(_rollup_rows(assigned_to_id=user_id)))
+
+
+def rebuild_rollups():
+    """Recompute every rollup row with one grouped aggregate and replace the table."""
+    rollups = _rollups(_rollup_rows())
+    with transaction.atomic():
+        TaskCompletionRollup.objects.all().delete()
+        TaskCompletionRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def _parse_day(value, end=False):
+    """Return ``(date, datetime)`` for a range bound; the date is ``None`` for datetimes."""
+    if value is None:
+        return None, None
+    return parse_date(value), parse_bound(value, end=end)
+
+
+def parse_group_by(value):
+    groups = [group for group in (value or '').split(',') if group]
+    invalid = [group for group in groups if group not in GROUPINGS]
+    if invalid:
+        raise ValueError(f'group_by must be a comma-separated list of: {", ".join(GROUPINGS)}')
+    if len({'day', 'week', 'month'} & set(groups)) > 1:
+        raise ValueError('group_by can contain only one of day, week or month')
+    return list(dict.fromkeys(groups))
+
+
+def completion_sources(access, params):
+    """
+    Return ``(source, querysets)``: the rollup rows, or the completed live and
+    archived tasks, visible to ``access`` within ``date_from``/``date_to``.
+    """
+    day_from, time_from = _parse_day(params.get('date_from') or None)
+    day_to, time_to = _parse_day(params.get('date_to') or None, end=True)
+    
+    from_rollup = (time_from is None or day_from is not None) and (time_to is None or day_to is not None)
+    if from_rollup:
+        source = 'rollup'
+        filters = {}
+        if day_from:
+            filters['day__gte'] = day_from
+        if day_to:
+            filters['day__lte'] = day_to
+        querysets = [TaskCompletionRollup.objects.visible_to(access).filter(**filters)]
+    else:
+        source = 'tasks'
+        filters = {'status': 'completed', 'completed_at__isnull': False}
+        if time_from:
+            filters['completed_at__gte'] = time_from
+        if time_to:
+            filters['completed_at__lte'] = time_to
+        querysets = [model.objects.visible_to(access).filter(**filters) for model in TASK_MODELS]
+    return source, querysets
+
+
+def completion_analytics(access, params):
+    """
+    Completion counts and worked hours visible to ``access``, grouped by the
+    ``group_by`` dimensions and limited to ``date_from``/``date_to`` on the
+    completion time. Raises ``ValueError`` with a user-facing message on
+    invalid input.
+    """
+    groups = parse_group_by(params.get('group_by'))
+    source, querysets = completion_sources(access, params)
+    
+    user_field, day_field, counters = SOURCES[source]
+    fields, dimensions = [], {}
+    for group in groups:
+        if group == 'user':
+            if user_field == 'user':
+                fields.append('user_id')
+            else:
+                dimensions['user_id'] = F(f'{user_field}_id')
+        elif group == 'admin':
+            dimensions['admin_id'] = F(f'{user_field}__userprofile__assigned_admin_id')
+        else:
+            dimensions['period'] = PERIODS[group](day_field)
+    
+    keys = [*fields, *dimensions]
+    if groups:
+        row_sets = [
+            rows.order_by().values(*fields, **dimensions).annotate(**counters).order_by(*keys)
+            for rows in querysets
+        ]
+    else:
+        row_sets = [[rows.order_by().aggregate(**counters)] for rows in querysets]
+    if len(row_sets) == 1:
+        rows = row_sets[0]
+    else:
+        # Nulls (users without an admin) sort first, as on SQLite.
+        rows = sorted(
+            _merge_rows(row_sets, keys, ROLLUP_COUNTERS),
+            key=lambda row: [(row[key] is not None, row[key]) for key in keys],
+        )
+    results = [_result(row) for row in rows]
+    
+    return {'source': source, 'group_by': groups, 'results': results}
+
+
+def _result(row):
+    completed = row['completed'] or 0
+    hours = row['worked_hours'] or Decimal(0)
+    if isinstance(row.get('period'), datetime.datetime):
+        row['period'] = timezone.localtime(row['period']).date()
+    row.update(
+        completed=completed,
+        on_time=row['on_time'] or 0,
+        late=row['late'] or 0,
+        worked_hours=hours.quantize(Decimal('0.01')),
+        average_hours=(hours / completed).quantize(Decimal('0.01')) if completed else None,
+    )
+    return row
@@ -0,0 +1,107 @@
+"""
+Archival of old completed tasks.
+
+Completed tasks whose completion and last update are both older than
+``TASK_ARCHIVE_AFTER_DAYS`` move from ``Task`` to ``TaskArchive``, which has
+the same columns, so the task list, the dashboard and the reminder scan only
+read the tasks still in use. Each batch copies and deletes its rows in one
+short transaction with ``INSERT ... SELECT`` and ``DELETE``, so the text
+columns never leave the database and no lock is held between batches. The
+rows are moved, not deleted, so the delete signals (counters, rollups,
+tombstones) do not run; reminders of the moved tasks are deleted with them.
+
+Reads that span every task go through ``TASK_MODELS`` or ``get_task``.
+"""
+import datetime
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import caching, stats
+from .models import TASK_MODELS, Task, TaskArchive, TaskNotification
+
+
+def archive_cutoff(now=None, days=None):
+    days = settings.TASK_ARCHIVE_AFTER_DAYS if days is None else days
+    return (now or timezone.now()) - datetime.timedelta(days=days)
+
+
+def archivable_tasks(cutoff):
+    """Tasks to archive, oldest completion first through the ``completed_at`` index."""
+    return Task.objects.filter(
+        status='completed', completed_at__lt=cutoff, updated_at__lt=cutoff
+    ).order_by('completed_at')
+
+
+def archive_batch(cutoff, batch_size):
+    """Move up to ``batch_size`` archivable tasks to ``TaskArchive``; return how many were moved."""
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(field.column) for field in Task._meta.concrete_fields)
+    with transaction.atomic():
+        # Rows locked by a concurrent update are left for the next run.
+        rows = list(
+            archivable_tasks(cutoff).select_for_update(skip_locked=True)
+            .values_list('id', 'assigned_to_id')[:batch_size]
+        )
+        if not rows:
+            return 0
+        ids = [task_id for task_id, _ in rows]
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {qn(TaskArchive._meta.db_table)} ({columns}) '
+                f'SELECT {columns} FROM {qn(Task._meta.db_table)} WHERE {qn("id")} IN ({placeholders})',
+                ids,
+            )
+            TaskNotification.objects.filter(task_id__in=ids).delete()
+            cursor.execute(f'DELETE FROM {qn(Task._meta.db_table)} WHERE {qn("id")} IN ({placeholders})', ids)
+        caching.bump_users(stats.assigned_admin_ids({user_id for _, user_id in rows}))
+    return len(rows)
+
+
+def archive_tasks(batch_size, pause=0, cutoff=None):
+    """
+    Archive every task completed and last updated before ``cutoff``
+    (default: ``TASK_ARCHIVE_AFTER_DAYS`` ago), ``batch_size`` at a time,
+    sleeping ``pause`` seconds between batches. Returns how many were moved.
+    """
+    cutoff = cutoff or archive_cutoff()
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+def task_queries(pk, related=(), access=None):
+    """The queries ``get_task`` tries in turn: the live task, then the archived one."""
+    for model in TASK_MODELS:
+        tasks = model.objects.select_related(*related)
+        if access is not None:
+            tasks = tasks.visible_to(access)
+        yield tasks.filter(pk=pk)
+
+
+def get_task(pk, *related, access=None):
+    """
+    Return the live or archived task ``pk`` with the ``related`` fields
+    selected, or ``None``. With ``access``, only a task it may see is returned.
+    """
+    for tasks in task_queries(pk, related, access):
+        task = tasks.first()
+        if task is not None:
+            return task
+    return None
+
+
+async def aget_task(pk, *related, access=None):
+    for tasks in task_queries(pk, related, access):
+        task = await tasks.afirst()
+        if task is not None:
+            return task
+    return None
@@ -0,0 +1,77 @@
+"""
+Native async versions of the hot task read endpoints, routed instead of the
+DRF views in ``tasks.views`` when ``ASYNC_VIEWS`` is enabled (the default
+under ``asgi.py``). Responses match the sync views.
+"""
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.request import Request
+
+from task_manager.async_api import async_api_view, json_response
+from task_manager.replicas import read_from_replica
+from . import archive, caching, fast_serializers
+from .conditional import list_validators, not_modified, set_validators, task_validators
+from .filters import filter_tasks, task_ordering
+from .models import Task
+from .pagination import TaskCursorPagination
+from .serializers import TaskReportSerializer
+from .views import report_error
+
+
+@async_api_view(['GET'])
+@read_from_replica
+async def task_list(request):
+    signature = await caching.ascope_signature(caching.access_scopes(request.access))
+    validators = list_validators(request.access, request.get_full_path(), signature)
+    response = not_modified(request, *validators)
+    if response is not None:
+        return response
+    
+    cache_key = None
+    if caching.enabled():
+        cache_key = caching.task_list_key(request.access, request.build_absolute_uri(), signature)
+        body = await cache.aget(cache_key)
+        if body is not None:
+            return set_validators(fast_serializers.rendered_response(request, body), *validators)
+    
+    params = request.GET
+    tasks = Task.objects.visible_to(request.access)
+    try:
+        if params.get('search'):
+            # Choosing the search backend may inspect the database once.
+            tasks = await sync_to_async(filter_tasks)(tasks, params)
+        else:
+            tasks = filter_tasks(tasks, params)
+        ordering = task_ordering(params)
+        view = fast_serializers.list_view(params)
+    except ValueError as e:
+        return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    paginator = TaskCursorPagination()
+    paginator.ordering = ordering
+    page = await paginator.apaginate_queryset(view.rows(tasks), Request(request))
+    body = fast_serializers.render(paginator.get_paginated_data(view.render(page)))
+    if cache_key:
+        await cache.aset(cache_key, body, caching.cache_timeout())
+    return set_validators(fast_serializers.rendered_response(request, body), *validators)
+
+
+@async_api_view(['GET'])
+@read_from_replica
+async def task_report(request, pk):
+    task = await archive.aget_task(pk, 'assigned_to', 'created_by')
+    if task is None:
+        return json_response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    
+    error = report_error(task, request.access)
+    if error is not None:
+        return json_response({'error': error[0]}, status=error[1])
+    
+    validators = task_validators(task, 'report')
+    response = not_modified(request, *validators)
+    if response is not None:
+        return response
+    
+    serializer = TaskReportSerializer(task)
+    return set_validators(json_response(serializer.data), *validators)
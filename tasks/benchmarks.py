@@ -0,0 +1,353 @@
+"""
+Endpoint benchmark harness used by the ``benchmark`` management command.
+
+Every request runs inside a transaction that is rolled back, so write
+endpoints can be measured against a generated dataset without changing it.
+"""
+import asyncio
+import json
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.db import connection, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from accounts.access import fetch_access
+from accounts.models import UserProfile
+from accounts.throttling import reset_login_attempts
+from accounts.tokens import tokens_for_user
+from tasks.models import Task
+
+ROLES = ['superadmin', 'admin', 'user']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Endpoint:
+    def __init__(
+        self, name, method='get', args=None, data=None, roles=ROLES, relogin=False, setup=None, settings=None,
+        form=False,
+    ):
+        self.name = name
+        self.method = method
+        self.args = args
+        self.data = data
+        self.roles = roles
+        self.relogin = relogin
+        self.setup = setup
+        # Settings overridden while the request is measured.
+        self.settings = settings or {}
+        # Send ``data`` form-encoded instead of as JSON.
+        self.form = form
+    
+    def path(self, sample):
+        args = [sample[arg] for arg in self.args] if self.args else None
+        return reverse(self.name, args=args)
+    
+    def payload(self, sample):
+        return self.data(sample) if callable(self.data) else self.data
+
+
+def _task_payload(sample):
+    return {
+        'title': 'Benchmark task',
+        'description': 'Created by the benchmark harness.',
+        'assigned_to': sample['user'],
+        'due_date': '2030-01-01T00:00:00Z',
+        'status': 'pending',
+    }
+
+
+def _login_payload(sample):
+    return {'username': sample['username'], 'password': sample['password']}
+
+
+def _refresh_payload(sample):
+    # A new refresh token per request; logout revokes the one it is sent.
+    return {'refresh': str(tokens_for_user(sample['user_obj']))}
+
+
+def _reset_login_throttle(sample):
+    # Repeated benchmark logins would otherwise be rejected as throttled.
+    reset_login_attempts(sample['username'], '127.0.0.1')
+
+
+ENDPOINTS = [
+    # tasks/urls.py
+    Endpoint('task_list'),
+    Endpoint('create_task', 'post', data=_task_payload, roles=['superadmin', 'admin']),
+    # Measures opening the stream up to its first message.
+    Endpoint('task_events', settings={'TASK_EVENTS_MAX_CONNECTION_SECONDS': 0}),
+    Endpoint('task_changes'),
+    Endpoint('task_analytics'),
+    Endpoint('task_flow_times'),
+    Endpoint('task_notifications'),
+    Endpoint('bulk_create_tasks', 'post', data=lambda s: [_task_payload(s)] * 100, roles=['superadmin', 'admin']),
+    Endpoint('bulk_update_tasks', 'put', data=lambda s: [{'id': s['task'], 'status': 'in_progress'}]),
+    Endpoint('export_tasks'),
+    Endpoint('export_reports'),
+    Endpoint('update_task', 'put', args=['task'], data={'status': 'in_progress'}),
+    Endpoint('task_history', args=['task']),
+    Endpoint('task_report', args=['completed_task']),
+    # accounts/urls.py
+    Endpoint('register', 'post', data=lambda s: {
+        'username': 'benchmark_register', 'email': 'register@example.com',
+        'password': 'Bench-mark-42!', 'password_confirm': 'Bench-mark-42!',
+        'first_name': 'Bench', 'last_name': 'Mark', 'role': 'user',
+    }),
+    Endpoint('login', 'post', data=_login_payload, relogin=True, setup=_reset_login_throttle),
+    Endpoint('token_refresh', 'post', data=_refresh_payload),
+    Endpoint('logout', 'post', data=_refresh_payload),
+    Endpoint('profile'),
+    # task_manager/urls.py
+    Endpoint('metrics', roles=['superadmin']),
+    Endpoint('web_login', 'post', data=_login_payload, relogin=True, setup=_reset_login_throttle, form=True),
+    Endpoint('web_logout', relogin=True),
+    # admin_panel/urls.py
+    Endpoint('admin_panel:dashboard'),
+    Endpoint('admin_panel:user_list'),
+    Endpoint('admin_panel:user_create'),
+    Endpoint('admin_panel:user_update', args=['user']),
+    Endpoint('admin_panel:user_delete', args=['user']),
+    Endpoint('admin_panel:admin_list'),
+    Endpoint('admin_panel:admin_create'),
+    Endpoint('admin_panel:admin_update', args=['admin']),
+    Endpoint('admin_panel:admin_delete', args=['admin']),
+    Endpoint('admin_panel:assign_user'),
+    Endpoint('admin_panel:task_list'),
+    Endpoint('admin_panel:task_create'),
+    Endpoint('admin_panel:task_update', args=['task']),
+    Endpoint('admin_panel:task_report', args=['completed_task']),
+]
+
+
+def sample_context(role, password):
+    """
+    Pick a representative account for ``role`` (an admin with assigned
+    users, a user with tasks) plus ids the endpoints are called with.
+    """
+    profiles = UserProfile.objects.filter(role=role).select_related('user')
+    if role == 'admin':
+        profiles = profiles.filter(user__assigned_users__isnull=False)
+    elif role == 'user':
+        profiles = profiles.filter(assigned_admin__isnull=False, user__assigned_tasks__isnull=False)
+    profile = profiles.order_by('pk').first()
+    if profile is None:
+        return None
+    
+    access = fetch_access(profile.user_id)
+    visible = Task.objects.visible_to(access).order_by()
+    if role == 'admin':
+        visible = visible.exclude(assigned_to_id=profile.user_id)
+    task = visible.first()
+    completed = visible.filter(status='completed').first()
+    if task is None or completed is None:
+        return None
+    
+    return {
+        'role': role,
+        'user_obj': profile.user,
+        'username': profile.user.username,
+        'password': password,
+        'task': task.pk,
+        'completed_task': completed.pk,
+        'user': task.assigned_to_id,
+        'admin': profile.assigned_admin_id or profile.user_id,
+    }
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _request(client, endpoint, sample, payload):
+    method = getattr(client, endpoint.method)
+    if payload is None:
+        return method(endpoint.path(sample))
+    if endpoint.method == 'get' or endpoint.form:
+        return method(endpoint.path(sample), payload)
+    return method(endpoint.path(sample), json.dumps(payload), content_type='application/json')
+
+
+def _consume(response):
+    if response.is_async:
+        async_to_sync(_aconsume)(response.streaming_content)
+    else:
+        for _ in response.streaming_content:
+            pass
+
+
+async def _aconsume(chunks):
+    async for _ in chunks:
+        pass
+
+
+def _timed_request(client, endpoint, sample):
+    """Issue one request inside a rolled-back transaction and return ``(seconds, queries, status)``."""
+    if endpoint.relogin:
+        client.force_login(sample['user_obj'])
+    if endpoint.setup:
+        endpoint.setup(sample)
+    payload = endpoint.payload(sample)
+    with CaptureQueriesContext(connection) as queries, override_settings(**endpoint.settings):
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                response = _request(client, endpoint, sample, payload)
+                if response.streaming:
+                    _consume(response)
+                elapsed = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            pass
+    return elapsed, len(queries.captured_queries), response.status_code
+
+
+def measure(endpoint, sample, iterations, warmup):
+    client = Client()
+    client.force_login(sample['user_obj'])
+    
+    for _ in range(warmup):
+        _timed_request(client, endpoint, sample)
+    
+    timings = []
+    query_counts = []
+    status = None
+    for _ in range(iterations):
+        elapsed, queries, status = _timed_request(client, endpoint, sample)
+        timings.append(elapsed * 1000)
+        query_counts.append(queries)
+    
+    tracemalloc.start()
+    try:
+        _timed_request(client, endpoint, sample)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'status': status,
+        'iterations': iterations,
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p90_ms': round(percentile(timings, 0.90), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'queries': max(query_counts),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, max_regression, min_delta_ms):
+    """
+    Return human-readable regressions of ``results`` against ``baseline``:
+    a p90 slower by more than ``max_regression`` (a fraction) and
+    ``min_delta_ms``, or any increase in query count.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        delta = current['p90_ms'] - previous['p90_ms']
+        if delta > min_delta_ms and delta > previous['p90_ms'] * max_regression:
+            regressions.append(f"{key}: p90 {previous['p90_ms']}ms -> {current['p90_ms']}ms")
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{key}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+
+# Read endpoints served by native async views when ASYNC_VIEWS is enabled.
+LOAD_ENDPOINTS = {
+    'task_list': Endpoint('task_list'),
+    'task_report': Endpoint('task_report', args=['completed_task']),
+    'profile': Endpoint('profile'),
+}
+
+
+def _load_summary(mode, concurrency, timings, statuses, elapsed, peak, threads):
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'requests': len(timings),
+        'errors': sum(1 for code in statuses if code >= 400),
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'peak_threads': threads,
+    }
+
+
+def load_test(endpoint, sample, concurrency, requests, use_async):
+    """
+    Issue ``requests`` requests to ``endpoint`` with ``concurrency`` in
+    flight, through the sync handler on a thread pool (as a threaded WSGI
+    server would) or through the async handler on one event loop (as an
+    ASGI server would). Reports throughput, latency, peak traced memory and
+    peak thread count.
+    """
+    path = endpoint.path(sample)
+    headers = {'Authorization': f"Bearer {tokens_for_user(sample['user_obj']).access_token}"}
+    runner = _load_async if use_async else _load_threads
+    
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        timings, statuses, threads = runner(path, headers, concurrency, requests)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return _load_summary('asgi' if use_async else 'wsgi', concurrency, timings, statuses, elapsed, peak, threads)
+
+
+def _load_threads(path, headers, concurrency, requests):
+    local = threading.local()
+    peak_threads = threading.active_count()
+    
+    def call(_):
+        nonlocal peak_threads
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = Client()
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        peak_threads = max(peak_threads, threading.active_count())
+        return (time.perf_counter() - started) * 1000, response.status_code
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(requests)))
+    return [ms for ms, _ in results], [code for _, code in results], peak_threads
+
+
+def _load_async(path, headers, concurrency, requests):
+    timings, statuses = [], []
+    peak_threads = threading.active_count()
+    
+    async def worker(client, remaining):
+        nonlocal peak_threads
+        while remaining:
+            remaining.pop()
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            timings.append((time.perf_counter() - started) * 1000)
+            statuses.append(response.status_code)
+            peak_threads = max(peak_threads, threading.active_count())
+    
+    async def run():
+        remaining = list(range(requests))
+        client = AsyncClient()
+        await asyncio.gather(*(worker(client, remaining) for _ in range(concurrency)))
+    
+    asyncio.run(run())
+    return timings, statuses, peak_threads
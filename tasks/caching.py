@@ -0,0 +1,121 @@
+"""
+Versioned caching of task reads.
+
+Each task scope (the ``tasks.stats`` scopes: ``global``, ``admin:<id>`` and
+``user:<id>``) has a version counter in the cache. Cached task list pages and
+dashboard fragments carry the versions of the scopes they read in their
+keys. Writes bump the versions of the scopes they touch once the transaction
+commits, so outdated entries are never read again and simply expire. The
+same versions make up the task list's ETag (``tasks.conditional``), so they
+are bumped even when ``TASK_CACHE_TIMEOUT`` disables caching.
+
+Counters start from the current time in milliseconds rather than 1, so a
+counter evicted and recreated never repeats a version that is still cached.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from task_manager.replicas import current_replica
+
+from .stats import GLOBAL_SCOPE, admin_scope, scopes_for_user, user_scope
+
+# Entries hold the rendered JSON of a page.
+LIST_KEY_PREFIX = 'tasks:list-json'
+
+
+def _version_key(scope):
+    return f'tasks:version:{scope}'
+
+
+def enabled():
+    return settings.TASK_CACHE_TIMEOUT > 0
+
+
+def cache_timeout():
+    """
+    Lifetime of task reads cached by the current view. Reads served by a
+    replica may predate the last write even under a new version, so they
+    are kept no longer than writers are pinned to the primary.
+    """
+    if current_replica() is None:
+        return settings.TASK_CACHE_TIMEOUT
+    return min(settings.TASK_CACHE_TIMEOUT, settings.DB_REPLICA_PIN_SECONDS)
+
+
+def access_scopes(access):
+    """Return the scopes whose tasks ``access`` can see."""
+    if access.is_superadmin:
+        return [GLOBAL_SCOPE]
+    if access.role == 'admin':
+        return [admin_scope(access.user_id), user_scope(access.user_id)]
+    return [user_scope(access.user_id)]
+
+
+def _signature(scopes, versions):
+    return ','.join(f'{scope}={versions[_version_key(scope)]}' for scope in scopes)
+
+
+def _missing_versions(keys, versions):
+    initial = int(time.time() * 1000)
+    return {key: initial for key in keys if key not in versions}
+
+
+def scope_signature(scopes):
+    """Return a string naming the current version of every scope in ``scopes``."""
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = _missing_versions(keys, versions)
+    if missing:
+        for key, version in missing.items():
+            cache.add(key, version, timeout=None)
+        # Another request may have added the counter first.
+        versions.update(missing, **cache.get_many(list(missing)))
+    return _signature(scopes, versions)
+
+
+async def ascope_signature(scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = await cache.aget_many(keys)
+    missing = _missing_versions(keys, versions)
+    if missing:
+        for key, version in missing.items():
+            await cache.aadd(key, version, timeout=None)
+        versions.update(missing, **await cache.aget_many(list(missing)))
+    return _signature(scopes, versions)
+
+
+def _bump(scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            # No counter, so nothing is cached under the current version.
+            pass
+
+
+def bump_scopes(scopes):
+    """Invalidate everything cached for ``scopes`` once the current transaction commits."""
+    scopes = set(scopes)
+    if scopes:
+        transaction.on_commit(lambda: _bump(scopes))
+
+
+def bump_users(admins):
+    """
+    Invalidate the task scopes of the given assignees. ``admins`` maps each
+    assignee id to their assigned admin id (or ``None``).
+    """
+    scopes = set()
+    for user_id, admin_id in admins.items():
+        scopes.update(scopes_for_user(user_id, admin_id))
+    bump_scopes(scopes)
+
+
+def task_list_key(access, url, signature):
+    """Cache key of the task list page at ``url`` for ``access``, at the scope versions in ``signature``."""
+    digest = hashlib.md5(f'{signature}|{url}'.encode(), usedforsecurity=False).hexdigest()
+    return f'{LIST_KEY_PREFIX}:{access.user_id}:{digest}'
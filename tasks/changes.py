@@ -0,0 +1,165 @@
+"""
+Delta sync for offline clients.
+
+A changes cursor records three positions: the last ``(updated_at, id)`` of
+the task upserts returned, the last ``TaskTombstone`` id returned, and when
+the cursor was issued. Upserts are read in ``(updated_at, id)`` order and
+deletions in tombstone id order, each bounded by the page size.
+
+Tombstones are written for deleted tasks and, on behalf of the previous
+assignee and admin, for tasks that leave their scope when reassigned or
+when the assignee moves to another admin. A reader who can still see the
+task is not sent its tombstone.
+
+``updated_at`` and tombstone ids are assigned before a write commits, so a
+slow transaction can commit a row behind a position a reader has already
+passed. The feed only returns rows older than ``TASK_CHANGES_SAFETY_LAG``
+seconds, which bounds how long a write may take to commit and still be
+seen.
+"""
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Max, Q, QuerySet
+from django.utils import timezone
+
+from .models import Task, TaskTombstone
+from .serializers import BULK_BATCH_SIZE
+
+CHANGES_PAGE_SIZE = 500
+MAX_CHANGES_PAGE_SIZE = 1000
+
+
+class CursorExpired(Exception):
+    """The cursor predates tombstone retention; the client must resync fully."""
+
+
+def tombstone_retention():
+    return datetime.timedelta(days=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def record_deletions(tasks):
+    """Write a tombstone for every task in the ``tasks`` queryset, which is about to be deleted."""
+    rows = tasks.order_by().values_list('pk', 'assigned_to_id', 'assigned_to__userprofile__assigned_admin_id')
+    TaskTombstone.objects.bulk_create([
+        TaskTombstone(task_id=pk, assigned_to_id=assigned_to_id, assigned_admin_id=admin_id)
+        for pk, assigned_to_id, admin_id in rows
+    ], batch_size=BULK_BATCH_SIZE)
+
+
+def record_removals(task_ids, assigned_to_id, assigned_admin_id):
+    """
+    Write a tombstone for each of ``task_ids`` seen by the assignee
+    ``assigned_to_id`` and admin ``assigned_admin_id`` before a reassignment.
+    """
+    TaskTombstone.objects.bulk_create([
+        TaskTombstone(task_id=task_id, assigned_to_id=assigned_to_id, assigned_admin_id=assigned_admin_id)
+        for task_id in task_ids
+    ], batch_size=BULK_BATCH_SIZE)
+
+
+def compact_tombstones(now=None):
+    """Delete tombstones older than the retention period; return how many were removed."""
+    cutoff = (now or timezone.now()) - tombstone_retention()
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
+
+
+def origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def encode_cursor(updated_at, task_id, tombstone_id, issued_at):
+    payload = {
+        'u': updated_at.isoformat() if updated_at else None,
+        'i': task_id,
+        'd': tombstone_id,
+        'c': int(issued_at.timestamp()),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return ``(updated_at, task_id, tombstone_id)``; raise ``ValueError`` or ``CursorExpired``."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        updated_at = datetime.datetime.fromisoformat(payload['u']) if payload['u'] else None
+        issued_at = datetime.datetime.fromtimestamp(payload['c'], tz=datetime.timezone.utc)
+        task_id, tombstone_id = int(payload['i']), int(payload['d'])
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise ValueError('Invalid cursor')
+    if issued_at < timezone.now() - tombstone_retention():
+        raise CursorExpired
+    return updated_at, task_id, tombstone_id
+
+
+def start_position(since):
+    """
+    Position for a first sync: every task, or tasks changed at or after the
+    ``since`` datetime, and deletions from that point on.
+    """
+    if since is None:
+        return None, 0, TaskTombstone.objects.aggregate(last=Max('id'))['last'] or 0
+    if since < timezone.now() - tombstone_retention():
+        raise CursorExpired
+    before = TaskTombstone.objects.filter(deleted_at__lt=since).aggregate(last=Max('id'))['last']
+    return since - datetime.timedelta(microseconds=1), 0, before or 0
+
+
+def settled_before(now=None):
+    """Rows written after this time may still have writes committing behind them."""
+    return (now or timezone.now()) - datetime.timedelta(seconds=settings.TASK_CHANGES_SAFETY_LAG)
+
+
+def changed_tasks(access, updated_at=None, task_id=0, until=None):
+    """Tasks visible to ``access`` changed after ``(updated_at, task_id)``, in feed order."""
+    tasks = Task.objects.visible_to(access).select_related('assigned_to', 'created_by')
+    if until is not None:
+        tasks = tasks.filter(updated_at__lte=until)
+    if updated_at is not None:
+        # The redundant lower bound lets the database seek the updated_at
+        # index instead of walking it to evaluate the OR.
+        tasks = tasks.filter(
+            Q(updated_at__gt=updated_at) | Q(id__gt=task_id), updated_at__gte=updated_at
+        )
+    return tasks.order_by('updated_at', 'id')
+
+
+def deleted_tasks(access, tombstone_id, until=None):
+    """Tombstones visible to ``access`` after ``tombstone_id``, in feed order."""
+    tombstones = TaskTombstone.objects.visible_to(access).filter(id__gt=tombstone_id)
+    if until is not None:
+        tombstones = tombstones.filter(deleted_at__lte=until)
+    return tombstones.order_by('id')
+
+
+def task_changes(access, position, page_size):
+    """
+    Return ``(tasks, deleted_ids, cursor, has_more)`` for one page of
+    changes visible to ``access`` after ``position``.
+    """
+    updated_at, task_id, tombstone_id = position
+    issued_at = timezone.now()
+    until = settled_before(issued_at)
+    
+    tasks = list(changed_tasks(access, updated_at, task_id, until)[:page_size + 1])
+    tombstones = list(deleted_tasks(access, tombstone_id, until).values_list('id', 'task_id')[:page_size + 1])
+    
+    has_more = len(tasks) > page_size or len(tombstones) > page_size
+    tasks, tombstones = tasks[:page_size], tombstones[:page_size]
+    if tasks:
+        updated_at, task_id = tasks[-1].updated_at, tasks[-1].pk
+    if tombstones:
+        tombstone_id = tombstones[-1][0]
+    
+    deleted = list(dict.fromkeys(deleted for _, deleted in tombstones))
+    if deleted:
+        # Removals also reach readers who still see the task, such as
+        # superadmins or an admin whose task moved between their users.
+        visible = set(Task.objects.visible_to(access).filter(id__in=deleted).values_list('id', flat=True))
+        deleted = [deleted_id for deleted_id in deleted if deleted_id not in visible]
+    
+    cursor = encode_cursor(updated_at, task_id, tombstone_id, issued_at)
+    return tasks, deleted, cursor, has_more
@@ -0,0 +1,60 @@
+"""
+Conditional GET support for polled task endpoints.
+
+Validators are computed before anything is serialized. A single task is
+validated by its own ``updated_at``. A list is validated by an ETag over the
+``tasks.caching`` versions of the scopes it reads, which every task and
+profile write bumps, so no query runs; it has no ``Last-Modified``, since no
+date would change when a task is deleted or moved out of the list.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from task_manager.replicas import current_replica
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode(), usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def list_validators(access, path, signature):
+    """
+    Return ``(etag, None)`` for the task list at ``path`` as seen by
+    ``access``, given the ``scope_signature`` of the scopes it reads.
+    """
+    parts = [access.user_id, path, signature]
+    if current_replica() is not None:
+        # A lagging replica may serve rows older than the current versions,
+        # so its validators expire like its cached pages do.
+        parts.append(int(time.time()) // max(settings.DB_REPLICA_PIN_SECONDS, 1))
+    return make_etag(*parts), None
+
+
+def task_validators(task, *parts):
+    return make_etag(*parts, task.pk, task.updated_at), task.updated_at
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Return a 304 (or 412) response when the request's conditional headers
+    match the validators, otherwise ``None``.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Responses are per user: clients may keep them but must revalidate.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,135 @@
+"""
+In-process pub/sub for task events pushed to clients over server-sent events.
+
+Serializer saves publish ``task.created``, ``task.updated`` and
+``task.completed`` events once the transaction commits. Each event is encoded
+once and offered to the connections of the assignee, the assignee's admin
+and every superadmin. Every connection has a bounded queue; a connection
+that falls behind is sent an ``overflow`` event and closed, and the client
+catches up through ``/api/tasks/changes/``.
+
+Subscribers are only known to the worker process they are connected to, so
+events reach connections on the worker that handled the write.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from accounts.models import UserProfile
+
+EVENT_FIELDS = ('id', 'title', 'status', 'assigned_to_id', 'created_by_id', 'due_date', 'updated_at')
+
+OVERFLOW_EVENT = 'event: overflow\ndata: {}\n\n'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class Subscription:
+    def __init__(self, access, maxsize):
+        self.user_id = access.user_id
+        self.is_superadmin = access.is_superadmin
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+    
+    def offer(self, message):
+        # Runs on the subscription's event loop.
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class TaskEventBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_user = defaultdict(set)
+        self._superadmins = set()
+        self._ids = itertools.count(1)
+    
+    def __len__(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._by_user.values()) + len(self._superadmins)
+    
+    def subscribe(self, access):
+        """Register a connection for ``access``; must be called on the event loop serving it."""
+        subscription = Subscription(access, _setting('TASK_EVENTS_QUEUE_SIZE', 100))
+        with self._lock:
+            if subscription.is_superadmin:
+                self._superadmins.add(subscription)
+            else:
+                self._by_user[subscription.user_id].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._superadmins.discard(subscription)
+            subscribers = self._by_user.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._by_user[subscription.user_id]
+    
+    def has_subscribers(self):
+        return bool(self._by_user or self._superadmins)
+    
+    def publish(self, kind, payload, user_ids):
+        """Offer one event to the connections of ``user_ids`` and all superadmins. Thread-safe."""
+        message = f'id: {next(self._ids)}\nevent: task.{kind}\ndata: {json.dumps(payload, cls=DjangoJSONEncoder)}\n\n'
+        with self._lock:
+            targets = set(self._superadmins)
+            for user_id in user_ids:
+                targets.update(self._by_user.get(user_id, ()))
+        for subscription in targets:
+            subscription.loop.call_soon_threadsafe(subscription.offer, message)
+        return len(targets)
+
+
+broker = TaskEventBroker()
+
+
+def _publish(kind, payload):
+    if not broker.has_subscribers():
+        return
+    user_id = payload['assigned_to_id']
+    admin_id = UserProfile.objects.filter(user_id=user_id).values_list('assigned_admin_id', flat=True).first()
+    broker.publish(kind, payload, {user_id, admin_id} - {None})
+
+
+def task_saved(task, kind):
+    """Publish ``kind`` for ``task`` after the current transaction commits."""
+    payload = {field: getattr(task, field) for field in EVENT_FIELDS}
+    transaction.on_commit(lambda: _publish(kind, payload))
+
+
+async def event_stream(subscription):
+    """Yield SSE messages for ``subscription`` until it overflows or reaches its maximum age."""
+    heartbeat = _setting('TASK_EVENTS_HEARTBEAT_SECONDS', 20)
+    deadline = subscription.loop.time() + _setting('TASK_EVENTS_MAX_CONNECTION_SECONDS', 600)
+    try:
+        yield f'retry: {_setting("TASK_EVENTS_RETRY_MS", 3000)}\n\n'
+        while True:
+            remaining = deadline - subscription.loop.time()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield message
+            if subscription.overflowed and subscription.queue.empty():
+                yield OVERFLOW_EVENT
+                break
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,74 @@
+import csv
+import datetime
+import heapq
+from operator import itemgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+
+TASK_EXPORT_FIELDS = [
+    'id', 'title', 'description', 'assigned_to', 'assigned_to__username',
+    'created_by', 'created_by__username', 'due_date', 'status',
+    'created_at', 'updated_at',
+]
+
+REPORT_EXPORT_FIELDS = [
+    'id', 'title', 'assigned_to', 'assigned_to__username',
+    'assigned_to__userprofile__assigned_admin__username',
+    'due_date', 'completion_report', 'worked_hours', 'updated_at',
+]
+
+# Column names in the exported files, matching the serializer field names.
+COLUMN_NAMES = {
+    'assigned_to__username': 'assigned_to_username',
+    'created_by__username': 'created_by_username',
+    'assigned_to__userprofile__assigned_admin__username': 'assigned_admin_username',
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for streaming csv.writer output."""
+    
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_rows(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow([COLUMN_NAMES.get(field, field) for field in fields])
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def ndjson_rows(rows, fields):
+    columns = [COLUMN_NAMES.get(field, field) for field in fields]
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+def export_rows(querysets, fields, export_format):
+    """
+    Yield the encoded lines for the rows of ``querysets`` (live and archived
+    tasks) merged in id order, reading each in fixed-size chunks of value
+    tuples so memory stays flat however many rows are exported.
+    """
+    rows = heapq.merge(*(
+        queryset.order_by('id').values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        for queryset in querysets
+    ), key=itemgetter(fields.index('id')))
+    if export_format == 'csv':
+        return csv_rows(rows, fields)
+    return ndjson_rows(rows, fields)
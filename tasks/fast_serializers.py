@@ -0,0 +1,270 @@
+"""
+Read-only fast path for rendering task lists as JSON.
+
+``TaskSerializer`` resolves every field of every row through DRF's field
+machinery before ``JSONRenderer`` encodes the result. Here the fields of a
+task serializer are turned once into ORM lookups and per-field encoders
+producing each value's JSON text, rows are read as ``values_list`` tuples and
+every row is rendered by filling a precomputed object template. The output
+is the same, byte for byte, as ``JSONRenderer`` rendering the serializer's
+data.
+"""
+import datetime
+import decimal
+import json
+from json.encoder import encode_basestring
+from operator import attrgetter
+
+from django.http import HttpResponse
+from rest_framework import ISO_8601, serializers
+from rest_framework.compat import LONG_SEPARATORS, SHORT_SEPARATORS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from task_manager.metrics import serializing
+
+from .models import TaskQuerySet
+from .serializers import TaskSerializer, TaskSummarySerializer
+
+ITEM_SEPARATOR, KEY_SEPARATOR = SHORT_SEPARATORS if JSONRenderer.compact else LONG_SEPARATORS
+
+_encoder = json.JSONEncoder(
+    ensure_ascii=JSONRenderer.ensure_ascii,
+    allow_nan=not JSONRenderer.strict,
+    separators=(ITEM_SEPARATOR, KEY_SEPARATOR),
+    check_circular=False,
+)
+
+_encode_string = _encoder.encode if JSONRenderer.ensure_ascii else encode_basestring
+
+UTC_ZONES = ('UTC', 'Etc/UTC')
+
+_tzinfo = attrgetter('tzinfo')
+
+
+class RawJSON:
+    """
+    Encoded JSON that ``render`` embeds as it is, kept as the list of strings
+    it concatenates to so large documents are joined only once.
+    """
+    
+    def __init__(self, parts):
+        self.parts = parts
+
+
+# Joins the values of a column so a whole column is checked and quoted by a
+# few string operations. It is not printable, so no value that passes the
+# checks below contains it.
+COLUMN_SEPARATOR = '\x00'
+
+
+def _quote_all(texts):
+    """JSON strings for ``texts``, which must need no escaping."""
+    quoted = '"' + f'"{COLUMN_SEPARATOR}"'.join(texts) + '"'
+    return quoted.split(COLUMN_SEPARATOR)
+
+
+def _needs_no_escaping(text):
+    return (
+        text.isprintable() and '"' not in text and '\\' not in text
+        and (text.isascii() or not JSONRenderer.ensure_ascii)
+    )
+
+
+def _each(encode):
+    """Column encoder applying the value encoder ``encode`` to each non-null value."""
+    def encode_column(values):
+        if None in values:
+            return ['null' if value is None else encode(value) for value in values]
+        return list(map(encode, values))
+    return encode_column
+
+
+def _generic(field):
+    return _each(lambda value: _encoder.encode(field.to_representation(value)))
+
+
+def _integer(value):
+    return str(int(value))
+
+
+def _integer_column(values):
+    try:
+        return list(map(str, map(int, values)))
+    except TypeError:
+        return _each(_integer)(values)
+
+
+def _string(value):
+    value = str(value)
+    return f'"{value}"' if _needs_no_escaping(value) else _encode_string(value)
+
+
+def _string_column(values):
+    present = [value for value in values if value is not None] if None in values else values
+    try:
+        plain = _needs_no_escaping(''.join(present))
+    except TypeError:
+        # A value that is not a string.
+        plain = False
+    if not plain:
+        return _each(_string)(values)
+    if present is values:
+        return _quote_all(values)
+    quoted = iter(_quote_all(present))
+    return ['null' if value is None else next(quoted) for value in values]
+
+
+def _datetime_encoder(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    generic = _generic(field)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return generic
+    if tz is not datetime.timezone.utc and getattr(tz, 'key', None) not in UTC_ZONES:
+        return generic
+    
+    # Columns are read in UTC, so converting to a UTC zone changes nothing
+    # and the offset always renders as "Z".
+    def encode_column(values):
+        if set(map(type, values)) == {datetime.datetime} and set(map(_tzinfo, values)) == {datetime.timezone.utc}:
+            texts = _quote_all(map(datetime.datetime.isoformat, values))
+            return COLUMN_SEPARATOR.join(texts).replace('+00:00"', 'Z"').split(COLUMN_SEPARATOR)
+        return generic(values)
+    return encode_column
+
+
+def _decimal_encoder(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.localize or not coerce_to_string or field.decimal_places is None:
+        return _generic(field)
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    
+    def encode(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        # DecimalField.quantize reads the context of the calling thread.
+        context = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            context.prec = field.max_digits
+        return f'"{value.quantize(quantum, rounding=field.rounding, context=context):f}"'
+    return _each(encode)
+
+
+def _choice_encoder(field):
+    encoded = {key: _encoder.encode(value) for key, value in field.choice_strings_to_values.items()}
+    generic = _generic(field)
+    
+    def encode_column(values):
+        try:
+            return list(map(encoded.__getitem__, map(str, values)))
+        except KeyError:
+            return generic(values)
+    return encode_column
+
+
+def _column_encoder(field):
+    """
+    Return a function taking a column of stored values and returning the
+    JSON of ``field.to_representation`` (or ``null``) for each of them.
+    """
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # The lookup already yields the primary key.
+        return _integer_column if field.pk_field is None else _generic(field.pk_field)
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_encoder(field)
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_encoder(field)
+    if isinstance(field, serializers.ChoiceField):
+        return _choice_encoder(field)
+    if type(field) is serializers.CharField:
+        return _string_column
+    if type(field) is serializers.IntegerField:
+        return _integer_column
+    return _generic(field)
+
+
+class TaskRows:
+    """
+    The fields of a task serializer turned into ORM lookups and column
+    encoders, with ``prepare`` (e.g. a ``TaskQuerySet`` method) adding any
+    annotations the lookups read.
+    """
+    
+    def __init__(self, serializer_class, prepare=None):
+        self.fields = [
+            (name, field) for name, field in serializer_class().fields.items() if not field.write_only
+        ]
+        self.lookups = [field.source.replace('.', '__') for _, field in self.fields]
+        self.prepare = prepare
+        # One "%s" per field, filled with the encoded values of a row.
+        self.template = '{' + ITEM_SEPARATOR.join(
+            _encode_string(name).replace('%', '%%') + KEY_SEPARATOR + '%s' for name, _ in self.fields
+        ) + '}'
+    
+    def rows(self, queryset):
+        """
+        ``queryset`` as the ``values_list`` rows ``render`` reads. Rows are
+        named tuples so pagination can read their ordering fields.
+        """
+        if self.prepare is not None:
+            queryset = self.prepare(queryset)
+        return queryset.values_list(*self.lookups, named=True)
+    
+    def render(self, rows):
+        """The JSON array the serializer renders to with ``many=True``, for rows from ``rows``."""
+        # Values are encoded a column at a time. Encoders are built per call
+        # because datetimes follow the active time zone.
+        with serializing():
+            columns = [_column_encoder(field)(values) for (_, field), values in zip(self.fields, zip(*rows))]
+            parts = [ITEM_SEPARATOR] * (2 * len(rows) - 1) if rows else []
+            parts[::2] = map(self.template.__mod__, zip(*columns))
+        return RawJSON(['[', *parts, ']'])
+
+
+# Representations of GET /api/tasks/ by its ``view`` query parameter.
+LIST_VIEWS = {
+    'full': TaskRows(TaskSerializer),
+    'summary': TaskRows(TaskSummarySerializer, TaskQuerySet.with_description_preview),
+}
+
+
+def list_view(params):
+    """Return the ``TaskRows`` selected by ``params``; raise ``ValueError`` for an unknown view."""
+    view = params.get('view', 'full')
+    if view not in LIST_VIEWS:
+        raise ValueError(f'view must be one of: {", ".join(LIST_VIEWS)}')
+    return LIST_VIEWS[view]
+
+
+def render(data):
+    """
+    Encode ``data``, a dict whose values may be ``RawJSON``, the same way
+    ``JSONRenderer`` encodes it without an indent.
+    """
+    parts = []
+    for key, value in data.items():
+        parts += (ITEM_SEPARATOR if parts else '{', _encode_string(str(key)), KEY_SEPARATOR)
+        if isinstance(value, RawJSON):
+            parts += value.parts
+        else:
+            parts.append(_encoder.encode(value))
+    parts.append('}' if parts else '{}')
+    text = ''.join(parts)
+    # Like JSONRenderer, escape the line separators JavaScript rejects in strings.
+    return text.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+def rendered_response(request, body):
+    """
+    Response for ``body`` from ``render``. DRF requests negotiated to another
+    renderer, such as the browsable API or indented JSON, get the decoded
+    data rendered as usual; the native async views always respond with JSON.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    if renderer is None or (
+        type(renderer) is JSONRenderer and renderer.get_indent(request.accepted_media_type, {}) is None
+    ):
+        return HttpResponse(body, content_type=JSONRenderer.media_type)
+    return Response(json.loads(body))
@@ -0,0 +1,64 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Task
+from .search import search_condition
+
+STATUS_VALUES = [value for value, _ in Task.STATUS_CHOICES]
+
+# Sortable fields; every ordering is made unique by a trailing ``id``.
+TASK_ORDERINGS = ['created_at', '-created_at', 'due_date', '-due_date', 'updated_at', '-updated_at']
+
+DEFAULT_ORDERING = '-created_at'
+
+
+def parse_bound(value, end=False):
+    """Parse a date or datetime query value into an aware datetime."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        parsed = datetime.datetime.combine(day, datetime.time.max if end else datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def filter_tasks(queryset, params):
+    """
+    Apply the task list query parameters to ``queryset``:
+    ``status``, ``due_from``, ``due_to``, ``assigned_to``, ``created_by``
+    and ``search``. Raises ``ValueError`` with a user-facing message on
+    invalid input.
+    """
+    if params.get('status'):
+        if params['status'] not in STATUS_VALUES:
+            raise ValueError(f'status must be one of: {", ".join(STATUS_VALUES)}')
+        queryset = queryset.filter(status=params['status'])
+    
+    if params.get('due_from'):
+        queryset = queryset.filter(due_date__gte=parse_bound(params['due_from']))
+    if params.get('due_to'):
+        queryset = queryset.filter(due_date__lte=parse_bound(params['due_to'], end=True))
+    
+    for param in ('assigned_to', 'created_by'):
+        if params.get(param):
+            if not params[param].isdigit():
+                raise ValueError(f'{param} must be a user id')
+            queryset = queryset.filter(**{f'{param}_id': params[param]})
+    
+    search = params.get('search', '').strip()
+    if search:
+        queryset = queryset.filter(search_condition(search, queryset.db))
+    
+    return queryset
+
+
+def task_ordering(params):
+    ordering = params.get('ordering') or DEFAULT_ORDERING
+    if ordering not in TASK_ORDERINGS:
+        raise ValueError(f'ordering must be one of: {", ".join(TASK_ORDERINGS)}')
+    return (ordering, 'id')
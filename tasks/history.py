@@ -0,0 +1,140 @@
+"""
+Task status history.
+
+Every saved status change appends a ``TaskEvent``: the ``Task`` post_save
+signal records creations and transitions however the task was saved, and
+the bulk endpoints, which bypass ``save``, call ``record_transitions`` in
+their own transaction. Writers that know who acts wrap their saves in
+``acting_user``; other events have no actor. Lead time
+runs from a task's creation to its completion and cycle time from its first
+move to ``in_progress`` to its completion. Both are measured per completion
+event, so a window of completions is read through the time index and each
+one looks up its task's earlier events through the per-task index.
+"""
+import datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import TASK_MODELS, TaskEvent
+
+CODES = TaskEvent.STATUS_CODES
+
+EVENT_BATCH_SIZE = 1000
+
+# Window of completions measured when the caller gives no start date.
+DEFAULT_FLOW_DAYS = 30
+
+_actor = ContextVar('task_event_actor', default=None)
+
+
+@contextmanager
+def acting_user(user_id):
+    """Attribute the events recorded by task saves inside the block to ``user_id``."""
+    token = _actor.set(user_id)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def current_actor():
+    return _actor.get()
+
+
+def record_transitions(transitions, actor_id):
+    """
+    Append an event for each ``(task, from_status)`` pair whose status
+    changed, timestamped with the task's ``updated_at``. ``from_status`` is
+    ``None`` for tasks that were just created.
+    """
+    events = [
+        TaskEvent(
+            task_id=task.pk,
+            from_status=CODES.get(from_status),
+            to_status=CODES[task.status],
+            actor_id=actor_id,
+            occurred_at=task.updated_at,
+        )
+        for task, from_status in transitions
+        if from_status != task.status
+    ]
+    TaskEvent.objects.bulk_create(events, batch_size=EVENT_BATCH_SIZE)
+
+
+def last_status(task_id):
+    """The status the latest event of ``task_id`` moved it to, or ``None`` without events."""
+    code = TaskEvent.objects.filter(task_id=task_id).order_by('-occurred_at', '-id').values_list(
+        'to_status', flat=True
+    ).first()
+    return TaskEvent.STATUS_NAMES.get(code)
+
+
+def task_history(task_id):
+    return TaskEvent.objects.filter(task_id=task_id).order_by('occurred_at', 'id')
+
+
+def _hours(duration):
+    return None if duration is None else round(duration.total_seconds() / 3600, 2)
+
+
+def with_flow_times(completions):
+    """Annotate completion events with their task's ``lead`` and ``cycle`` durations."""
+    earlier = TaskEvent.objects.filter(task_id=OuterRef('task_id'), occurred_at__lte=OuterRef('occurred_at'))
+    created = earlier.filter(from_status__isnull=True).values('occurred_at')[:1]
+    started = earlier.filter(to_status=CODES['in_progress']).order_by('occurred_at').values('occurred_at')[:1]
+    return completions.order_by().annotate(
+        lead=ExpressionWrapper(F('occurred_at') - Subquery(created), output_field=DurationField()),
+        cycle=ExpressionWrapper(F('occurred_at') - Subquery(started), output_field=DurationField()),
+    )
+
+
+def visible_completions(access, date_from, date_to):
+    """Completion events between ``date_from`` and ``date_to`` of tasks visible to ``access``."""
+    completions = TaskEvent.objects.filter(
+        to_status=CODES['completed'], occurred_at__gte=date_from, occurred_at__lte=date_to
+    )
+    if not access.is_superadmin:
+        visible = Q()
+        for model in TASK_MODELS:
+            visible |= Q(task_id__in=model.objects.visible_to(access).values('id'))
+        completions = completions.filter(visible)
+    return completions
+
+
+def flow_times(access, date_from=None, date_to=None):
+    """
+    Lead and cycle time statistics for the completions between ``date_from``
+    and ``date_to`` (default: the last ``DEFAULT_FLOW_DAYS`` days) of tasks
+    visible to ``access``.
+    """
+    date_to = date_to or timezone.now()
+    date_from = date_from or date_to - datetime.timedelta(days=DEFAULT_FLOW_DAYS)
+    completions = visible_completions(access, date_from, date_to)
+    
+    totals = with_flow_times(completions).aggregate(
+        completed=Count('id'),
+        lead_count=Count('lead'),
+        lead_average=Avg('lead'),
+        lead_max=Max('lead'),
+        cycle_count=Count('cycle'),
+        cycle_average=Avg('cycle'),
+        cycle_max=Max('cycle'),
+    )
+    return {
+        'date_from': date_from,
+        'date_to': date_to,
+        'completed': totals['completed'],
+        'lead_time_hours': {
+            'count': totals['lead_count'],
+            'average': _hours(totals['lead_average']),
+            'max': _hours(totals['lead_max']),
+        },
+        'cycle_time_hours': {
+            'count': totals['cycle_count'],
+            'average': _hours(totals['cycle_average']),
+            'max': _hours(totals['cycle_max']),
+        },
+    }
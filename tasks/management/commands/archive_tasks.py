@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.archive import archive_cutoff, archive_tasks
+
+
+class Command(BaseCommand):
+    help = 'Move completed tasks older than TASK_ARCHIVE_AFTER_DAYS to the archive table in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS,
+            help='Archive tasks completed and last updated more than this many days ago.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TASK_ARCHIVE_BATCH_SIZE,
+            help='Tasks moved per transaction.',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches, to leave room for other writers.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        count = archive_tasks(options['batch_size'], options['pause'], archive_cutoff(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {count} tasks in {time.monotonic() - started:.1f}s.'
+        ))
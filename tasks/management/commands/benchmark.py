@@ -0,0 +1,82 @@
+import json
+import platform
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from tasks.benchmarks import ENDPOINTS, ROLES, compare, measure, sample_context
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure latency percentiles, queries per request and peak memory for every '
+        'endpoint under each role, optionally failing on regressions against a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Measured requests per endpoint and role.')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests before measuring.')
+        parser.add_argument('--password', default='benchmark-pass', help='Password of the generated accounts.')
+        parser.add_argument('--endpoint', action='append', help='Only run these URL names (repeatable).')
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+        parser.add_argument('--baseline', help='JSON results of a previous run to compare against.')
+        parser.add_argument(
+            '--max-regression', type=float, default=0.25,
+            help='Allowed p90 slowdown against the baseline, as a fraction (default 0.25).',
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=1.0,
+            help='Ignore p90 slowdowns smaller than this many milliseconds.',
+        )
+
+    def handle(self, *args, **options):
+        endpoints = ENDPOINTS
+        if options['endpoint']:
+            endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.name in options['endpoint']]
+            if not endpoints:
+                raise CommandError('No endpoint matches --endpoint.')
+
+        samples = {role: sample_context(role, options['password']) for role in ROLES}
+        missing = [role for role, sample in samples.items() if sample is None]
+        if missing:
+            raise CommandError(
+                f'No suitable {", ".join(missing)} account found; run generate_fake_data first.'
+            )
+
+        results = {}
+        for endpoint in endpoints:
+            for role in endpoint.roles:
+                key = f'{endpoint.name}[{role}]'
+                result = measure(endpoint, samples[role], options['iterations'], options['warmup'])
+                results[key] = result
+                self.stdout.write(
+                    f"{key:<45} {result['status']}  p50 {result['p50_ms']:>8.2f}ms  "
+                    f"p90 {result['p90_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+                    f"{result['queries']:>3} queries  {result['peak_memory_kb']:>9.1f} KiB"
+                )
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'iterations': options['iterations'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())['results']
+            regressions = compare(results, baseline, options['max_regression'], options['min_delta_ms'])
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(regression))
+                raise CommandError(f'{len(regressions)} benchmark regression(s) against {options["baseline"]}.')
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline.'))
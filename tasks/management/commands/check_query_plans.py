@@ -0,0 +1,192 @@
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.settings import api_settings
+
+from accounts.access import UserAccess
+from admin_panel.views import admin_rows, recent_tasks, task_rows, user_rows
+from tasks import analytics, archive, changes, fast_serializers, history, reminders
+from tasks.filters import filter_tasks, task_ordering
+from tasks.models import Task, TaskStats
+from tasks.pagination import TaskCursorPagination
+from tasks.stats import GLOBAL_SCOPE
+from tasks.views import user_notifications
+
+# Placeholder primary keys used to build role-scoped queries; EXPLAIN only
+# needs literals, not existing rows.
+SAMPLE_PK = 1
+SAMPLE_MANAGED_IDS = (2, 3)
+
+ACCESSES = {
+    'superadmin': UserAccess(SAMPLE_PK, 'superadmin', has_profile=True),
+    'admin': UserAccess(SAMPLE_PK, 'admin', managed_user_ids=SAMPLE_MANAGED_IDS, has_profile=True),
+    'user': UserAccess(SAMPLE_PK, 'user', SAMPLE_PK, has_profile=True),
+}
+
+# Unfiltered pages read in index order stop after one page, so a scan of the
+# listed table is expected for them; a scan of any other table still fails.
+ORDERED_WALKS = {
+    'task_list[superadmin]',
+    'task_list.summary[superadmin]',
+    'admin_panel.task_list[superadmin]',
+    'admin_panel.user_list',
+    'dashboard.recent_tasks[superadmin]',
+}
+
+# Counting an unfiltered list reads every row of some index whatever the
+# plan, so these paginator counts are reported as warnings, not failures.
+FULL_COUNTS = {
+    'admin_panel.task_list.count[superadmin]',
+    'admin_panel.user_list.count',
+}
+
+# Only ``SEARCH`` reads a range of an index; ``SCAN ... USING INDEX`` walks
+# all of it. Full-text virtual tables report their match as a scan.
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(?!CONSTANT ROW)(\w+)\b(?! VIRTUAL TABLE)')
+POSTGRES_FULL_SCAN = re.compile(r'\bSeq Scan on (\w+)')
+
+
+def api_page(queryset, ordering=TaskCursorPagination.ordering):
+    return queryset.order_by(*ordering)[:api_settings.PAGE_SIZE + 1]
+
+
+def panel_page(queryset):
+    return queryset[:settings.ADMIN_PANEL_PAGE_SIZE]
+
+
+class PaginatorCount:
+    """The ``COUNT(*)`` a ``Paginator`` runs for ``queryset``, explained without running it."""
+    
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.model = queryset.model
+    
+    def using(self, alias):
+        return PaginatorCount(self.queryset.using(alias))
+    
+    def explain(self):
+        # What ``QuerySet.count()`` compiles to for a plain filtered queryset.
+        query = self.queryset.query.chain()
+        query.clear_ordering(force=True)
+        query.clear_select_clause()
+        query.add_annotation(Count('*'), 'count')
+        return query.explain(self.queryset.db)
+
+
+def per_model(label, querysets):
+    return [(f'{label}.{queryset.model._meta.model_name}', queryset) for queryset in querysets]
+
+
+def view_queries():
+    """
+    Return ``(label, queryset)`` pairs for the queries issued by the task and
+    admin panel views for each role, built with the helpers the views use.
+    """
+    since = timezone.now()
+    year = {'date_from': (since - timedelta(days=365)).date().isoformat(), 'date_to': since.date().isoformat()}
+    day = {'date_from': (since - timedelta(days=1)).isoformat(), 'date_to': since.isoformat()}
+    queries = []
+    for role, access in ACCESSES.items():
+        tasks = Task.objects.visible_to(access)
+        rows = fast_serializers.list_view({}).rows(tasks)
+        panel_rows = task_rows(tasks.order_by(*task_ordering({})))
+        queries += [
+            (f'task_list[{role}]', api_page(rows, task_ordering({}))),
+            (f'task_list.next[{role}]', api_page(rows.filter(created_at__lt=since), task_ordering({}))),
+            (f'admin_panel.task_list[{role}]', panel_page(panel_rows)),
+            (f'admin_panel.task_list.count[{role}]', PaginatorCount(panel_rows)),
+            *per_model(f'task_detail[{role}]', archive.task_queries(SAMPLE_PK, ('assigned_to', 'created_by'), access)),
+            (f'task_changes[{role}]', changes.changed_tasks(
+                access, since, SAMPLE_PK, changes.settled_before(since)
+            )[:changes.CHANGES_PAGE_SIZE + 1]),
+            (f'task_changes.deleted[{role}]', changes.deleted_tasks(
+                access, SAMPLE_PK, changes.settled_before(since)
+            )[:changes.CHANGES_PAGE_SIZE + 1]),
+            *per_model(f'task_analytics[{role}]', analytics.completion_sources(access, year)[1]),
+            *per_model(f'task_analytics.tasks[{role}]', analytics.completion_sources(access, day)[1]),
+            (f'task_flow_times[{role}]', history.with_flow_times(
+                history.visible_completions(access, since - timedelta(days=history.DEFAULT_FLOW_DAYS), since)
+            )),
+            (f'dashboard.recent_tasks[{role}]', recent_tasks(access)),
+        ]
+    search = {'search': 'report'}
+    queries += [
+        ('task_list.search', api_page(filter_tasks(Task.objects.all(), search), task_ordering(search))),
+        ('task_list.summary[superadmin]', api_page(
+            fast_serializers.list_view({'view': 'summary'}).rows(Task.objects.all())
+        )),
+        ('task_history', history.task_history(SAMPLE_PK)),
+        ('task_notifications', api_page(user_notifications(SAMPLE_PK))),
+        *[
+            (f'task_reminders.scan[{status}]', reminders.open_tasks(status, since, (since, SAMPLE_PK))[:1000])
+            for status in reminders.OPEN_STATUSES
+        ],
+        ('archive_tasks.scan', archive.archivable_tasks(since).values('id', 'assigned_to_id')[:1000]),
+        ('dashboard.stats', TaskStats.objects.filter(scope=GLOBAL_SCOPE)),
+        ('admin_panel.user_list', panel_page(user_rows())),
+        ('admin_panel.user_list.count', PaginatorCount(user_rows())),
+        ('admin_panel.admin_list', panel_page(admin_rows())),
+        ('admin_panel.admin_list.count', PaginatorCount(admin_rows())),
+    ]
+    return queries
+
+
+def full_scans(plan, vendor):
+    """Return the names of tables the plan reads without an index."""
+    if vendor == 'postgresql':
+        return POSTGRES_FULL_SCAN.findall(plan)
+    if vendor == 'sqlite':
+        return SQLITE_FULL_SCAN.findall(plan)
+    return []
+
+
+def unexpected_scans(label, queryset, plan, vendor):
+    scanned = full_scans(plan, vendor)
+    if label in ORDERED_WALKS:
+        scanned = [table for table in scanned if table != queryset.model._meta.db_table]
+    return scanned
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the queries issued by each view and fail on full table scans.'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to explain against.')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every query plan.')
+    
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        vendor = connection.vendor
+        if vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Full scan detection is not supported on {vendor}.')
+        
+        if vendor == 'postgresql':
+            # Small development tables make the planner prefer sequential
+            # scans; disabling them reports one only when no index applies.
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+        
+        failures = []
+        for label, queryset in view_queries():
+            plan = queryset.using(options['database']).explain()
+            scanned = unexpected_scans(label, queryset, plan, vendor)
+            if options['verbose_plans']:
+                self.stdout.write(f'{label}\n{plan}\n')
+            if scanned and label in FULL_COUNTS:
+                self.stdout.write(self.style.WARNING(f'COUNT SCAN {label}: {", ".join(sorted(set(scanned)))}'))
+            elif scanned:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'FULL SCAN  {label}: {", ".join(sorted(set(scanned)))}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'ok         {label}'))
+        
+        if failures:
+            raise CommandError(
+                f'{len(failures)} quer{"y" if len(failures) == 1 else "ies"} fell back to a full table scan.'
+            )
+        self.stdout.write(self.style.SUCCESS('All view queries use an index.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks.changes import compact_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete task deletion tombstones older than TASK_TOMBSTONE_RETENTION_DAYS.'
+
+    def handle(self, *args, **options):
+        count = compact_tombstones()
+        self.stdout.write(self.style.SUCCESS(f'Removed {count} task tombstones.'))
@@ -0,0 +1,155 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from tasks.analytics import rebuild_rollups
+from tasks.models import Task
+from tasks.stats import rebuild_stats
+
+User = get_user_model()
+
+# Share of tasks per status, roughly what a mature tenant looks like.
+STATUS_WEIGHTS = {
+    'completed': 55,
+    'in_progress': 15,
+    'pending': 30,
+}
+
+# Share of regular users that have an assigned admin.
+ASSIGNED_RATIO = 0.85
+
+WORDS = (
+    'update deploy review refactor migrate document test fix audit prepare '
+    'client report invoice dashboard api database backup release onboarding '
+    'schedule budget design survey payroll integration security training'
+).split()
+
+
+@contextmanager
+def explicit_timestamps(model):
+    """Let bulk_create store the generated created_at/updated_at values."""
+    fields = [model._meta.get_field('created_at'), model._meta.get_field('updated_at')]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic dataset of users, admins and tasks using bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Number of regular users.')
+        parser.add_argument('--admins', type=int, default=20, help='Number of admins.')
+        parser.add_argument('--superadmins', type=int, default=1, help='Number of superadmins.')
+        parser.add_argument('--tasks', type=int, default=100000, help='Number of tasks.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT batch.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible datasets.')
+        parser.add_argument('--prefix', default='bench', help='Username prefix for generated accounts.')
+        parser.add_argument('--password', default='benchmark-pass', help='Password set on every generated account.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['admins'] < 1 or options['superadmins'] < 1:
+            raise CommandError('At least one user, admin and superadmin is required.')
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f'Accounts prefixed "{prefix}_" already exist; choose another --prefix.')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        password = make_password(options['password'])
+
+        started = time.monotonic()
+        self.create_users(f'{prefix}_superadmin', options['superadmins'], 'superadmin', password)
+        admin_ids = self.create_users(f'{prefix}_admin', options['admins'], 'admin', password)
+        user_ids = self.create_users(f'{prefix}_user', options['users'], 'user', password, admin_ids)
+        self.create_tasks(options['tasks'], user_ids, admin_ids)
+
+        self.stdout.write('Rebuilding task stats...')
+        rebuild_stats()
+        self.stdout.write('Rebuilding completion rollups...')
+        rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.monotonic() - started:.1f}s.'))
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield range(start, min(start + self.batch_size, total))
+
+    def create_users(self, prefix, count, role, password, admin_ids=None):
+        ids = []
+        for batch in self.batches(count):
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(
+                        username=f'{prefix}_{i}',
+                        email=f'{prefix}_{i}@example.com',
+                        password=password,
+                        first_name=self.rng.choice(WORDS).title(),
+                        last_name=self.rng.choice(WORDS).title(),
+                        date_joined=self.now,
+                    )
+                    for i in batch
+                ])
+                UserProfile.objects.bulk_create([
+                    UserProfile(
+                        user_id=user.pk,
+                        role=role,
+                        assigned_admin_id=(
+                            self.rng.choice(admin_ids)
+                            if admin_ids and self.rng.random() < ASSIGNED_RATIO else None
+                        ),
+                    )
+                    for user in users
+                ])
+            ids.extend(user.pk for user in users)
+        self.stdout.write(f'Created {count} {role} accounts.')
+        return ids
+
+    def build_task(self, user_ids, creator_ids):
+        status = self.rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+        created_at = self.now - timedelta(seconds=self.rng.randrange(365 * 24 * 3600))
+        due_date = created_at + timedelta(hours=self.rng.randrange(24, 45 * 24))
+        updated_at = created_at + (self.now - created_at) * self.rng.random()
+        words = self.rng.choices(WORDS, k=self.rng.randrange(5, 60))
+        task = Task(
+            title=' '.join(self.rng.choices(WORDS, k=self.rng.randrange(2, 6))).capitalize(),
+            description=' '.join(words).capitalize() + '.',
+            assigned_to_id=self.rng.choice(user_ids),
+            created_by_id=self.rng.choice(creator_ids),
+            due_date=due_date,
+            status=status,
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+        if status == 'completed':
+            report_words = self.rng.choices(WORDS, k=self.rng.randrange(20, 200))
+            task.completion_report = ' '.join(report_words).capitalize() + '.'
+            hours = min(self.rng.lognormvariate(1.2, 0.7), 999)
+            task.worked_hours = Decimal(f'{hours:.2f}')
+            task.completed_at = updated_at
+        return task
+
+    def create_tasks(self, count, user_ids, creator_ids):
+        started = time.monotonic()
+        created = 0
+        with explicit_timestamps(Task):
+            for batch in self.batches(count):
+                with transaction.atomic():
+                    Task.objects.bulk_create([self.build_task(user_ids, creator_ids) for _ in batch])
+                created += len(batch)
+                rate = created / max(time.monotonic() - started, 1e-6)
+                self.stdout.write(f'Created {created}/{count} tasks ({rate:,.0f} rows/s)')
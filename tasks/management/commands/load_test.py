@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.benchmarks import LOAD_ENDPOINTS, ROLES, load_test, sample_context
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a read endpoint at increasing concurrency through the sync (WSGI) or, with '
+        'ASYNC_VIEWS enabled, the async (ASGI) request path and report throughput and peak memory.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(LOAD_ENDPOINTS), default='task_list')
+        parser.add_argument('--role', choices=ROLES, default='user')
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[1, 10, 50, 100],
+            help='Requests in flight; each level is a separate run.',
+        )
+        parser.add_argument('--requests', type=int, default=500, help='Requests per concurrency level.')
+        parser.add_argument('--password', default='benchmark-pass', help='Password of the generated accounts.')
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        sample = sample_context(options['role'], options['password'])
+        if sample is None:
+            raise CommandError(f'No suitable {options["role"]} account found; run generate_fake_data first.')
+
+        use_async = settings.ASYNC_VIEWS
+        endpoint = LOAD_ENDPOINTS[options['endpoint']]
+        self.stdout.write(f"{options['endpoint']}[{options['role']}] via {'asgi' if use_async else 'wsgi'}")
+
+        results = []
+        for concurrency in options['concurrency']:
+            result = load_test(endpoint, sample, concurrency, options['requests'], use_async)
+            results.append(result)
+            self.stdout.write(
+                f"concurrency {concurrency:>5}  {result['requests_per_second']:>8.1f} req/s  "
+                f"p50 {result['p50_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+                f"{result['peak_memory_kb']:>9.1f} KiB  {result['peak_threads']:>4} threads  "
+                f"{result['errors']} errors"
+            )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Wrote {options['output']}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks.analytics import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the completion rollups in TaskCompletionRollup from scratch.'
+
+    def handle(self, *args, **options):
+        count = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} task completion rollup rows.'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized dashboard counters in TaskStats from scratch.'
+
+    def handle(self, *args, **options):
+        count = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} task stats rows.'))
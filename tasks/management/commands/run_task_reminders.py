@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.reminders import run_reminders
+
+
+class Command(BaseCommand):
+    help = 'Send due-soon and overdue reminders for open tasks, once or every --interval seconds.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.TASK_REMINDER_WORKERS,
+            help='Threads processing batches in parallel.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TASK_REMINDER_BATCH_SIZE,
+            help='Tasks read and processed per batch.',
+        )
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Seconds between passes; 0 runs a single pass and exits.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            scanned, sent = run_reminders(options['workers'], options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Scanned {scanned} open tasks and sent {sent} reminders in {time.monotonic() - started:.1f}s.'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
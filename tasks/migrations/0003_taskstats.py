@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50, unique=True)),
+                ('total_users', models.IntegerField(default=0)),
+                ('total_admins', models.IntegerField(default=0)),
+                ('total_tasks', models.IntegerField(default=0)),
+                ('completed_tasks', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'task stats',
+            },
+        ),
+    ]
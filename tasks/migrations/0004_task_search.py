@@ -0,0 +1,87 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE tasks_task_fts USING fts5(
+        title, description, completion_report, content='tasks_task', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(rowid, title, description, completion_report)
+        VALUES (new.id, new.title, new.description, new.completion_report);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description, completion_report)
+        VALUES ('delete', old.id, old.title, old.description, old.completion_report);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF title, description, completion_report ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description, completion_report)
+        VALUES ('delete', old.id, old.title, old.description, old.completion_report);
+        INSERT INTO tasks_task_fts(rowid, title, description, completion_report)
+        VALUES (new.id, new.title, new.description, new.completion_report);
+    END
+    """,
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS tasks_task_fts_update',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_insert',
+    'DROP TABLE IF EXISTS tasks_task_fts',
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX task_search_idx ON tasks_task USING GIN (
+        to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '')
+        || ' ' || coalesce(completion_report, ''))
+    )
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS task_search_idx',
+]
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if cursor.fetchone()[0]:
+            return True
+        try:
+            cursor.execute('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)')
+        except Exception:
+            return False
+        cursor.execute('DROP TABLE temp.fts5_probe')
+        return True
+
+
+def run(statements_by_vendor):
+    def apply(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor == 'sqlite' and not sqlite_has_fts5(connection):
+            return
+        for statement in statements_by_vendor.get(connection.vendor, []):
+            schema_editor.execute(statement)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_taskstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
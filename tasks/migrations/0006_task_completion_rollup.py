@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:36
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_completions(apps, schema_editor):
+    # The completion time was not recorded before; the last update of a
+    # completed task is the closest approximation.
+    Task = apps.get_model('tasks', 'Task')
+    TaskCompletionRollup = apps.get_model('tasks', 'TaskCompletionRollup')
+    completed = Task.objects.filter(status='completed')
+    completed.update(completed_at=F('updated_at'))
+    rows = completed.order_by().values('assigned_to_id', day=TruncDate('completed_at')).annotate(
+        completed=Count('id'),
+        on_time=Count('id', filter=Q(completed_at__lte=F('due_date'))),
+        worked_hours=Sum('worked_hours'),
+    )
+    TaskCompletionRollup.objects.bulk_create([
+        TaskCompletionRollup(
+            user_id=row['assigned_to_id'],
+            day=row['day'],
+            completed=row['completed'],
+            on_time=row['on_time'],
+            late=row['completed'] - row['on_time'],
+            worked_hours=row['worked_hours'] or 0,
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0005_task_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCompletionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('completed', models.IntegerField(default=0)),
+                ('on_time', models.IntegerField(default=0)),
+                ('late', models.IntegerField(default=0)),
+                ('worked_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['completed_at'], name='task_completed_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='taskcompletionrollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='taskcompletionrollup',
+            index=models.Index(fields=['day'], name='rollup_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskcompletionrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='rollup_user_day_uniq'),
+        ),
+        migrations.RunPython(backfill_completions, migrations.RunPython.noop),
+    ]
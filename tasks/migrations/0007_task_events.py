@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+TIME_INDEX = {
+    # Events are appended in time order, so a BRIN index stays a few pages
+    # even at hundreds of millions of rows.
+    'postgresql': 'CREATE INDEX taskevent_time_idx ON tasks_taskevent USING BRIN (occurred_at)',
+}
+DEFAULT_TIME_INDEX = 'CREATE INDEX taskevent_time_idx ON tasks_taskevent (occurred_at)'
+
+# Existing tasks get a creation event and, unless still pending, a single
+# transition to their current status at the last known time. Their actual
+# intermediate transitions were never recorded. Rows are inserted in time
+# order, as live events are, before the time index is built.
+BACKFILL = """
+    INSERT INTO tasks_taskevent (task_id, from_status, to_status, actor_id, occurred_at)
+    SELECT task_id, from_status, to_status, actor_id, occurred_at FROM (
+        SELECT id AS task_id, NULL AS from_status, 1 AS to_status,
+            created_by_id AS actor_id, created_at AS occurred_at
+        FROM tasks_task
+        UNION ALL
+        SELECT id, 1, CASE status WHEN 'in_progress' THEN 2 ELSE 3 END,
+            NULL, COALESCE(completed_at, updated_at)
+        FROM tasks_task WHERE status <> 'pending'
+    ) AS events
+    ORDER BY occurred_at
+"""
+
+
+def create_time_index(apps, schema_editor):
+    schema_editor.execute(TIME_INDEX.get(schema_editor.connection.vendor, DEFAULT_TIME_INDEX))
+
+
+def drop_time_index(apps, schema_editor):
+    schema_editor.execute('DROP INDEX IF EXISTS taskevent_time_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_completion_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('from_status', models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Pending'), (2, 'In Progress'), (3, 'Completed')], null=True)),
+                ('to_status', models.PositiveSmallIntegerField(choices=[(1, 'Pending'), (2, 'In Progress'), (3, 'Completed')])),
+                ('actor_id', models.IntegerField(blank=True, null=True)),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task_id', 'to_status', 'occurred_at'], name='taskevent_task_idx')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+        migrations.RunPython(create_time_index, drop_time_index),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0007_task_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('due_soon', 'Due Soon'), ('overdue', 'Overdue')], max_length=20)),
+                ('due_date', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'due_date', 'id'], name='task_status_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='tasknotification',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='tasks.task'),
+        ),
+        migrations.AddField(
+            model_name='tasknotification',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tasknotification',
+            index=models.Index(fields=['user', '-created_at', 'id'], name='notification_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tasknotification',
+            constraint=models.UniqueConstraint(fields=('task', 'kind', 'due_date'), name='notification_once_uniq'),
+        ),
+    ]
@@ -1,9 +1,35 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from django.db.models.functions import Substr
+from django.utils import timezone
 
+# Characters of the description read for list previews, which show at most
+# a few words of it.
+DESCRIPTION_PREVIEW_LENGTH = 200
 
-class Task(models.Model):
+
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, access):
+        """Restrict to the tasks a user with the given ``UserAccess`` may see."""
+        if access.is_superadmin:
+            return self
+        if access.role == 'admin':
+            # The managed ids come with the access, so each assignee is a
+            # search of the assignee index rather than a join per task.
+            return self.filter(assigned_to_id__in=[access.user_id, *sorted(access.managed_user_ids)])
+        return self.filter(assigned_to_id=access.user_id)
+    
+    def with_description_preview(self):
+        """
+        Annotate ``description_preview``, the start of the description cut in
+        the database, for lists that should not read the full text.
+        """
+        return self.annotate(description_preview=Substr('description', 1, DESCRIPTION_PREVIEW_LENGTH))
+
+
+class AbstractTask(models.Model):
+    """Columns shared by live tasks and ``TaskArchive``."""
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('in_progress', 'In Progress'),
@@ -36,14 +62,54 @@ class Task(models.Model):
         blank=True,
         validators=[MinValueValidator(0)]
     )
+    completed_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TaskQuerySet.as_manager()
+    
     class Meta:
-        ordering = ['-created_at']
+        abstract = True
     
     def __str__(self):
         return f"{self.title} - {self.assigned_to.username}"
+
+
+class Task(AbstractTask):
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['assigned_to', 'status'], name='task_assignee_status_idx'),
+            models.Index(fields=['assigned_to', '-created_at'], name='task_assignee_created_idx'),
+            models.Index(fields=['-created_at', 'id'], name='task_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='task_updated_id_idx'),
+            models.Index(fields=['assigned_to', 'updated_at', 'id'], name='task_assignee_updated_idx'),
+            models.Index(
+                fields=['assigned_to'],
+                condition=models.Q(status='completed'),
+                name='task_completed_idx',
+            ),
+            models.Index(fields=['completed_at'], name='task_completed_at_idx'),
+            models.Index(fields=['status', 'due_date', 'id'], name='task_status_due_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        self.track_completion()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'completed_at'}
+        super().save(*args, **kwargs)
+    
+    def track_completion(self, now=None):
+        """
+        Stamp ``completed_at`` when the task becomes completed and clear it
+        when it leaves that status. Bulk writes, which bypass ``save``, call
+        this directly.
+        """
+        if self.status != 'completed':
+            self.completed_at = None
+        elif self.completed_at is None:
+            self.completed_at = now or timezone.now()
     
     def clean(self):
         if self.status == 'completed':
@@ -58,3 +124,184 @@ class Task(models.Model):
         else:
             self.completion_report = None
             self.worked_hours = None
+
+
+class TaskArchive(AbstractTask):
+    """
+    Completed tasks moved out of ``Task`` by the ``archive_tasks`` command
+    once older than ``TASK_ARCHIVE_AFTER_DAYS``. Rows keep their task id and
+    columns and are never updated; dashboard counters and completion rollups
+    still include them.
+    """
+    assigned_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_assigned_tasks')
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_created_tasks')
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['completed_at'], name='taskarchive_completed_at_idx'),
+        ]
+
+
+# Every table holding tasks, live ones first, for reads that also cover
+# archived tasks.
+TASK_MODELS = (Task, TaskArchive)
+
+
+class TaskStats(models.Model):
+    """
+    Materialized dashboard counters for one scope.
+    
+    Scopes are ``global``, ``admin:<user id>`` (the admin's assigned users and
+    their tasks) and ``user:<user id>`` (tasks assigned to the user). Rows are
+    kept current by the signal handlers in ``tasks.signals``.
+    """
+    scope = models.CharField(max_length=50, unique=True)
+    total_users = models.IntegerField(default=0)
+    total_admins = models.IntegerField(default=0)
+    total_tasks = models.IntegerField(default=0)
+    completed_tasks = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'task stats'
+    
+    def __str__(self):
+        return f"{self.scope}: {self.completed_tasks}/{self.total_tasks}"
+
+
+class TaskCompletionRollupQuerySet(models.QuerySet):
+    def visible_to(self, access):
+        """Restrict to the rollups of tasks a user with the given ``UserAccess`` could see."""
+        if access.is_superadmin:
+            return self
+        if access.role == 'admin':
+            return self.filter(
+                models.Q(user__userprofile__assigned_admin_id=access.user_id)
+                | models.Q(user_id=access.user_id)
+            )
+        return self.filter(user_id=access.user_id)
+
+
+class TaskCompletionRollup(models.Model):
+    """
+    Completed-task totals per assignee and local calendar day of
+    ``Task.completed_at``, kept current by ``tasks.analytics`` as tasks
+    enter or leave the completed status. A task is on time when it was
+    completed no later than its ``due_date``.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    completed = models.IntegerField(default=0)
+    on_time = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    worked_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    objects = TaskCompletionRollupQuerySet.as_manager()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='rollup_user_day_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='rollup_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} {self.day}: {self.completed}"
+
+
+class TaskTombstoneQuerySet(models.QuerySet):
+    def visible_to(self, access):
+        """Restrict to deletions of tasks a user with the given ``UserAccess`` could see."""
+        if access.is_superadmin:
+            return self
+        if access.role == 'admin':
+            return self.filter(
+                models.Q(assigned_admin_id=access.user_id) | models.Q(assigned_to_id=access.user_id)
+            )
+        return self.filter(assigned_to_id=access.user_id)
+
+
+class TaskTombstone(models.Model):
+    """
+    Records a deleted task for the changes feed.
+    
+    The assignee and their admin are copied as plain ids at deletion time,
+    since either user may be deleted along with the task. Rows older than
+    ``TASK_TOMBSTONE_RETENTION_DAYS`` are removed by the
+    ``compact_task_tombstones`` command.
+    """
+    task_id = models.BigIntegerField()
+    assigned_to_id = models.IntegerField()
+    assigned_admin_id = models.IntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    objects = TaskTombstoneQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['assigned_to_id', 'id'], name='tombstone_assignee_idx'),
+            models.Index(fields=['assigned_admin_id', 'id'], name='tombstone_admin_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Task {self.task_id} deleted at {self.deleted_at}"
+
+
+class TaskEvent(models.Model):
+    """
+    Append-only log of task status transitions.
+    
+    Statuses are stored as small integer codes (``STATUS_CODES``) and
+    ``from_status`` is null for the event recorded when a task is created.
+    The task and the acting user are plain ids so the history outlives
+    both. Rows are only ever inserted in ``occurred_at`` order, which the
+    migration indexes with BRIN on PostgreSQL and a B-tree elsewhere.
+    """
+    # Codes are stored in the table; never renumber them.
+    STATUS_CODES = {'pending': 1, 'in_progress': 2, 'completed': 3}
+    STATUS_NAMES = {1: 'pending', 2: 'in_progress', 3: 'completed'}
+    CODE_CHOICES = [(1, 'Pending'), (2, 'In Progress'), (3, 'Completed')]
+    
+    task_id = models.BigIntegerField()
+    from_status = models.PositiveSmallIntegerField(choices=CODE_CHOICES, null=True, blank=True)
+    to_status = models.PositiveSmallIntegerField(choices=CODE_CHOICES)
+    actor_id = models.IntegerField(null=True, blank=True)
+    occurred_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['task_id', 'to_status', 'occurred_at'], name='taskevent_task_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Task {self.task_id}: {self.STATUS_NAMES.get(self.from_status)} -> {self.STATUS_NAMES[self.to_status]}"
+
+
+class TaskNotification(models.Model):
+    """
+    A reminder sent to a task's assignee. At most one reminder of each kind
+    is sent per task and due date, so moving the due date allows new ones.
+    """
+    KIND_CHOICES = [
+        ('due_soon', 'Due Soon'),
+        ('overdue', 'Overdue'),
+    ]
+    
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='notifications')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    due_date = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'kind', 'due_date'], name='notification_once_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-created_at', 'id'], name='notification_user_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: task {self.task_id} for {self.user_id}"
@@ -0,0 +1,100 @@
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Keyset pagination for task listings.
+
+    The cursor encodes the last seen ``created_at`` position, so every page is
+    a bounded index range scan regardless of how deep the client has paged,
+    and rows inserted while paging never shift or duplicate results.
+
+    ``paginate_queryset`` is split into building the page query and
+    processing its rows so ``apaginate_queryset`` can fetch the rows with the
+    async ORM.
+    """
+    ordering = ('-created_at', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.paginate_results(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.paginate_results([task async for task in queryset])
+
+    def page_queryset(self, queryset, request, view=None):
+        """Return the sliced queryset for the requested page, one row longer than the page."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (self.offset, self.reverse, self.current_position) = (0, False, None)
+        else:
+            (self.offset, self.reverse, self.current_position) = self.cursor
+
+        if self.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith('-')
+            order_attr = order.lstrip('-')
+            if self.cursor.reverse != is_reversed:
+                queryset = queryset.filter(**{order_attr + '__lt': self.current_position})
+            else:
+                queryset = queryset.filter(**{order_attr + '__gt': self.current_position})
+
+        return queryset[self.offset:self.offset + self.page_size + 1]
+
+    def paginate_results(self, results):
+        """Set the page and the next/previous positions from the rows of ``page_queryset``."""
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (self.current_position is not None) or (self.offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = self.current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (self.current_position is not None) or (self.offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = self.current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
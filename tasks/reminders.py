@@ -0,0 +1,146 @@
+"""
+Due-soon and overdue reminders for open tasks.
+
+A pass walks the open tasks due before the reminder horizon through the
+``(status, due_date, id)`` index in keyset batches and hands each batch to a
+thread pool. Workers skip reminders already recorded in
+``TaskNotification``, insert the rest and optionally email the ones they
+inserted themselves, so overlapping passes never send a reminder twice. Only
+a few batches are in flight at once, so memory stays flat however many tasks
+are open.
+"""
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task, TaskNotification
+
+OPEN_STATUSES = ('pending', 'in_progress')
+
+# Batches queued per worker before the scan waits for one to finish.
+BATCHES_PER_WORKER = 2
+
+_sqlite_write_lock = threading.Lock()
+
+SUBJECTS = {
+    'due_soon': 'Task due soon: {title}',
+    'overdue': 'Task overdue: {title}',
+}
+
+
+def open_tasks(status, horizon, position=None):
+    """Tasks in ``status`` due before ``horizon`` after the ``(due_date, id)`` ``position``."""
+    tasks = Task.objects.filter(status=status, due_date__lt=horizon).order_by('due_date', 'id')
+    if position is not None:
+        due_date, task_id = position
+        tasks = tasks.filter(Q(due_date__gt=due_date) | Q(due_date=due_date, id__gt=task_id))
+    return tasks
+
+
+def open_task_batches(horizon, batch_size):
+    """
+    Yield lists of ``(id, title, assigned_to_id, email, due_date)`` for open
+    tasks due before ``horizon``, ``batch_size`` rows at a time.
+    """
+    fields = ('id', 'title', 'assigned_to_id', 'assigned_to__email', 'due_date')
+    for status in OPEN_STATUSES:
+        position = None
+        while True:
+            rows = list(open_tasks(status, horizon, position).values_list(*fields)[:batch_size])
+            if not rows:
+                break
+            yield rows
+            position = rows[-1][4], rows[-1][0]
+
+
+def claim(notifications):
+    """
+    Insert ``notifications`` and return those this call inserted. A
+    concurrent pass may have recorded some of them in the meantime; their
+    rows keep the other pass's ``created_at``, which ``bulk_create`` set on
+    each instance to the microsecond, so only the rows carrying ours are
+    this pass's to deliver.
+    """
+    TaskNotification.objects.bulk_create(notifications, ignore_conflicts=True)
+    stamped = {(n.task_id, n.kind, n.due_date): n.created_at for n in notifications}
+    stored = TaskNotification.objects.filter(
+        task_id__in={n.task_id for n in notifications}
+    ).values_list('task_id', 'kind', 'due_date', 'created_at')
+    claimed = {
+        (task_id, kind, due_date)
+        for task_id, kind, due_date, created_at in stored
+        if stamped.get((task_id, kind, due_date)) == created_at
+    }
+    return [n for n in notifications if (n.task_id, n.kind, n.due_date) in claimed]
+
+
+def send_reminders(rows, now):
+    """Record and deliver the reminders for one batch; returns how many were new."""
+    wanted = {
+        (task_id, 'overdue' if due_date < now else 'due_soon', due_date): (title, user_id, email)
+        for task_id, title, user_id, email, due_date in rows
+    }
+    # SQLite allows a single writer; concurrent inserts fail rather than wait,
+    # and reads of a table another thread is writing fail the same way.
+    lock = _sqlite_write_lock if connection.vendor == 'sqlite' else nullcontext()
+    with lock, transaction.atomic():
+        sent = set(
+            TaskNotification.objects.filter(task_id__in=[row[0] for row in rows])
+            .values_list('task_id', 'kind', 'due_date')
+        )
+        notifications = [
+            TaskNotification(task_id=task_id, user_id=user_id, kind=kind, due_date=due_date)
+            for (task_id, kind, due_date), (_, user_id, _) in wanted.items()
+            if (task_id, kind, due_date) not in sent
+        ]
+        if not notifications:
+            return 0
+        notifications = claim(notifications)
+    
+    if settings.TASK_REMINDER_EMAIL:
+        messages = []
+        for notification in notifications:
+            title, _, email = wanted[(notification.task_id, notification.kind, notification.due_date)]
+            if email:
+                subject = SUBJECTS[notification.kind].format(title=title)
+                body = f'"{title}" is due {timezone.localtime(notification.due_date):%Y-%m-%d %H:%M}.'
+                messages.append((subject, body, settings.DEFAULT_FROM_EMAIL, [email]))
+        send_mass_mail(messages, fail_silently=True)
+    return len(notifications)
+
+
+def _run_batch(rows, now):
+    try:
+        return send_reminders(rows, now)
+    finally:
+        # Worker threads each hold their own connection.
+        connection.close()
+
+
+def run_reminders(workers=None, batch_size=None, now=None):
+    """
+    Run one reminder pass and return ``(tasks_scanned, reminders_sent)``.
+    """
+    workers = workers or settings.TASK_REMINDER_WORKERS
+    batch_size = batch_size or settings.TASK_REMINDER_BATCH_SIZE
+    now = now or timezone.now()
+    horizon = now + datetime.timedelta(hours=settings.TASK_REMINDER_DUE_SOON_HOURS)
+    
+    slots = threading.BoundedSemaphore(workers * BATCHES_PER_WORKER)
+    scanned = 0
+    futures = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='task-reminders') as pool:
+        for rows in open_task_batches(horizon, batch_size):
+            slots.acquire()
+            future = pool.submit(_run_batch, rows, now)
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+            scanned += len(rows)
+    return scanned, sum(future.result() for future in futures)
@@ -0,0 +1,51 @@
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SQLITE_FTS_TABLE = 'tasks_task_fts'
+
+SQLITE_SEARCH_SQL = f'SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s'
+
+# Must match the expression of the task_search_idx GIN index exactly for
+# PostgreSQL to use it.
+POSTGRES_SEARCH_VECTOR = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '') "
+    "|| ' ' || coalesce(completion_report, ''))"
+)
+
+POSTGRES_SEARCH_SQL = (
+    f"SELECT id FROM tasks_task WHERE {POSTGRES_SEARCH_VECTOR} @@ websearch_to_tsquery('english', %s)"
+)
+
+_fts_available = {}
+
+
+def sqlite_fts_available(using='default'):
+    if using not in _fts_available:
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SQLITE_FTS_TABLE])
+            _fts_available[using] = cursor.fetchone() is not None
+    return _fts_available[using]
+
+
+def fts5_query(text):
+    """Quote each term of ``text`` as an FTS5 prefix query so user input cannot inject operators."""
+    terms = text.split()
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_condition(text, using='default'):
+    """
+    Return a ``Q`` matching tasks whose title, description or completion
+    report contain ``text``, through the backend's full-text index.
+    
+    SQLite uses the ``tasks_task_fts`` FTS5 table and PostgreSQL the
+    ``task_search_idx`` GIN index; other backends, or SQLite builds without
+    FTS5, fall back to ``icontains``.
+    """
+    vendor = connections[using].vendor
+    if vendor == 'sqlite' and sqlite_fts_available(using):
+        return Q(pk__in=RawSQL(SQLITE_SEARCH_SQL, [fts5_query(text)]))
+    if vendor == 'postgresql':
+        return Q(pk__in=RawSQL(POSTGRES_SEARCH_SQL, [text]))
+    return Q(title__icontains=text) | Q(description__icontains=text) | Q(completion_report__icontains=text)
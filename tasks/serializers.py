@@ -1,9 +1,49 @@
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth import get_user_model
-from .models import Task
+from django.db import transaction
+from django.utils import timezone
+from . import events, history
+from .models import Task, TaskEvent, TaskNotification
 
 User = get_user_model()
 
+BULK_BATCH_SIZE = 1000
+
+
+def load_creator(request):
+    """
+    The requesting user with the username the task representation shows.
+    API users are authenticated from the token alone, so ``request.user``
+    is not a loaded ``User``; fetching it once spares a query per task.
+    """
+    try:
+        return User.objects.only('id', 'username').get(pk=request.user.pk)
+    except User.DoesNotExist:
+        # Deleted after the request was authenticated.
+        raise AuthenticationFailed('User not found', code='user_not_found')
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves primary keys against an ``{pk: instance}`` map stored in the
+    serializer context, so validating many rows does not query once per row.
+    """
+    
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+    
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return self.context[self.context_key][int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
 
 class TaskSerializer(serializers.ModelSerializer):
     assigned_to_username = serializers.CharField(source='assigned_to.username', read_only=True)
@@ -31,8 +71,56 @@ class TaskSerializer(serializers.ModelSerializer):
         return data
     
     def create(self, validated_data):
-        validated_data['created_by'] = self.context['request'].user
-        return super().create(validated_data)
+        creator = load_creator(self.context['request'])
+        validated_data['created_by'] = creator
+        with transaction.atomic(), history.acting_user(creator.pk):
+            task = super().create(validated_data)
+        events.task_saved(task, 'created')
+        return task
+
+
+class TaskSummarySerializer(serializers.ModelSerializer):
+    """
+    List representation without the long text columns: the
+    ``description_preview`` annotated by ``with_description_preview``
+    instead of the description, and no completion report.
+    """
+    assigned_to_username = serializers.CharField(source='assigned_to.username', read_only=True)
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+    description_preview = serializers.CharField(read_only=True)
+    
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'title', 'description_preview', 'assigned_to', 'assigned_to_username',
+            'created_by', 'created_by_username', 'due_date', 'status',
+            'worked_hours', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class BulkTaskListSerializer(serializers.ListSerializer):
+    def create(self, validated_data):
+        creator = load_creator(self.context['request'])
+        user_id = creator.pk
+        tasks = [Task(created_by=creator, **attrs) for attrs in validated_data]
+        now = timezone.now()
+        for task in tasks:
+            task.track_completion(now)
+        tasks = Task.objects.bulk_create(tasks, batch_size=BULK_BATCH_SIZE)
+        history.record_transitions([(task, None) for task in tasks], user_id)
+        return tasks
+
+
+class BulkTaskSerializer(TaskSerializer):
+    """
+    ``TaskSerializer`` for arrays of new tasks. Assignees are looked up from
+    the ``assignees`` context map and rows are inserted with ``bulk_create``.
+    """
+    assigned_to = PrefetchedPrimaryKeyRelatedField(context_key='assignees', queryset=User.objects.all())
+    
+    class Meta(TaskSerializer.Meta):
+        list_serializer_class = BulkTaskListSerializer
 
 
 class TaskUpdateSerializer(serializers.ModelSerializer):
@@ -40,6 +128,16 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
         model = Task
         fields = ['status', 'completion_report', 'worked_hours']
     
+    def update(self, instance, validated_data):
+        old_status = instance.status
+        was_completed = old_status == 'completed'
+        request = self.context.get('request')
+        with transaction.atomic(), history.acting_user(request.user.pk if request else None):
+            task = super().update(instance, validated_data)
+        completed = task.status == 'completed' and not was_completed
+        events.task_saved(task, 'completed' if completed else 'updated')
+        return task
+    
     def validate(self, data):
         if data.get('status') == 'completed':
             if not data.get('completion_report'):
@@ -62,6 +160,29 @@ class TaskReportSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'assigned_to', 'assigned_to_username',
             'created_by', 'created_by_username', 'due_date', 'status',
-            'completion_report', 'worked_hours', 'created_at', 'updated_at'
+            'completion_report', 'worked_hours', 'completed_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = '__all__'
+        read_only_fields = fields
+
+
+class TaskEventSerializer(serializers.ModelSerializer):
+    from_status = serializers.SerializerMethodField()
+    to_status = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = TaskEvent
+        fields = ['id', 'from_status', 'to_status', 'actor_id', 'occurred_at']
+    
+    def get_from_status(self, event):
+        return TaskEvent.STATUS_NAMES.get(event.from_status)
+    
+    def get_to_status(self, event):
+        return TaskEvent.STATUS_NAMES[event.to_status]
+
+
+class TaskNotificationSerializer(serializers.ModelSerializer):
+    task_title = serializers.CharField(source='task.title', read_only=True)
+    
+    class Meta:
+        model = TaskNotification
+        fields = ['id', 'task', 'task_title', 'kind', 'due_date', 'created_at']
@@ -0,0 +1,199 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from . import analytics, caching, changes, history, stats
+from .models import TASK_MODELS, Task, TaskArchive, TaskStats
+
+User = get_user_model()
+
+
+def _apply_task_delta(user_id, tasks, completed):
+    admin_id = stats.assigned_admin_id(user_id)
+    stats.bump(stats.scopes_for_user(user_id, admin_id), total_tasks=tasks, completed_tasks=completed)
+
+
+def _invalidate_task_reads(*user_ids):
+    # Versions are bumped even when caching is disabled: they are also the
+    # task list's ETag.
+    caching.bump_users(stats.assigned_admin_ids({user_id for user_id in user_ids if user_id}))
+
+
+def _invalidate_profile_reads(*admin_ids):
+    # The user and admin totals shown on the dashboards live in the global
+    # and admin scopes.
+    caching.bump_scopes([stats.GLOBAL_SCOPE, *(stats.admin_scope(admin_id) for admin_id in admin_ids if admin_id)])
+
+
+@receiver(post_init, sender=Task)
+def remember_task_state(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not loaded just for bookkeeping.
+    instance._stats_state = (instance.__dict__.get('assigned_to_id'), instance.__dict__.get('status'))
+    instance._rollup_entry = analytics.loaded_entry(instance)
+
+
+def _record_status_event(task, created, old_status):
+    # Every save goes through here, so the admin site, management commands
+    # and plain saves leave history as the API does.
+    if created:
+        old_status = None
+    elif old_status is None:
+        # Deferred when loaded: the latest event tells the previous status.
+        old_status = history.last_status(task.pk)
+        if old_status is None:
+            return
+    history.record_transitions([(task, old_status)], history.current_actor())
+
+
+@receiver(post_save, sender=Task)
+def update_task_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    
+    old_user, old_status = instance._stats_state
+    new_user, new_status = instance.assigned_to_id, instance.status
+    new_completed = int(new_status == 'completed')
+    
+    if created:
+        _apply_task_delta(new_user, 1, new_completed)
+    elif old_status is None or old_user is None:
+        # Status or assignee was deferred when the task was loaded, so the
+        # previous state is unknown; recompute the affected scopes instead.
+        for scope in stats.scopes_for_user(new_user, stats.assigned_admin_id(new_user)):
+            stats.refresh_stats(scope)
+    elif old_user != new_user:
+        _apply_task_delta(old_user, -1, -int(old_status == 'completed'))
+        _apply_task_delta(new_user, 1, new_completed)
+        changes.record_removals([instance.pk], old_user, stats.assigned_admin_id(old_user))
+    elif old_status != new_status:
+        _apply_task_delta(new_user, 0, new_completed - int(old_status == 'completed'))
+    
+    _record_status_event(instance, created, old_status)
+    _invalidate_task_reads(old_user, new_user)
+    instance._stats_state = (new_user, new_status)
+
+
+@receiver(post_save, sender=Task)
+def update_task_rollups(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    
+    old_entry = None if created else instance._rollup_entry
+    new_entry = analytics.task_entry(instance)
+    if old_entry is analytics.UNKNOWN:
+        # A field was deferred when the task was loaded.
+        analytics.refresh_user_rollups(instance.assigned_to_id)
+    elif old_entry != new_entry:
+        deltas = analytics.new_deltas()
+        analytics.add_delta(deltas, old_entry, -1)
+        analytics.add_delta(deltas, new_entry)
+        analytics.apply_rollup_deltas(deltas)
+    
+    instance._rollup_entry = new_entry
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=TaskArchive)
+def remove_task_stats(sender, instance, **kwargs):
+    # When the assignee is being deleted the profile may already be gone;
+    # remove_profile_stats then takes the remaining tasks off the admin scope.
+    _apply_task_delta(instance.assigned_to_id, -1, -int(instance.status == 'completed'))
+    _invalidate_task_reads(instance.assigned_to_id)
+    
+    deltas = analytics.new_deltas()
+    analytics.add_delta(deltas, analytics.task_entry(instance), -1)
+    analytics.apply_rollup_deltas(deltas)
+
+
+@receiver(post_init, sender=UserProfile)
+def remember_profile_state(sender, instance, **kwargs):
+    instance._stats_state = (instance.__dict__.get('role'), instance.__dict__.get('assigned_admin_id'))
+
+
+def _move_user_between_admins(user_id, old_admin, new_admin):
+    counts = stats.get_stats(stats.user_scope(user_id))
+    if old_admin:
+        stats.bump(
+            [stats.admin_scope(old_admin)],
+            total_users=-1,
+            total_tasks=-counts.total_tasks,
+            completed_tasks=-counts.completed_tasks,
+        )
+    if new_admin:
+        stats.bump(
+            [stats.admin_scope(new_admin)],
+            total_users=1,
+            total_tasks=counts.total_tasks,
+            completed_tasks=counts.completed_tasks,
+        )
+
+
+def _record_admin_change(user_id, old_admin, new_admin):
+    tasks = Task.objects.filter(assigned_to_id=user_id)
+    if old_admin:
+        changes.record_removals(tasks.values_list('pk', flat=True), user_id, old_admin)
+    if new_admin:
+        # Nothing else about the tasks changed, so mark them for the new
+        # admin's changes feed.
+        tasks.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=UserProfile)
+def update_profile_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    
+    old_role, old_admin = (None, None) if created else instance._stats_state
+    
+    if old_role != instance.role:
+        deltas = {}
+        if old_role in stats.ROLE_COUNTERS:
+            deltas[stats.ROLE_COUNTERS[old_role]] = -1
+        if instance.role in stats.ROLE_COUNTERS:
+            deltas[stats.ROLE_COUNTERS[instance.role]] = 1
+        stats.bump([stats.GLOBAL_SCOPE], **deltas)
+    
+    if old_admin != instance.assigned_admin_id:
+        _move_user_between_admins(instance.user_id, old_admin, instance.assigned_admin_id)
+        _record_admin_change(instance.user_id, old_admin, instance.assigned_admin_id)
+    
+    if (old_role, old_admin) != (instance.role, instance.assigned_admin_id):
+        _invalidate_profile_reads(old_admin, instance.assigned_admin_id)
+    
+    instance._stats_state = (instance.role, instance.assigned_admin_id)
+
+
+@receiver(post_delete, sender=UserProfile)
+def remove_profile_stats(sender, instance, origin=None, **kwargs):
+    if instance.role in stats.ROLE_COUNTERS:
+        stats.bump([stats.GLOBAL_SCOPE], **{stats.ROLE_COUNTERS[instance.role]: -1})
+    if instance.assigned_admin_id:
+        _move_user_between_admins(instance.user_id, instance.assigned_admin_id, None)
+        # When the user is deleted, their tasks are tombstoned as deleted.
+        if changes.origin_model(origin) is not User:
+            _record_admin_change(instance.user_id, instance.assigned_admin_id, None)
+    _invalidate_profile_reads(instance.assigned_admin_id)
+
+
+@receiver(post_delete, sender=User)
+def remove_user_stats(sender, instance, **kwargs):
+    TaskStats.objects.filter(scope__in=[stats.user_scope(instance.pk), stats.admin_scope(instance.pk)]).delete()
+
+
+@receiver(pre_delete, sender=User)
+def record_user_task_deletions(sender, instance, **kwargs):
+    # pre_delete runs before anything in the cascade is deleted, so the
+    # assignees' admins can still be read.
+    for model in TASK_MODELS:
+        changes.record_deletions(model.objects.filter(Q(assigned_to=instance) | Q(created_by=instance)))
+
+
+@receiver(pre_delete, sender=Task)
+def record_task_deletion(sender, instance, origin=None, **kwargs):
+    # Tasks removed by a user cascade were recorded in bulk above.
+    if changes.origin_model(origin) is User:
+        return
+    changes.record_deletions(Task.objects.filter(pk=instance.pk))
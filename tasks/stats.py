@@ -0,0 +1,152 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from .models import TASK_MODELS, TaskStats
+
+GLOBAL_SCOPE = 'global'
+
+# Profile roles counted on the superadmin dashboard.
+ROLE_COUNTERS = {
+    'user': 'total_users',
+    'admin': 'total_admins',
+}
+
+TASK_COUNTS = {
+    'total_tasks': Count('id'),
+    'completed_tasks': Count('id', filter=Q(status='completed')),
+}
+
+
+def admin_scope(admin_id):
+    return f'admin:{admin_id}'
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def assigned_admin_id(user_id):
+    return UserProfile.objects.filter(user_id=user_id).values_list('assigned_admin_id', flat=True).first()
+
+
+def assigned_admin_ids(user_ids):
+    """Map each of ``user_ids`` to their assigned admin id in one query."""
+    admins = dict(
+        UserProfile.objects.filter(user_id__in=user_ids).values_list('user_id', 'assigned_admin_id')
+    )
+    return {user_id: admins.get(user_id) for user_id in user_ids}
+
+
+def scopes_for_user(user_id, admin_id=None):
+    """Return every scope whose task counters include tasks assigned to ``user_id``."""
+    scopes = [GLOBAL_SCOPE, user_scope(user_id)]
+    if admin_id:
+        scopes.append(admin_scope(admin_id))
+    return scopes
+
+
+def _task_counts(**filters):
+    """``TASK_COUNTS`` over the live and archived tasks matching ``filters``."""
+    counts = dict.fromkeys(TASK_COUNTS, 0)
+    for model in TASK_MODELS:
+        for counter, value in model.objects.filter(**filters).order_by().aggregate(**TASK_COUNTS).items():
+            counts[counter] += value
+    return counts
+
+
+def _grouped_task_counts(field, **filters):
+    """``TASK_COUNTS`` per value of ``field`` over the live and archived tasks matching ``filters``."""
+    grouped = {}
+    for model in TASK_MODELS:
+        for row in model.objects.filter(**filters).order_by().values(field).annotate(**TASK_COUNTS):
+            counts = grouped.setdefault(row.pop(field), dict.fromkeys(TASK_COUNTS, 0))
+            for counter, value in row.items():
+                counts[counter] += value
+    return grouped
+
+
+def compute_stats(scope):
+    """Compute the counters for ``scope`` from scratch with conditional aggregates."""
+    if scope == GLOBAL_SCOPE:
+        counts = UserProfile.objects.aggregate(**{
+            counter: Count('id', filter=Q(role=role)) for role, counter in ROLE_COUNTERS.items()
+        })
+        counts.update(_task_counts())
+        return counts
+    
+    kind, owner_id = scope.split(':')
+    if kind == 'admin':
+        counts = UserProfile.objects.filter(assigned_admin_id=owner_id).aggregate(total_users=Count('id'))
+        counts.update(_task_counts(assigned_to__userprofile__assigned_admin_id=owner_id))
+        return counts
+    return _task_counts(assigned_to_id=owner_id)
+
+
+def refresh_stats(scope):
+    stats, _ = TaskStats.objects.update_or_create(scope=scope, defaults=compute_stats(scope))
+    return stats
+
+
+def get_stats(scope):
+    """Return the materialized counters for ``scope``, computing them on first use."""
+    stats = TaskStats.objects.filter(scope=scope).first()
+    if stats is None:
+        stats = refresh_stats(scope)
+    return stats
+
+
+def bump(scopes, **deltas):
+    """
+    Apply counter deltas to the given scopes in a single UPDATE.
+    
+    Scopes without a row are skipped; they are computed lazily by
+    :func:`get_stats` the next time they are read.
+    """
+    changes = {counter: F(counter) + delta for counter, delta in deltas.items() if delta}
+    if changes:
+        TaskStats.objects.filter(scope__in=scopes).update(updated_at=timezone.now(), **changes)
+
+
+def rebuild_stats():
+    """Recompute every scope with one grouped aggregate per table and replace all rows."""
+    rows = {GLOBAL_SCOPE: compute_stats(GLOBAL_SCOPE)}
+    
+    for user_id, counts in _grouped_task_counts('assigned_to_id').items():
+        rows[user_scope(user_id)] = counts
+    
+    admin_field = 'assigned_to__userprofile__assigned_admin_id'
+    for admin_id, counts in _grouped_task_counts(admin_field, **{f'{admin_field}__isnull': False}).items():
+        rows.setdefault(admin_scope(admin_id), {}).update(counts)
+    
+    admin_users = UserProfile.objects.order_by().filter(assigned_admin__isnull=False)
+    for row in admin_users.values('assigned_admin_id').annotate(total_users=Count('id')):
+        rows.setdefault(admin_scope(row.pop('assigned_admin_id')), {}).update(row)
+    
+    with transaction.atomic():
+        TaskStats.objects.all().delete()
+        TaskStats.objects.bulk_create(
+            [TaskStats(scope=scope, **counts) for scope, counts in rows.items()],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def apply_task_deltas(deltas):
+    """
+    Apply per-assignee task counter deltas for writes that bypass model
+    signals (``bulk_create``/``bulk_update``).
+    
+    ``deltas`` maps an assignee id to a ``(total_tasks, completed_tasks)``
+    pair. Assigned admins are resolved in one query and each affected scope
+    receives a single UPDATE.
+    """
+    admins = assigned_admin_ids(deltas)
+    totals = {}
+    for user_id, (tasks, completed) in deltas.items():
+        for scope in scopes_for_user(user_id, admins.get(user_id)):
+            scope_tasks, scope_completed = totals.get(scope, (0, 0))
+            totals[scope] = (scope_tasks + tasks, scope_completed + completed)
+    for scope, (tasks, completed) in totals.items():
+        bump([scope], total_tasks=tasks, completed_tasks=completed)
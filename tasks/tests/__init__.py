@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from accounts.models import UserProfile
+from accounts.tokens import tokens_for_user
+
+DUE_DATE = '2030-01-01T00:00:00Z'
+
+# Tests clear the cache, so they must not use the shared default one.
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_user(username, role='user', admin=None):
+    user = User.objects.create_user(username)
+    UserProfile.objects.create(user=user, role=role, assigned_admin=admin)
+    return user
+
+
+def api_client(user):
+    """An ``APIClient`` sending an access token for ``user``, as real clients do."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens_for_user(user).access_token}')
+    return client
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.access import load_access
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UserAccessTests(TestCase):
+    """Role and scope are loaded once, cached and invalidated by profile changes."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.other_admin = make_user('other admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        cls.task = Task.objects.create(
+            title='task', description='d', assigned_to=cls.user, created_by=cls.admin, due_date=DUE_DATE,
+        )
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_load_and_cache(self):
+        with self.assertNumQueries(1):
+            access = load_access(self.admin)
+        self.assertEqual(access.role, 'admin')
+        self.assertEqual(access.managed_user_ids, {self.user.pk})
+        self.assertTrue(access.manages(self.user.pk))
+        with self.assertNumQueries(0):
+            self.assertEqual(load_access(self.admin).managed_user_ids, {self.user.pk})
+    
+    def test_reassignment_invalidates_both_admins(self):
+        load_access(self.admin), load_access(self.other_admin), load_access(self.user)
+        profile = self.user.userprofile
+        profile.assigned_admin = self.other_admin
+        profile.save()
+        self.assertEqual(load_access(self.admin).managed_user_ids, set())
+        self.assertEqual(load_access(self.other_admin).managed_user_ids, {self.user.pk})
+        self.assertEqual(load_access(self.user).assigned_admin_id, self.other_admin.pk)
+    
+    def test_api_scope(self):
+        url = reverse('update_task', args=[self.task.pk])
+        self.assertEqual(api_client(self.admin).get(url).status_code, 200)
+        self.assertEqual(api_client(self.other_admin).get(url).status_code, 403)
+    
+    def test_admin_panel_reads_one_profile_query(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin_panel:task_list'))
+        self.assertEqual(response.status_code, 200)
+        profile_queries = [query for query in queries if 'accounts_userprofile' in query['sql']]
+        self.assertLessEqual(len(profile_queries), 1)
+    
+    def test_decorators(self):
+        superadmin = make_user('root', 'superadmin')
+        for user, url_name, status_code in [
+            (self.user, 'admin_panel:user_list', 302),
+            (self.admin, 'admin_panel:user_list', 302),
+            (superadmin, 'admin_panel:user_list', 200),
+        ]:
+            with self.subTest(user=user.username, url_name=url_name):
+                self.client.force_login(user)
+                self.assertEqual(self.client.get(reverse(url_name)).status_code, status_code)
@@ -0,0 +1,98 @@
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks import analytics
+from tasks.models import Task, TaskCompletionRollup
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+PAST_DUE_DATE = '2020-01-01T00:00:00Z'
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CompletionRollupTests(TestCase):
+    """The incrementally maintained rollup matches a rebuild after every kind of write."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        cls.other_user = make_user('other user', 'user', cls.admin)
+    
+    def setUp(self):
+        cache.clear()
+    
+    def create_task(self, due_date=DUE_DATE, **fields):
+        return Task.objects.create(
+            title='task', description='d', assigned_to=self.user, created_by=self.admin, due_date=due_date, **fields
+        )
+    
+    def rollup(self):
+        rows = TaskCompletionRollup.objects.filter(completed__gt=0)
+        return sorted(rows.values_list('user_id', 'day', 'completed', 'on_time', 'late', 'worked_hours'))
+    
+    def assertRollupCurrent(self):
+        incremental = self.rollup()
+        analytics.rebuild_rollups()
+        self.assertEqual(incremental, self.rollup())
+        return incremental
+    
+    def complete(self, task, hours):
+        task.status = 'completed'
+        task.completion_report = 'done'
+        task.worked_hours = hours
+        task.save()
+    
+    def test_status_changes(self):
+        today = timezone.localdate()
+        on_time, late = self.create_task(), self.create_task(PAST_DUE_DATE)
+        self.complete(on_time, '2.00')
+        self.complete(late, '3.50')
+        self.assertEqual(self.assertRollupCurrent(), [(self.user.pk, today, 2, 1, 1, Decimal('5.50'))])
+        
+        on_time.worked_hours = '4.00'
+        on_time.save()
+        late.status = 'in_progress'
+        late.save()
+        self.assertEqual(self.assertRollupCurrent(), [(self.user.pk, today, 1, 1, 0, Decimal('4.00'))])
+    
+    def test_reassignment(self):
+        task = self.create_task()
+        self.complete(task, '2.00')
+        task.assigned_to = self.other_user
+        task.save()
+        self.assertEqual([row[0] for row in self.assertRollupCurrent()], [self.other_user.pk])
+    
+    def test_deletion(self):
+        task = self.create_task()
+        self.complete(task, '2.00')
+        task.delete()
+        self.assertEqual(self.assertRollupCurrent(), [])
+    
+    def test_deferred_fields(self):
+        task = self.create_task()
+        task = Task.objects.only('id', 'status').get(pk=task.pk)
+        self.complete(task, '2.00')
+        self.assertEqual(len(self.assertRollupCurrent()), 1)
+    
+    def test_rollup_and_task_sources_agree(self):
+        self.complete(self.create_task(), '2.00')
+        self.complete(self.create_task(PAST_DUE_DATE), '1.00')
+        client = api_client(self.admin)
+        today = timezone.localdate()
+        yesterday = timezone.localtime() - datetime.timedelta(days=1)
+        responses = [
+            client.get(reverse('task_analytics'), {'group_by': 'user,day', 'date_from': str(today)}).json(),
+            client.get(reverse('task_analytics'), {'group_by': 'user,day', 'date_from': yesterday.isoformat()}).json(),
+        ]
+        self.assertEqual([response['source'] for response in responses], ['rollup', 'tasks'])
+        self.assertEqual(responses[0]['results'], responses[1]['results'])
+        self.assertEqual(responses[0]['results'], [{
+            'user_id': self.user.pk, 'period': str(today), 'completed': 2, 'on_time': 1, 'late': 1,
+            'worked_hours': 3.0, 'average_hours': 1.5,
+        }])
@@ -0,0 +1,82 @@
+import datetime
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.access import load_access
+from tasks import archive, stats
+from tasks.models import Task, TaskArchive, TaskNotification
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES, TASK_ARCHIVE_AFTER_DAYS=30)
+class TaskArchiveTests(TestCase):
+    """Old completed tasks move to ``TaskArchive`` in batches and stay readable by id."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.other_admin = make_user('other admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        old = timezone.now() - datetime.timedelta(days=60)
+        cls.old_tasks = [cls.create_task('old', status='completed') for _ in range(3)]
+        Task.objects.filter(pk__in=[task.pk for task in cls.old_tasks]).update(completed_at=old, updated_at=old)
+        cls.recent = cls.create_task('recent', status='completed')
+        cls.open = cls.create_task('open')
+        TaskNotification.objects.create(
+            task=cls.old_tasks[0], user=cls.user, kind='overdue', due_date=cls.old_tasks[0].due_date,
+        )
+    
+    @classmethod
+    def create_task(cls, title, **fields):
+        return Task.objects.create(
+            title=title, description='d', assigned_to=cls.user, created_by=cls.admin, due_date=DUE_DATE,
+            completion_report='done', worked_hours='1.00', **fields,
+        )
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_moves_old_completed_tasks_in_batches(self):
+        counters = stats.compute_stats(stats.GLOBAL_SCOPE)
+        self.assertEqual(archive.archive_tasks(batch_size=2), 3)
+        self.assertEqual(set(TaskArchive.objects.values_list('pk', flat=True)), {task.pk for task in self.old_tasks})
+        self.assertEqual(set(Task.objects.values_list('pk', flat=True)), {self.recent.pk, self.open.pk})
+        self.assertFalse(TaskNotification.objects.exists())
+        archived = TaskArchive.objects.get(pk=self.old_tasks[0].pk)
+        self.assertEqual((archived.completion_report, archived.assigned_to_id), ('done', self.user.pk))
+        # Archived tasks still count.
+        self.assertEqual(stats.compute_stats(stats.GLOBAL_SCOPE), counters)
+        self.assertEqual(archive.archive_tasks(batch_size=2), 0)
+    
+    def test_command(self):
+        out = StringIO()
+        call_command('archive_tasks', '--days', '90', stdout=out)
+        self.assertIn('Archived 0 tasks', out.getvalue())
+        call_command('archive_tasks', '--batch-size', '1', stdout=out)
+        self.assertIn('Archived 3 tasks', out.getvalue())
+    
+    def test_get_task(self):
+        archive.archive_tasks(batch_size=10)
+        old = archive.get_task(self.old_tasks[0].pk, 'assigned_to')
+        self.assertIsInstance(old, TaskArchive)
+        self.assertEqual(old.assigned_to.username, 'user')
+        self.assertIsInstance(archive.get_task(self.recent.pk), Task)
+        self.assertIsNone(archive.get_task(0))
+        
+        self.assertIsNotNone(archive.get_task(old.pk, access=load_access(self.admin)))
+        self.assertIsNone(archive.get_task(old.pk, access=load_access(self.other_admin)))
+    
+    def test_reads(self):
+        archive.archive_tasks(batch_size=10)
+        client = api_client(self.user)
+        response = client.get(reverse('task_report', args=[self.old_tasks[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['completion_report'], 'done')
+        titles = [row['title'] for row in client.get(reverse('task_list')).json()['results']]
+        self.assertEqual(sorted(titles), ['open', 'recent'])
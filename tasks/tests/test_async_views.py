@@ -0,0 +1,93 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from accounts import async_views as account_views
+from accounts.tokens import tokens_for_user
+from tasks import async_views
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AsyncViewTests(TestCase):
+    """The async read views authenticate and scope results like the DRF views they replace."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.other_admin = make_user('other admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        cls.task = Task.objects.create(
+            title='task', description='d', assigned_to=cls.user, created_by=cls.admin, due_date=DUE_DATE,
+            status='completed', completion_report='done', worked_hours='1.50',
+        )
+        Task.objects.create(
+            title='own', description='d', assigned_to=cls.admin, created_by=cls.admin, due_date=DUE_DATE,
+        )
+    
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+    
+    def request(self, path, user=None, method='get', token=None):
+        if user is not None:
+            token = str(tokens_for_user(user).access_token)
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        request = getattr(self.factory, method)(path, headers=headers)
+        request.user = AnonymousUser()
+        return request
+    
+    async def get_list(self, user, **params):
+        path = reverse('task_list') + '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        return await async_views.task_list(await sync_to_async(self.request)(path, user))
+    
+    async def test_authentication(self):
+        path = reverse('task_list')
+        response = await async_views.task_list(self.request(path))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+        response = await async_views.task_list(self.request(path, token='not-a-token'))
+        self.assertEqual(response.status_code, 401)
+        response = await async_views.task_list(await sync_to_async(self.request)(path, self.user, 'post'))
+        self.assertEqual(response.status_code, 405)
+    
+    async def test_session_authentication(self):
+        request = self.request(reverse('task_list'))
+        request.user = self.user
+        self.assertEqual((await async_views.task_list(request)).status_code, 200)
+    
+    async def test_list_visibility(self):
+        for user, titles in [(self.user, ['task']), (self.admin, ['own', 'task']), (self.other_admin, [])]:
+            with self.subTest(user=user.username):
+                response = await self.get_list(user)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(sorted(row['title'] for row in json.loads(response.content)['results']), titles)
+    
+    async def test_list_matches_sync_view(self):
+        response = await self.get_list(self.admin, page_size=1)
+        sync_response = await sync_to_async(api_client(self.admin).get)(reverse('task_list'), {'page_size': 1})
+        self.assertEqual(json.loads(response.content), sync_response.json())
+        response = await self.get_list(self.admin, status='done')
+        self.assertEqual(response.status_code, 400)
+    
+    async def test_report(self):
+        path = reverse('task_report', args=[self.task.pk])
+        for user, status_code in [(self.user, 200), (self.admin, 200), (self.other_admin, 403)]:
+            with self.subTest(user=user.username):
+                request = await sync_to_async(self.request)(path, user)
+                response = await async_views.task_report(request, self.task.pk)
+                self.assertEqual(response.status_code, status_code)
+        request = await sync_to_async(self.request)(path, self.user)
+        self.assertEqual((await async_views.task_report(request, 0)).status_code, 404)
+    
+    async def test_profile(self):
+        request = await sync_to_async(self.request)(reverse('profile'), self.user)
+        response = await account_views.profile(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['username'], 'user')
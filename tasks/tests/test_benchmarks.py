@@ -0,0 +1,20 @@
+from django.test import SimpleTestCase
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from tasks.benchmarks import ENDPOINTS
+
+
+def url_names(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            # The Django admin site is not part of the application.
+            if pattern.namespace != 'admin':
+                yield from url_names(pattern.url_patterns, pattern.namespace or namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}:{pattern.name}' if namespace else pattern.name
+
+
+class EndpointCoverageTests(SimpleTestCase):
+    def test_every_named_route_is_benchmarked(self):
+        routes = set(url_names(get_resolver().url_patterns))
+        self.assertEqual(routes - {endpoint.name for endpoint in ENDPOINTS}, set())
@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BulkCreateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+    
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.admin)
+    
+    def bulk_create(self, count):
+        rows = [
+            {'title': f'task {i}', 'description': 'd', 'assigned_to': self.user.pk, 'due_date': DUE_DATE}
+            for i in range(count)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/tasks/bulk/create/', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual({task['created_by_username'] for task in response.data}, {'admin'})
+        return len(queries)
+    
+    def test_query_count_does_not_grow_with_rows(self):
+        # The first request also warms per-process caches.
+        self.bulk_create(1)
+        self.assertEqual(self.bulk_create(10), self.bulk_create(50))
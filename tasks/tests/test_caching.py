@@ -0,0 +1,50 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from tasks import caching, stats
+
+from . import LOCMEM_CACHES, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProfileInvalidationTests(TestCase):
+    """Profile changes invalidate the cached dashboards showing user and admin totals."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.other_admin = make_user('other', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+    
+    def setUp(self):
+        cache.clear()
+    
+    def assert_invalidates(self, scopes, change):
+        before = {scope: caching.scope_signature([scope]) for scope in scopes}
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        for scope in scopes:
+            self.assertNotEqual(caching.scope_signature([scope]), before[scope], scope)
+    
+    def test_new_user(self):
+        self.assert_invalidates([stats.GLOBAL_SCOPE], lambda: make_user('new'))
+    
+    def test_new_user_of_admin(self):
+        scopes = [stats.GLOBAL_SCOPE, stats.admin_scope(self.admin.pk)]
+        self.assert_invalidates(scopes, lambda: make_user('new', 'user', self.admin))
+    
+    def test_role_change(self):
+        def promote():
+            self.user.userprofile.role = 'admin'
+            self.user.userprofile.save()
+        self.assert_invalidates([stats.GLOBAL_SCOPE, stats.admin_scope(self.admin.pk)], promote)
+    
+    def test_reassignment(self):
+        def reassign():
+            self.user.userprofile.assigned_admin = self.other_admin
+            self.user.userprofile.save()
+        scopes = [stats.GLOBAL_SCOPE, stats.admin_scope(self.admin.pk), stats.admin_scope(self.other_admin.pk)]
+        self.assert_invalidates(scopes, reassign)
+    
+    def test_deletion(self):
+        self.assert_invalidates([stats.GLOBAL_SCOPE, stats.admin_scope(self.admin.pk)], self.user.delete)
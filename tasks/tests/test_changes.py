@@ -0,0 +1,86 @@
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.access import fetch_access
+from tasks import changes
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES, TASK_CHANGES_SAFETY_LAG=0)
+class ChangesFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superadmin = make_user('root', 'superadmin')
+        cls.admin = make_user('admin', 'admin')
+        cls.other_admin = make_user('other', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        cls.teammate = make_user('teammate', 'user', cls.admin)
+        cls.other_user = make_user('other_user', 'user', cls.other_admin)
+    
+    def setUp(self):
+        cache.clear()
+        self.task = Task.objects.create(
+            title='task', description='d', assigned_to=self.user, created_by=self.admin, due_date=DUE_DATE,
+        )
+        self.task_id = self.task.pk
+        self.cursors = {}
+        for reader in self.readers():
+            self.feed(reader)
+    
+    def readers(self):
+        return [self.superadmin, self.admin, self.other_admin, self.user, self.teammate, self.other_user]
+    
+    def feed(self, reader):
+        """Return ``(upserted ids, deleted ids)`` for ``reader`` since their last call."""
+        position = self.cursors.get(reader.pk) or changes.start_position(None)
+        tasks, deleted, cursor, _ = changes.task_changes(fetch_access(reader.pk), position, 100)
+        self.cursors[reader.pk] = changes.decode_cursor(cursor)
+        return [task.pk for task in tasks], deleted
+    
+    def assert_feeds(self, upserted, deleted):
+        for reader in self.readers():
+            expected = (
+                [self.task_id] if reader in upserted else [],
+                [self.task_id] if reader in deleted else [],
+            )
+            with self.subTest(reader=reader.username):
+                self.assertEqual(self.feed(reader), expected)
+    
+    def test_reassignment_to_another_admin(self):
+        self.task.assigned_to = self.other_user
+        self.task.save()
+        self.assert_feeds(
+            upserted=[self.superadmin, self.other_admin, self.other_user],
+            deleted=[self.admin, self.user],
+        )
+    
+    def test_reassignment_within_a_team(self):
+        self.task.assigned_to = self.teammate
+        self.task.save()
+        self.assert_feeds(upserted=[self.superadmin, self.admin, self.teammate], deleted=[self.user])
+    
+    def test_assignee_moves_to_another_admin(self):
+        profile = self.user.userprofile
+        profile.assigned_admin = self.other_admin
+        profile.save()
+        self.assert_feeds(upserted=[self.superadmin, self.other_admin, self.user], deleted=[self.admin])
+    
+    def test_deletion(self):
+        self.task.delete()
+        self.assert_feeds(upserted=[], deleted=[self.superadmin, self.admin, self.user])
+    
+    @override_settings(TASK_CHANGES_SAFETY_LAG=60)
+    def test_recent_changes_are_held_back(self):
+        self.task.title = 'renamed'
+        self.task.save()
+        self.assertEqual(self.feed(self.user), ([], []))
+        # Once the write is older than the lag it is returned.
+        later = timezone.now() + datetime.timedelta(minutes=2)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(self.feed(self.user), ([self.task_id], []))
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskListConditionalTests(TestCase):
+    """The task list answers ``If-None-Match`` with a 304 until its rows change."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        cls.task = Task.objects.create(
+            title='task', description='d', assigned_to=cls.user, created_by=cls.admin, due_date=DUE_DATE,
+        )
+    
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('task_list')
+    
+    def get(self, user, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return api_client(user).get(self.url, **headers)
+    
+    def test_not_modified_until_write(self):
+        etag = self.get(self.user)['ETag']
+        for _ in range(2):
+            # The second request is answered from the cached page.
+            response = self.get(self.user, etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = api_client(self.admin).put(
+                reverse('update_task', args=[self.task.pk]), {'status': 'in_progress'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.get(self.user, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['results'][0]['status'], 'in_progress')
+        self.assertEqual(self.get(self.user, response['ETag']).status_code, 304)
+    
+    def test_not_modified_runs_no_query(self):
+        etag = self.get(self.user)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(self.user, etag).status_code, 304)
+    
+    def test_deletion_changes_etag(self):
+        response = self.get(self.user)
+        self.assertNotIn('Last-Modified', response)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.delete()
+        response = self.get(self.user, response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+        # Without a Last-Modified to compare with, a date alone never gives a 304.
+        response = api_client(self.user).get(self.url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_etag_not_shared_across_scopes(self):
+        # The admin sees exactly the user's rows, but under a different scope.
+        user_etag = self.get(self.user)['ETag']
+        admin_etag = self.get(self.admin)['ETag']
+        self.assertNotEqual(user_etag, admin_etag)
+        for _ in range(2):
+            response = self.get(self.admin, user_etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['ETag'], admin_etag)
+        self.assertEqual(self.get(self.user, admin_etag).status_code, 200)
+
+
+@override_settings(TASK_CACHE_TIMEOUT=0)
+class UncachedTaskListConditionalTests(TaskListConditionalTests):
+    """The same, with every page rendered from the database."""
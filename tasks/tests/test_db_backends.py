@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import OperationalError, connection, connections, transaction
+from django.test import SimpleTestCase
+
+from task_manager.db_backends import pool
+from task_manager.db_backends.sqlite3.base import DatabaseWrapper
+
+
+class FakeConnection:
+    closed = False
+    
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_released_connections_are_reused(self):
+        connection_pool = pool.ConnectionPool(max_size=1)
+        conn = connection_pool.acquire(FakeConnection)
+        connection_pool.release(conn)
+        self.assertIs(connection_pool.acquire(FakeConnection), conn)
+    
+    def test_unusable_connections_are_discarded(self):
+        connection_pool = pool.ConnectionPool(max_size=1)
+        conn = connection_pool.acquire(FakeConnection)
+        connection_pool.release(conn, reuse=False)
+        self.assertTrue(conn.closed)
+        
+        conn = connection_pool.acquire(FakeConnection)
+        connection_pool.release(conn)
+        replacement = connection_pool.acquire(FakeConnection, check=lambda conn: False)
+        self.assertIsNot(replacement, conn)
+        self.assertTrue(conn.closed)
+    
+    def test_size_is_capped(self):
+        connection_pool = pool.ConnectionPool(max_size=1, timeout=0)
+        connection_pool.acquire(FakeConnection)
+        with self.assertRaisesMessage(OperationalError, 'pool max_size is 1'):
+            connection_pool.acquire(FakeConnection)
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    """Connections get the configured pragmas, begin IMMEDIATE transactions and come from the pool."""
+    
+    alias = 'sqlite_backend_test'
+    
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'db.sqlite3')
+        self.addCleanup(pool._pools.pop, self.alias, None)
+    
+    def wrapper(self, **options):
+        settings_dict = {
+            **connection.settings_dict,
+            'NAME': self.path,
+            'CONN_HEALTH_CHECKS': False,
+            'OPTIONS': options,
+        }
+        wrapper = DatabaseWrapper(settings_dict, self.alias)
+        self.addCleanup(wrapper.close)
+        connections[self.alias] = wrapper
+        self.addCleanup(connections.__delitem__, self.alias)
+        return wrapper
+    
+    def test_pragmas(self):
+        wrapper = self.wrapper(pragmas={'journal_mode': 'WAL', 'busy_timeout': 1234, 'synchronous': 'NORMAL'})
+        with wrapper.cursor() as cursor:
+            values = [cursor.execute(f'PRAGMA {name}').fetchone()[0] for name in ('journal_mode', 'busy_timeout')]
+            synchronous = cursor.execute('PRAGMA synchronous').fetchone()[0]
+        self.assertEqual(values, ['wal', 1234])
+        self.assertEqual(synchronous, 1)
+    
+    def other_writer_blocked(self):
+        """Return whether another connection is kept from writing during a read-only atomic block."""
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+        with transaction.atomic(using=self.alias):
+            connections[self.alias].cursor().execute('SELECT 1')
+            try:
+                other.execute('BEGIN IMMEDIATE')
+            except sqlite3.OperationalError:
+                return True
+            other.execute('ROLLBACK')
+            return False
+    
+    def test_deferred_transactions(self):
+        self.wrapper()
+        self.assertFalse(self.other_writer_blocked())
+    
+    def test_immediate_transactions(self):
+        self.wrapper(transaction_mode='IMMEDIATE')
+        self.assertTrue(self.other_writer_blocked())
+    
+    def test_pool_reuse(self):
+        wrapper = self.wrapper(pool={'max_size': 1, 'timeout': 0})
+        wrapper.ensure_connection()
+        conn = wrapper.connection
+        wrapper.close()
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, conn)
+        
+        # A connection closed mid-transaction is not handed out again.
+        wrapper.set_autocommit(False)
+        wrapper.close()
+        wrapper.ensure_connection()
+        self.assertIsNot(wrapper.connection, conn)
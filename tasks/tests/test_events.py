@@ -0,0 +1,103 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.access import UserAccess
+from tasks import events
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+
+async def delivered(subscription):
+    # publish() hands messages to the subscription's loop with call_soon_threadsafe.
+    await asyncio.sleep(0)
+    messages = []
+    while not subscription.queue.empty():
+        messages.append(subscription.queue.get_nowait())
+    return messages
+
+
+class TaskEventBrokerTests(SimpleTestCase):
+    """Events reach the assignee, their admin and superadmins, and closed streams unsubscribe."""
+    
+    def setUp(self):
+        self.broker = events.TaskEventBroker()
+    
+    async def test_fan_out(self):
+        user = self.broker.subscribe(UserAccess(1))
+        admin = self.broker.subscribe(UserAccess(2, 'admin'))
+        other = self.broker.subscribe(UserAccess(3))
+        superadmin = self.broker.subscribe(UserAccess(4, 'superadmin'))
+        
+        self.assertEqual(self.broker.publish('updated', {'id': 7}, {1, 2}), 3)
+        for subscription in (user, admin, superadmin):
+            [message] = await delivered(subscription)
+            self.assertIn('event: task.updated\ndata: {"id": 7}\n\n', message)
+        self.assertEqual(await delivered(other), [])
+    
+    async def test_closed_stream_unsubscribes(self):
+        subscription = self.broker.subscribe(UserAccess(1))
+        self.assertEqual(len(self.broker), 1)
+        with mock.patch.object(events, 'broker', self.broker):
+            stream = events.event_stream(subscription)
+            self.assertTrue((await anext(stream)).startswith('retry: '))
+            await stream.aclose()
+        self.assertEqual(len(self.broker), 0)
+        self.assertFalse(self.broker.has_subscribers())
+        self.assertEqual(self.broker.publish('updated', {'id': 7}, {1}), 0)
+    
+    @override_settings(TASK_EVENTS_QUEUE_SIZE=1)
+    async def test_overflow_closes_the_stream(self):
+        subscription = self.broker.subscribe(UserAccess(1))
+        for task_id in range(3):
+            self.broker.publish('updated', {'id': task_id}, {1})
+        await asyncio.sleep(0)
+        with mock.patch.object(events, 'broker', self.broker):
+            messages = [message async for message in events.event_stream(subscription)]
+        self.assertEqual(len(messages), 3)
+        self.assertIn('"id": 0', messages[1])
+        self.assertEqual(messages[2], events.OVERFLOW_EVENT)
+        self.assertEqual(len(self.broker), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskSavedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.other_admin = make_user('other admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        cls.task = Task.objects.create(
+            title='task', description='d', assigned_to=cls.user, created_by=cls.admin, due_date=DUE_DATE,
+        )
+    
+    def setUp(self):
+        cache.clear()
+    
+    def update_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = api_client(self.user).put(
+                reverse('update_task', args=[self.task.pk]), {'status': 'in_progress'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+    
+    async def test_serializer_saves_publish_after_commit(self):
+        broker = events.TaskEventBroker()
+        user = broker.subscribe(UserAccess(self.user.pk))
+        admin = broker.subscribe(UserAccess(self.admin.pk, 'admin'))
+        other_admin = broker.subscribe(UserAccess(self.other_admin.pk, 'admin'))
+        with mock.patch.object(events, 'broker', broker):
+            await sync_to_async(self.update_task)()
+        
+        for subscription in (user, admin):
+            [message] = await delivered(subscription)
+            self.assertIn('event: task.updated\n', message)
+            payload = json.loads(message.split('data: ', 1)[1])
+            self.assertEqual((payload['id'], payload['status']), (self.task.pk, 'in_progress'))
+        self.assertEqual(await delivered(other_admin), [])
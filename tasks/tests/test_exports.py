@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ExportFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('user')
+        for task_status in ('pending', 'completed'):
+            Task.objects.create(
+                title=task_status, description='d', assigned_to=cls.user, created_by=cls.user, due_date=DUE_DATE,
+                status=task_status, completion_report='done', worked_hours='1.00',
+            )
+    
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+    
+    def exported_titles(self, url_name, **params):
+        response = self.client.get(reverse(url_name), {'output': 'csv', **params})
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()[1:]
+        return sorted(line.split(',')[1] for line in lines)
+    
+    def test_status_filter(self):
+        self.assertEqual(self.exported_titles('export_tasks', status='pending'), ['pending'])
+        self.assertEqual(self.exported_titles('export_tasks'), ['completed', 'pending'])
+    
+    def test_invalid_status(self):
+        for url_name in ('export_tasks', 'export_reports'):
+            with self.subTest(url_name=url_name):
+                response = self.client.get(reverse(url_name), {'status': 'done'})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('status must be one of', response.json()['error'])
+    
+    def test_reports_stay_completed(self):
+        self.assertEqual(self.exported_titles('export_reports', status='pending'), ['completed'])
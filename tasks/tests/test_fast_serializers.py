@@ -0,0 +1,71 @@
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from tasks import fast_serializers
+from tasks.models import Task
+from tasks.serializers import TaskSerializer, TaskSummarySerializer
+
+from . import make_user
+
+SERIALIZERS = {'full': TaskSerializer, 'summary': TaskSummarySerializer}
+
+
+class RenderedBytesTests(TestCase):
+    """The fast path renders the same bytes as ``JSONRenderer`` rendering the serializer's data."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        admin = make_user('admin', 'admin')
+        user = make_user('zoë', 'user', admin)
+        due = datetime.datetime(2030, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+        rows = [
+            ('plain', 'words', 'pending', None, None, due),
+            (
+                'Tâche ✓ 日本語', 'ça "cite" \\ et\nligne fin', 'in_progress', None, None,
+                due.replace(microsecond=120),
+            ),
+            ('done', 'x' * 500, 'completed', 'report', Decimal('1.5'), due.replace(microsecond=999999)),
+            ('rounded', '', 'completed', 'rapport é', Decimal('12.25'), due - datetime.timedelta(days=400)),
+        ]
+        for title, description, status, report, hours, due_date in rows:
+            Task.objects.create(
+                title=title, description=description, status=status, completion_report=report,
+                worked_hours=hours, due_date=due_date, assigned_to=user, created_by=admin,
+            )
+    
+    def assert_same_bytes(self, convert=None):
+        """Compare both renderings, applying ``convert`` to every datetime read."""
+        for name, view in fast_serializers.LIST_VIEWS.items():
+            tasks = Task.objects.order_by('id')
+            if view.prepare is not None:
+                tasks = view.prepare(tasks)
+            rows, instances = list(view.rows(tasks)), list(tasks)
+            if convert is not None:
+                rows = [row._replace(**{
+                    field: convert(value) for field, value in row._asdict().items()
+                    if isinstance(value, datetime.datetime)
+                }) for row in rows]
+                for task in instances:
+                    for field in ('due_date', 'created_at', 'updated_at'):
+                        setattr(task, field, convert(getattr(task, field)))
+            with self.subTest(view=name):
+                fast = fast_serializers.render({'results': view.render(rows)})
+                drf = JSONRenderer().render({'results': SERIALIZERS[name](instances, many=True).data})
+                self.assertEqual(fast, drf)
+    
+    def test_aware_utc_datetimes(self):
+        self.assert_same_bytes()
+    
+    def test_aware_datetimes_in_another_time_zone(self):
+        with timezone.override('Asia/Kolkata'):
+            self.assert_same_bytes()
+    
+    def test_aware_datetimes_with_another_offset(self):
+        self.assert_same_bytes(lambda value: value.astimezone(datetime.timezone(datetime.timedelta(hours=-5))))
+    
+    def test_naive_datetimes(self):
+        self.assert_same_bytes(lambda value: value.replace(tzinfo=None))
@@ -0,0 +1,84 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tasks import history
+from tasks.models import Task, TaskEvent
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StatusEventTests(TestCase):
+    """Status transitions are recorded however the task is saved."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+    
+    def setUp(self):
+        cache.clear()
+    
+    def create_task(self, **fields):
+        return Task.objects.create(
+            title='task', description='d', assigned_to=self.user, created_by=self.admin, due_date=DUE_DATE, **fields
+        )
+    
+    def events(self, task):
+        return list(history.task_history(task.pk).values_list('from_status', 'to_status', 'actor_id'))
+    
+    def test_plain_saves(self):
+        task = self.create_task()
+        task.status = 'in_progress'
+        task.save()
+        task.title = 'renamed'
+        task.save()
+        codes = TaskEvent.STATUS_CODES
+        self.assertEqual(self.events(task), [
+            (None, codes['pending'], None),
+            (codes['pending'], codes['in_progress'], None),
+        ])
+    
+    def test_deferred_status(self):
+        task = self.create_task()
+        task = Task.objects.only('id', 'title').get(pk=task.pk)
+        task.status = 'in_progress'
+        task.save()
+        codes = TaskEvent.STATUS_CODES
+        self.assertEqual(self.events(task)[-1][:2], (codes['pending'], codes['in_progress']))
+    
+    def test_acting_user(self):
+        task = self.create_task()
+        with history.acting_user(self.admin.pk):
+            task.status = 'in_progress'
+            task.save()
+        self.assertEqual(self.events(task)[-1][2], self.admin.pk)
+    
+    def test_api_writes_record_each_event_once(self):
+        client = api_client(self.admin)
+        response = client.post(reverse('create_task'), {
+            'title': 't', 'description': 'd', 'assigned_to': self.user.pk, 'due_date': DUE_DATE,
+        }, format='json')
+        task = Task.objects.get(pk=response.json()['id'])
+        client.put(reverse('update_task', args=[task.pk]), {'status': 'in_progress'}, format='json')
+        codes = TaskEvent.STATUS_CODES
+        self.assertEqual(self.events(task), [
+            (None, codes['pending'], self.admin.pk),
+            (codes['pending'], codes['in_progress'], self.admin.pk),
+        ])
+    
+    def test_django_admin(self):
+        root = User.objects.create_superuser('root', password='pw')
+        self.client.force_login(root)
+        task = self.create_task()
+        response = self.client.post(reverse('admin:tasks_task_change', args=[task.pk]), {
+            'title': task.title, 'description': task.description, 'assigned_to': self.user.pk,
+            'created_by': self.admin.pk, 'due_date_0': '2030-01-01', 'due_date_1': '00:00:00',
+            'status': 'in_progress',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.events(task)[-1], (
+            TaskEvent.STATUS_CODES['pending'], TaskEvent.STATUS_CODES['in_progress'], root.pk,
+        ))
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.models import DESCRIPTION_PREVIEW_LENGTH, Task
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+DESCRIPTION = 'word ' * 1000
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ListProjectionTests(TestCase):
+    """List pages read a database-side description preview and never the completion report."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.task = Task.objects.create(
+            title='task', description=DESCRIPTION, assigned_to=cls.admin, created_by=cls.admin, due_date=DUE_DATE,
+            status='completed', completion_report='report ' * 1000, worked_hours='1.00',
+        )
+    
+    def setUp(self):
+        cache.clear()
+    
+    def assertReadsPreviewOnly(self, queries):
+        preview = 'SUBSTR("tasks_task"."description", 1, %d)' % DESCRIPTION_PREVIEW_LENGTH
+        task_queries = [query['sql'] for query in queries if 'FROM "tasks_task"' in query['sql']]
+        self.assertTrue(any(preview in sql for sql in task_queries))
+        for sql in task_queries:
+            self.assertNotIn('"description"', sql.replace(preview, ''))
+            self.assertNotIn('completion_report', sql)
+    
+    def test_api_summary_view(self):
+        client = api_client(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('task_list'), {'view': 'summary'})
+        [row] = response.json()['results']
+        self.assertEqual(row['description_preview'], DESCRIPTION[:DESCRIPTION_PREVIEW_LENGTH])
+        self.assertNotIn('completion_report', row)
+        self.assertReadsPreviewOnly(queries)
+        
+        self.assertEqual(client.get(reverse('task_list'), {'view': 'compact'}).status_code, 400)
+    
+    def test_admin_panel_task_list(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin_panel:task_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'word word')
+        self.assertNotContains(response, DESCRIPTION[:DESCRIPTION_PREVIEW_LENGTH + 5])
+        self.assertReadsPreviewOnly(queries)
+    
+    def test_report_reads_full_text(self):
+        data = api_client(self.admin).get(reverse('task_report', args=[self.task.pk])).json()
+        self.assertEqual(data['completion_report'], self.task.completion_report)
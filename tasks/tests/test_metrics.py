@@ -0,0 +1,68 @@
+import re
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from task_manager.metrics import RequestMetricsMiddleware, registry
+from tasks import fast_serializers
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, make_user
+
+
+def run_queries():
+    list(User.objects.all())
+    list(User.objects.all())
+
+
+class RequestQueryCountTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.request = RequestFactory().get('/')
+    
+    def recorded(self, histogram):
+        return float(re.search(rf'^{histogram}_sum\{{view="unresolved"\}} (\S+)$', registry.render(), re.M)[1])
+    
+    def recorded_queries(self):
+        return self.recorded('http_request_db_queries')
+    
+    def test_sync_view(self):
+        def view(request):
+            run_queries()
+            return HttpResponse()
+        RequestMetricsMiddleware(view)(self.request)
+        self.assertEqual(self.recorded_queries(), 2)
+    
+    def test_async_view_queries_run_in_other_threads(self):
+        async def view(request):
+            await sync_to_async(run_queries)()
+            await User.objects.acount()
+            return HttpResponse()
+        async_to_sync(RequestMetricsMiddleware(view))(self.request)
+        self.assertEqual(self.recorded_queries(), 3)
+    
+    def test_fast_serializer_time(self):
+        user = make_user('user')
+        for number in range(50):
+            Task.objects.create(
+                title=f'task {number}', description='d', assigned_to=user, created_by=user, due_date=DUE_DATE,
+            )
+        view = fast_serializers.list_view({})
+        rows = list(view.rows(Task.objects.all()))
+        
+        def list_view(request):
+            return HttpResponse(fast_serializers.render({'results': view.render(rows)}))
+        RequestMetricsMiddleware(list_view)(self.request)
+        self.assertGreater(self.recorded('http_request_serializer_duration_seconds'), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, METRICS_TOKEN='secret')
+class MetricsViewTests(TestCase):
+    def test_token(self):
+        for header, status in [('Bearer secret', 200), ('Bearer secreT', 403), ('secret', 403), (None, 403)]:
+            with self.subTest(header=header):
+                headers = {'HTTP_AUTHORIZATION': header} if header else {}
+                self.assertEqual(self.client.get(reverse('metrics'), **headers).status_code, status)
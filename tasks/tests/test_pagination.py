@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskListCursorTests(TestCase):
+    """The task list pages by cursor on ``(-created_at, id)``."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        cls.tasks = [cls.create_task(f'task {i}') for i in range(5)]
+    
+    @classmethod
+    def create_task(cls, title):
+        return Task.objects.create(
+            title=title, description='d', assigned_to=cls.user, created_by=cls.admin, due_date=DUE_DATE,
+        )
+    
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+    
+    def test_pages_are_stable_across_inserts(self):
+        response = self.client.get(reverse('task_list'), {'page_size': 2})
+        seen = [row['id'] for row in response.json()['results']]
+        next_url = response.json()['next']
+        self.create_task('inserted while paging')
+        while next_url:
+            data = self.client.get(next_url).json()
+            seen += [row['id'] for row in data['results']]
+            next_url = data['next']
+        self.assertEqual(seen, [task.pk for task in reversed(self.tasks)])
+    
+    def test_users_are_joined(self):
+        data = self.client.get(reverse('task_list')).json()
+        self.assertEqual(
+            {(row['assigned_to_username'], row['created_by_username']) for row in data['results']},
+            {('user', 'admin')},
+        )
+    
+    def test_deep_pages_run_the_same_queries(self):
+        url = self.client.get(reverse('task_list'), {'page_size': 1}).json()['next']
+        query_counts = []
+        for _ in range(3):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(url).json()
+            query_counts.append(len(queries))
+            url = data['next']
+        self.assertEqual(len(set(query_counts)), 1)
@@ -0,0 +1,30 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from tasks.management.commands.check_query_plans import full_scans
+
+
+class FullScanTests(TestCase):
+    def test_sqlite_plans(self):
+        cases = [
+            ('SCAN tasks_task', ['tasks_task']),
+            ('SCAN tasks_task USING INDEX task_created_id_idx', ['tasks_task']),
+            ('SCAN tasks_task USING COVERING INDEX task_created_id_idx', ['tasks_task']),
+            ('SEARCH tasks_task USING INDEX task_assignee_created_idx (assigned_to_id=?)', []),
+            ('SEARCH tasks_task USING INTEGER PRIMARY KEY (rowid=?)', []),
+            ('SCAN CONSTANT ROW', []),
+            ('SCAN tasks_task_fts VIRTUAL TABLE INDEX 0:M3', []),
+        ]
+        for plan, scanned in cases:
+            with self.subTest(plan=plan):
+                self.assertEqual(full_scans(plan, 'sqlite'), scanned)
+    
+    def test_view_queries_use_an_index(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('All view queries use an index.', out.getvalue())
+        # Paginator counts are explained too; an admin's is a range of an index.
+        self.assertIn('ok         admin_panel.task_list.count[admin]', out.getvalue())
+        self.assertIn('COUNT SCAN admin_panel.task_list.count[superadmin]', out.getvalue())
@@ -0,0 +1,56 @@
+import datetime
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks import reminders
+from tasks.models import Task, TaskNotification
+
+from . import make_user
+
+
+@override_settings(TASK_REMINDER_EMAIL=True)
+class ReminderDeliveryTests(TestCase):
+    """Each reminder is emailed once, by the pass that recorded it."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('user')
+        cls.user.email = 'user@example.com'
+        cls.user.save()
+        cls.now = timezone.now()
+        cls.tasks = [
+            Task.objects.create(
+                title=f'task {number}', description='d', assigned_to=cls.user, created_by=cls.user,
+                due_date=cls.now + datetime.timedelta(hours=number + 1),
+            )
+            for number in range(2)
+        ]
+    
+    def batch(self):
+        horizon = self.now + datetime.timedelta(days=1)
+        return [row for rows in reminders.open_task_batches(horizon, 100) for row in rows]
+    
+    def test_reminders_are_sent_once(self):
+        self.assertEqual(reminders.send_reminders(self.batch(), self.now), 2)
+        self.assertEqual(reminders.send_reminders(self.batch(), self.now), 0)
+        self.assertEqual(sorted(message.subject for message in mail.outbox), [
+            'Task due soon: task 0', 'Task due soon: task 1',
+        ])
+    
+    def test_reminder_recorded_by_an_overlapping_pass(self):
+        claim = reminders.claim
+        
+        def overlapping_claim(notifications):
+            # Another pass records the first reminder after this one checked.
+            TaskNotification.objects.create(
+                task=self.tasks[0], user=self.user, kind='due_soon', due_date=self.tasks[0].due_date,
+            )
+            return claim(notifications)
+        
+        with mock.patch('tasks.reminders.claim', overlapping_claim):
+            self.assertEqual(reminders.send_reminders(self.batch(), self.now), 1)
+        self.assertEqual([message.subject for message in mail.outbox], ['Task due soon: task 1'])
+        self.assertEqual(TaskNotification.objects.count(), 2)
@@ -0,0 +1,90 @@
+import re
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+TABLE = re.compile(r'"((?:tasks|accounts)_\w+|auth_user)"')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, DB_REPLICA_ALIASES=['replica'], TASK_CACHE_TIMEOUT=0)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Read views query the replica unless their user has just written."""
+    
+    @classmethod
+    def setUpClass(cls):
+        # The replica is a second connection to the test database, which only
+        # sees committed rows. It is registered here rather than in the
+        # settings, after the runner has set up the test databases; as a
+        # mirror it is not flushed between tests.
+        connections.settings['replica'] = {**connections['default'].settings_dict, 'TEST': {'MIRROR': 'default'}}
+        cls.addClassCleanup(cls.remove_replica)
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+    
+    @classmethod
+    def remove_replica(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+    
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('admin', 'admin')
+        self.user = make_user('user', 'user', self.admin)
+        self.task = Task.objects.create(
+            title='task', description='d', assigned_to=self.user, created_by=self.admin, due_date=DUE_DATE,
+            status='completed', completion_report='done', worked_hours='2.00',
+        )
+    
+    def tables_read(self, request):
+        """Return the tables ``request()`` read on the primary and on the replica."""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = request()
+        self.assertLess(response.status_code, 400)
+        return [
+            {table for query in queries for table in TABLE.findall(query['sql'])}
+            for queries in (primary.captured_queries, replica.captured_queries)
+        ]
+    
+    def assert_read_from_replica(self, request, table):
+        primary, replica = self.tables_read(request)
+        self.assertIn(table, replica)
+        self.assertNotIn(table, primary)
+    
+    def test_task_list(self):
+        client = api_client(self.user)
+        self.assert_read_from_replica(lambda: client.get(reverse('task_list')), 'tasks_task')
+    
+    def test_task_report(self):
+        client = api_client(self.admin)
+        self.assert_read_from_replica(lambda: client.get(reverse('task_report', args=[self.task.pk])), 'tasks_task')
+    
+    def test_profile(self):
+        client = api_client(self.user)
+        # Authorization loads the user's access from the primary once, then from the cache.
+        client.get(reverse('profile'))
+        self.assert_read_from_replica(lambda: client.get(reverse('profile')), 'accounts_userprofile')
+    
+    def test_dashboard(self):
+        self.client.force_login(self.admin)
+        self.assert_read_from_replica(lambda: self.client.get(reverse('admin_panel:dashboard')), 'tasks_task')
+    
+    def test_reads_after_a_write_use_the_primary(self):
+        client = api_client(self.admin)
+        response = client.post(reverse('create_task'), {
+            'title': 'new', 'description': 'd', 'assigned_to': self.user.pk, 'due_date': DUE_DATE,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        primary, replica = self.tables_read(lambda: client.get(reverse('task_list')))
+        self.assertIn('tasks_task', primary)
+        self.assertEqual(replica, set())
+        # Other users still read from the replica.
+        self.test_task_list()
@@ -0,0 +1,86 @@
+import importlib
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tasks import search
+from tasks.models import Task
+
+from . import DUE_DATE, LOCMEM_CACHES, api_client, make_user
+
+search_migration = importlib.import_module('tasks.migrations.0004_task_search')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskSearchTests(TestCase):
+    """``?search=`` goes through the full-text index, which follows every write."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('user')
+        cls.task = Task.objects.create(
+            title='Quarterly budget', description='Collect the invoices', assigned_to=cls.user,
+            created_by=cls.user, due_date=DUE_DATE,
+        )
+        Task.objects.create(
+            title='Unrelated', description='Nothing here', assigned_to=cls.user, created_by=cls.user,
+            due_date=DUE_DATE,
+        )
+    
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+    
+    def found(self, text):
+        response = self.client.get(reverse('task_list'), {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()['results']]
+    
+    def test_uses_the_fts_table(self):
+        self.assertTrue(search.sqlite_fts_available())
+        self.assertIn(search.SQLITE_FTS_TABLE, str(Task.objects.filter(search.search_condition('budget')).query))
+    
+    def test_matches_each_column_by_prefix(self):
+        self.assertEqual(self.found('budg'), [self.task.pk])
+        self.assertEqual(self.found('invoices'), [self.task.pk])
+        self.assertEqual(self.found('quarterly invoices'), [self.task.pk])
+        self.assertEqual(self.found('budget nothing'), [])
+    
+    def test_index_follows_writes(self):
+        self.task.completion_report = 'Signed off by finance'
+        self.task.title = 'Yearly plan'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.save()
+        self.assertEqual(self.found('finance'), [self.task.pk])
+        self.assertEqual(self.found('quarterly'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.delete()
+        self.assertEqual(self.found('finance'), [])
+    
+    def test_operators_are_quoted(self):
+        for text in ['budget OR', '"budget', 'NEAR(budget', 'title:budget', '*']:
+            with self.subTest(text=text):
+                self.found(text)
+    
+    def test_fallback_without_fts5(self):
+        with mock.patch.dict(search._fts_available, {connection.alias: False}):
+            self.assertNotIn(search.SQLITE_FTS_TABLE, str(Task.objects.filter(search.search_condition('x')).query))
+            self.assertEqual(self.found('invoices'), [self.task.pk])
+
+
+class PostgresSearchTests(TestCase):
+    def test_condition_uses_the_gin_expression(self):
+        connections = {'default': SimpleNamespace(vendor='postgresql')}
+        with mock.patch.object(search, 'connections', connections):
+            condition = search.search_condition('budget')
+        raw = condition.children[0][1]
+        self.assertEqual((raw.sql, raw.params), (search.POSTGRES_SEARCH_SQL, ['budget']))
+    
+    def test_index_expression_matches_the_query(self):
+        # PostgreSQL only uses the index for the identical expression.
+        index_sql = ' '.join(search_migration.POSTGRES_FORWARD[0].split())
+        self.assertIn(' '.join(search.POSTGRES_SEARCH_VECTOR.split()), index_sql)
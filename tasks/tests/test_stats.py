@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from tasks import stats
+from tasks.models import Task, TaskStats
+
+from . import DUE_DATE, LOCMEM_CACHES, make_user
+
+COUNTERS = ('total_users', 'total_admins', 'total_tasks', 'completed_tasks')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class IncrementalStatsTests(TestCase):
+    """The signal-maintained counters match a from-scratch aggregate after each write."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user('admin', 'admin')
+        cls.other_admin = make_user('other admin', 'admin')
+        cls.user = make_user('user', 'user', cls.admin)
+        cls.other_user = make_user('other user', 'user', cls.other_admin)
+    
+    def setUp(self):
+        cache.clear()
+        self.scopes = [
+            stats.GLOBAL_SCOPE,
+            stats.admin_scope(self.admin.pk), stats.admin_scope(self.other_admin.pk),
+            stats.user_scope(self.user.pk), stats.user_scope(self.other_user.pk),
+        ]
+        for scope in self.scopes:
+            stats.get_stats(scope)
+    
+    def assertStatsCurrent(self):
+        for scope in self.scopes:
+            with self.subTest(scope=scope):
+                stored = TaskStats.objects.values(*COUNTERS).get(scope=scope)
+                expected = {counter: stored[counter] for counter in COUNTERS}
+                expected.update(stats.compute_stats(scope))
+                self.assertEqual(stored, expected)
+    
+    def create_task(self, assignee, **fields):
+        return Task.objects.create(
+            title='task', description='d', assigned_to=assignee, created_by=self.admin, due_date=DUE_DATE, **fields
+        )
+    
+    def test_task_writes(self):
+        task = self.create_task(self.user)
+        self.create_task(self.other_user, status='completed')
+        self.assertStatsCurrent()
+        
+        task.status = 'completed'
+        task.save()
+        self.assertStatsCurrent()
+        
+        task.assigned_to = self.other_user
+        task.save()
+        self.assertStatsCurrent()
+        
+        task.delete()
+        self.assertStatsCurrent()
+        self.assertEqual(stats.get_stats(stats.GLOBAL_SCOPE).total_tasks, 1)
+    
+    def test_deferred_status(self):
+        task = self.create_task(self.user)
+        task = Task.objects.only('id', 'assigned_to').get(pk=task.pk)
+        task.status = 'completed'
+        task.save()
+        self.assertStatsCurrent()
+    
+    def test_deferred_assignee(self):
+        task = self.create_task(self.user)
+        task = Task.objects.only('id', 'status').get(pk=task.pk)
+        task.status = 'completed'
+        task.save()
+        self.assertStatsCurrent()
+    
+    def test_profile_writes(self):
+        self.create_task(self.user, status='completed')
+        profile = self.user.userprofile
+        profile.assigned_admin = self.other_admin
+        profile.save()
+        self.assertStatsCurrent()
+        
+        profile = self.other_admin.userprofile
+        profile.role = 'user'
+        profile.save()
+        self.assertStatsCurrent()
+        
+        self.user.userprofile.delete()
+        self.assertStatsCurrent()
+    
+    def test_rebuild(self):
+        self.create_task(self.user, status='completed')
+        self.create_task(self.other_user)
+        expected = {row['scope']: row for row in TaskStats.objects.values('scope', *COUNTERS)}
+        TaskStats.objects.update(total_tasks=0, completed_tasks=0)
+        stats.rebuild_stats()
+        rebuilt = {row['scope']: row for row in TaskStats.objects.values('scope', *COUNTERS)}
+        for scope in self.scopes:
+            self.assertEqual(rebuilt[scope], expected[scope])
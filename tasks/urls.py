@@ -1,9 +1,23 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Under ASGI the hot read endpoints are served by native async views.
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('tasks/', views.task_list, name='task_list'),
+    path('tasks/', read_views.task_list, name='task_list'),
     path('tasks/create/', views.create_task, name='create_task'),
+    path('tasks/events/', views.task_events, name='task_events'),
+    path('tasks/changes/', views.task_changes, name='task_changes'),
+    path('tasks/analytics/', views.task_analytics, name='task_analytics'),
+    path('tasks/flow-times/', views.task_flow_times, name='task_flow_times'),
+    path('tasks/notifications/', views.task_notifications, name='task_notifications'),
+    path('tasks/export/', views.export_tasks, name='export_tasks'),
+    path('tasks/reports/export/', views.export_reports, name='export_reports'),
+    path('tasks/bulk/create/', views.bulk_create_tasks, name='bulk_create_tasks'),
+    path('tasks/bulk/update/', views.bulk_update_tasks, name='bulk_update_tasks'),
     path('tasks/<int:pk>/', views.update_task, name='update_task'),
-    path('tasks/<int:pk>/report/', views.task_report, name='task_report'),
+    path('tasks/<int:pk>/history/', views.task_history, name='task_history'),
+    path('tasks/<int:pk>/report/', read_views.task_report, name='task_report'),
 ]
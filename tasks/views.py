@@ -1,88 +1,239 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from collections import defaultdict
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Task
-from .serializers import TaskSerializer, TaskUpdateSerializer, TaskReportSerializer
+from django.utils import timezone
+from task_manager.async_api import async_api_view
+from task_manager.replicas import read_from_replica
+from . import analytics, archive, caching, changes, events, fast_serializers, history, stats
+from .conditional import list_validators, not_modified, set_validators, task_validators
+from .exports import EXPORT_FORMATS, REPORT_EXPORT_FIELDS, TASK_EXPORT_FIELDS, export_rows
+from .filters import STATUS_VALUES, filter_tasks, parse_bound, task_ordering
+from .models import TASK_MODELS, Task, TaskNotification
+from .pagination import TaskCursorPagination
+from .serializers import (
+    BULK_BATCH_SIZE, BulkTaskSerializer, TaskEventSerializer, TaskNotificationSerializer, TaskSerializer,
+    TaskUpdateSerializer, TaskReportSerializer
+)
 
 User = get_user_model()
 
+MAX_BULK_ITEMS = 10000
+
+EXPORT_DATE_FIELDS = ('created_at', 'updated_at', 'due_date')
+
+
+def _bulk_payload_error(rows):
+    if not isinstance(rows, list):
+        return 'Expected a list of tasks.'
+    if not rows:
+        return 'At least one task is required.'
+    if len(rows) > MAX_BULK_ITEMS:
+        return f'A bulk request can contain at most {MAX_BULK_ITEMS} tasks.'
+    return None
+
+
+def _int_ids(values):
+    ids = set()
+    for value in values:
+        if isinstance(value, bool):
+            continue
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_from_replica
 def task_list(request):
-    user = request.user
-    if user.role == 'superadmin':
-        tasks = Task.objects.all()
-    elif user.role == 'admin':
-        tasks = Task.objects.filter(assigned_to__assigned_admin=user) | Task.objects.filter(assigned_to=user)
-    else:
-        tasks = Task.objects.filter(assigned_to=user)
+    signature = caching.scope_signature(caching.access_scopes(request.access))
+    validators = list_validators(request.access, request.get_full_path(), signature)
+    response = not_modified(request, *validators)
+    if response is not None:
+        return response
+    
+    cache_key = None
+    if caching.enabled():
+        cache_key = caching.task_list_key(request.access, request.build_absolute_uri(), signature)
+        body = cache.get(cache_key)
+        if body is not None:
+            return set_validators(fast_serializers.rendered_response(request, body), *validators)
     
-    serializer = TaskSerializer(tasks, many=True)
-    return Response(serializer.data)
+    try:
+        tasks = filter_tasks(Task.objects.visible_to(request.access), request.query_params)
+        ordering = task_ordering(request.query_params)
+        view = fast_serializers.list_view(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    paginator = TaskCursorPagination()
+    paginator.ordering = ordering
+    page = paginator.paginate_queryset(view.rows(tasks), request)
+    body = fast_serializers.render(paginator.get_paginated_data(view.render(page)))
+    if cache_key:
+        cache.set(cache_key, body, caching.cache_timeout())
+    return set_validators(fast_serializers.rendered_response(request, body), *validators)
 
 
-@api_view(['PUT'])
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def task_changes(request):
+    params = request.query_params
+    try:
+        page_size = min(int(params.get('page_size', changes.CHANGES_PAGE_SIZE)), changes.MAX_CHANGES_PAGE_SIZE)
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        return Response({'error': 'page_size must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        if params.get('cursor'):
+            position = changes.decode_cursor(params['cursor'])
+        else:
+            since = parse_bound(params['since']) if params.get('since') else None
+            position = changes.start_position(since)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except changes.CursorExpired:
+        return Response(
+            {'error': 'Cursor has expired; fetch all tasks again without a cursor.'},
+            status=status.HTTP_410_GONE
+        )
+    
+    tasks, deleted, cursor, has_more = changes.task_changes(request.access, position, page_size)
+    return Response({
+        'upserts': TaskSerializer(tasks, many=True).data,
+        'deleted': deleted,
+        'cursor': cursor,
+        'has_more': has_more,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def task_analytics(request):
+    try:
+        data = analytics.completion_analytics(request.access, request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(data)
+
+
+def user_notifications(user_id):
+    return TaskNotification.objects.filter(user_id=user_id).select_related('task')
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def task_notifications(request):
+    notifications = user_notifications(request.user.pk)
+    paginator = TaskCursorPagination()
+    page = paginator.paginate_queryset(notifications, request)
+    serializer = TaskNotificationSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def task_flow_times(request):
+    params = request.query_params
+    try:
+        date_from = parse_bound(params['date_from']) if params.get('date_from') else None
+        date_to = parse_bound(params['date_to'], end=True) if params.get('date_to') else None
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(history.flow_times(request.access, date_from, date_to))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def task_history(request, pk):
+    task = archive.get_task(pk, access=request.access)
+    if task is None:
+        raise Http404
+    return Response(TaskEventSerializer(history.task_history(task.pk), many=True).data)
+
+
+@api_view(['GET', 'PUT'])
 @permission_classes([permissions.IsAuthenticated])
 def update_task(request, pk):
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(Task.objects.select_related('assigned_to', 'created_by'), pk=pk)
+    access = request.access
+    action = 'view' if request.method == 'GET' else 'update'
     
-    if request.user.role == 'user' and task.assigned_to != request.user:
+    if access.role == 'user' and task.assigned_to_id != access.user_id:
         return Response(
-            {'error': 'You can only update your own tasks'}, 
+            {'error': f'You can only {action} your own tasks'}, 
             status=status.HTTP_403_FORBIDDEN
         )
     
-    if request.user.role == 'admin' and task.assigned_to.assigned_admin != request.user:
+    if access.role == 'admin' and not access.manages(task.assigned_to_id):
         return Response(
-            {'error': 'You can only update tasks assigned to your users'}, 
+            {'error': f'You can only {action} tasks assigned to your users'}, 
             status=status.HTTP_403_FORBIDDEN
         )
     
-    serializer = TaskUpdateSerializer(task, data=request.data, partial=True)
+    if request.method == 'GET':
+        validators = task_validators(task, 'task')
+        response = not_modified(request, *validators)
+        if response is not None:
+            return response
+        return set_validators(Response(TaskSerializer(task).data), *validators)
+    
+    serializer = TaskUpdateSerializer(task, data=request.data, partial=True, context={'request': request})
     if serializer.is_valid():
         updated_task = serializer.save()
         return Response(TaskSerializer(updated_task).data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def report_error(task, access):
+    """Return ``(message, status)`` when ``access`` may not view the report of ``task``."""
+    if task.status != 'completed':
+        return 'Report is only available for completed tasks', status.HTTP_400_BAD_REQUEST
+    
+    if access.role == 'user':
+        if task.assigned_to_id != access.user_id:
+            return 'You can only view reports for your own tasks', status.HTTP_403_FORBIDDEN
+    elif access.role == 'admin':
+        if not access.manages(task.assigned_to_id) and task.assigned_to_id != access.user_id:
+            return 'You can only view reports for your users', status.HTTP_403_FORBIDDEN
+    return None
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_from_replica
 def task_report(request, pk):
-    task = get_object_or_404(Task, pk=pk)
+    task = archive.get_task(pk, 'assigned_to', 'created_by')
+    if task is None:
+        raise Http404
     
-    if task.status != 'completed':
-        return Response(
-            {'error': 'Report is only available for completed tasks'}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    error = report_error(task, request.access)
+    if error is not None:
+        return Response({'error': error[0]}, status=error[1])
     
-    user = request.user
-    if user.role == 'user':
-        if task.assigned_to != user:
-            return Response(
-                {'error': 'You can only view reports for your own tasks'}, 
-                status=status.HTTP_403_FORBIDDEN
-            )
-    elif user.role == 'admin':
-        if task.assigned_to.assigned_admin != user and task.assigned_to != user:
-            return Response(
-                {'error': 'You can only view reports for your users'}, 
-                status=status.HTTP_403_FORBIDDEN
-            )
+    validators = task_validators(task, 'report')
+    response = not_modified(request, *validators)
+    if response is not None:
+        return response
     
     serializer = TaskReportSerializer(task)
-    return Response(serializer.data)
+    return set_validators(Response(serializer.data), *validators)
 
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def create_task(request):
-    user = request.user
-    
-    if user.role == 'user':
+    if request.access.role == 'user':
         return Response(
             {'error': 'Users cannot create tasks'}, 
             status=status.HTTP_403_FORBIDDEN
@@ -93,3 +244,196 @@ def create_task(request):
         task = serializer.save()
         return Response(TaskSerializer(task).data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_create_tasks(request):
+    if request.access.role == 'user':
+        return Response(
+            {'error': 'Users cannot create tasks'}, 
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    rows = request.data
+    error = _bulk_payload_error(rows)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    assignee_ids = _int_ids(row.get('assigned_to') for row in rows if isinstance(row, dict))
+    context = {'request': request, 'assignees': User.objects.in_bulk(assignee_ids)}
+    serializer = BulkTaskSerializer(data=rows, many=True, context=context)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    deltas = defaultdict(lambda: (0, 0))
+    rollup_deltas = analytics.new_deltas()
+    with transaction.atomic():
+        tasks = serializer.save()
+        for task in tasks:
+            total, completed = deltas[task.assigned_to_id]
+            deltas[task.assigned_to_id] = (total + 1, completed + int(task.status == 'completed'))
+            analytics.add_delta(rollup_deltas, analytics.task_entry(task))
+        stats.apply_task_deltas(deltas)
+        analytics.apply_rollup_deltas(rollup_deltas)
+        caching.bump_users(stats.assigned_admin_ids(deltas))
+    
+    return Response(TaskSerializer(tasks, many=True).data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['PUT'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_update_tasks(request):
+    rows = request.data
+    error = _bulk_payload_error(rows)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    access = request.access
+    ids = _int_ids(row.get('id') for row in rows if isinstance(row, dict))
+    tasks = Task.objects.select_related('assigned_to', 'created_by').in_bulk(ids)
+    
+    errors = []
+    changed = []
+    seen = set()
+    for row in rows:
+        if not isinstance(row, dict) or row.get('id') is None:
+            errors.append({'id': ['This field is required.']})
+            continue
+        
+        task_ids = _int_ids([row['id']])
+        task = tasks.get(task_ids.pop()) if task_ids else None
+        if task is None:
+            errors.append({'id': [f'Invalid pk "{row["id"]}" - object does not exist.']})
+            continue
+        if task.pk in seen:
+            errors.append({'id': ['Duplicate task in request.']})
+            continue
+        seen.add(task.pk)
+        
+        if access.role == 'user' and task.assigned_to_id != access.user_id:
+            errors.append({'error': 'You can only update your own tasks'})
+            continue
+        if access.role == 'admin' and not access.manages(task.assigned_to_id):
+            errors.append({'error': 'You can only update tasks assigned to your users'})
+            continue
+        
+        data = {key: value for key, value in row.items() if key != 'id'}
+        serializer = TaskUpdateSerializer(task, data=data, partial=True)
+        if not serializer.is_valid():
+            errors.append(serializer.errors)
+            continue
+        
+        for attr, value in serializer.validated_data.items():
+            setattr(task, attr, value)
+        changed.append(task)
+        errors.append({})
+    
+    if any(errors):
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    now = timezone.now()
+    deltas = {}
+    rollup_deltas = analytics.new_deltas()
+    transitions = []
+    for task in changed:
+        task.updated_at = now
+        task.track_completion(now)
+        old_status = task._stats_state[1]
+        transitions.append((task, old_status))
+        delta = int(task.status == 'completed') - int(old_status == 'completed')
+        if delta:
+            deltas[task.assigned_to_id] = (0, deltas.get(task.assigned_to_id, (0, 0))[1] + delta)
+        analytics.add_delta(rollup_deltas, task._rollup_entry, -1)
+        analytics.add_delta(rollup_deltas, analytics.task_entry(task))
+    
+    with transaction.atomic():
+        Task.objects.bulk_update(
+            changed,
+            ['status', 'completion_report', 'worked_hours', 'completed_at', 'updated_at'],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        stats.apply_task_deltas(deltas)
+        analytics.apply_rollup_deltas(rollup_deltas)
+        history.record_transitions(transitions, request.user.pk)
+        caching.bump_users(stats.assigned_admin_ids({task.assigned_to_id for task in changed}))
+    
+    return Response(TaskSerializer(changed, many=True).data)
+
+
+def _export(request, fields, filename, **filters):
+    """Stream the live and archived tasks visible to the user that match ``filters`` and the query."""
+    params = request.query_params
+    export_format = params.get('output', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {'error': f'output must be one of: {", ".join(EXPORT_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    date_field = params.get('date_field', 'created_at')
+    if date_field not in EXPORT_DATE_FIELDS:
+        return Response(
+            {'error': f'date_field must be one of: {", ".join(EXPORT_DATE_FIELDS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        if params.get('date_from'):
+            filters[f'{date_field}__gte'] = parse_bound(params['date_from'])
+        if params.get('date_to'):
+            filters[f'{date_field}__lte'] = parse_bound(params['date_to'], end=True)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    for param in ('admin', 'user'):
+        if params.get(param) and not params[param].isdigit():
+            return Response({'error': f'{param} must be a user id'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if params.get('status'):
+        if params['status'] not in STATUS_VALUES:
+            return Response(
+                {'error': f'status must be one of: {", ".join(STATUS_VALUES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Report exports stay limited to completed tasks.
+        filters.setdefault('status', params['status'])
+    if params.get('admin'):
+        filters['assigned_to__userprofile__assigned_admin_id'] = params['admin']
+    if params.get('user'):
+        filters['assigned_to_id'] = params['user']
+    
+    tasks = [model.objects.visible_to(request.access).filter(**filters) for model in TASK_MODELS]
+    response = StreamingHttpResponse(
+        export_rows(tasks, fields, export_format),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_tasks(request):
+    return _export(request, TASK_EXPORT_FIELDS, 'tasks')
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_reports(request):
+    return _export(request, REPORT_EXPORT_FIELDS, 'task_reports', status='completed')
+
+
+@async_api_view(['GET'])
+async def task_events(request):
+    """
+    Server-sent event stream of task changes visible to the user. Requires
+    an ASGI server; each idle connection costs a queue, not a thread.
+    """
+    response = StreamingHttpResponse(
+        events.event_stream(events.broker.subscribe(request.access)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response